@@ -0,0 +1,67 @@
+"""
+Compares the cost per document of Validator.validate_many against
+Validator.validate called in a loop.
+
+    python examples/benchmark_validate_many.py [count]
+"""
+
+import sys
+from timeit import default_timer
+
+from jsonspec.validators import ValidationError, load
+
+schema = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer", "minimum": 0},
+        "kind": {"enum": ["click", "view", "purchase"]},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "meta": {"type": "object", "additionalProperties": {"type": "string"}},
+    },
+    "required": ["id", "kind"],
+}
+
+
+def events(count):
+    for i in range(count):
+        if i % 10:
+            yield {"id": i, "kind": "click", "tags": ["a", "b"], "meta": {"x": "y"}}
+        else:
+            yield {"id": -i, "kind": "scroll", "tags": [1]}
+
+
+def loop(validator, documents, **kwargs):
+    for document in documents:
+        try:
+            validator.validate(document, **kwargs)
+        except ValidationError as error:
+            error.flatten()
+
+
+def many(validator, documents):
+    for result in validator.validate_many(documents):
+        pass
+
+
+def measure(label, func, count):
+    start = default_timer()
+    func()
+    elapsed = default_timer() - start
+    print("{:<32} {:>8.2f} us/document".format(label, elapsed / count * 1e6))
+
+
+def main(count=100000):
+    for backend in (None, "codegen"):
+        validator = load(schema, backend=backend)
+        print("backend: {}".format(backend or "interpreted"))
+        measure("validate loop", lambda: loop(validator, events(count)), count)
+        measure(
+            "validate loop, copy=False",
+            lambda: loop(validator, events(count), copy=False),
+            count,
+        )
+        measure("validate_many", lambda: many(validator, events(count)), count)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -251,6 +251,79 @@ class AddCommand(Command):
             raise Exception("{} is not a valid pointer".format(args.pointer))
 
 
+class CacheCommand(Command):
+    """Prebuilds or verifies the on-disk cache of compiled schemas.
+
+    Every json file of the schemas directory is compiled, the other ones
+    are exposed by a lazy filesystem provider.
+
+    examples::
+
+        %(prog)s --cache-dir=.jsonspec schemas/
+        %(prog)s --cache-dir=.jsonspec --prefix=my:schemas: schemas/
+        %(prog)s --cache-dir=.jsonspec --verify schemas/
+        %(prog)s --cache-dir=.jsonspec --verify --prune schemas/
+    """
+
+    help = "prebuild or verify the cache of compiled schemas"
+
+    def arguments(self, parser):
+        parser.add_argument(
+            "directory", help="schemas directory", metavar="<directory>"
+        )
+        parser.add_argument(
+            "--cache-dir",
+            required=True,
+            help="where compiled schemas are stored",
+            dest="cache_dir",
+            metavar="<cache>",
+        )
+        parser.add_argument(
+            "--prefix",
+            help="prefix of the schemas uris",
+            metavar="<prefix>",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="check the cached schemas instead of building them",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="delete the cached schemas that are not fresh",
+        )
+        indentation_arguments(parser)
+
+    def run(self, args):
+        from pathlib import Path
+
+        from jsonspec.reference.providers import FilesystemProvider
+        from jsonspec.validators.store import SchemaStore
+
+        provider = FilesystemProvider(args.directory, args.prefix, lazy=True)
+        store = SchemaStore(args.cache_dir)
+
+        if args.verify:
+            report = store.verify(provider, prune=args.prune)
+            response = driver.dumps(report, indent=args.indent)
+            if not args.prune and (report["stale"] or report["corrupted"]):
+                raise Exception(response)
+            return response
+
+        built, failed = [], {}
+        for filename in sorted(Path(args.directory).glob("**/*.json")):
+            try:
+                store.build(filename, provider=provider)
+                built.append(str(filename))
+            except Exception as error:
+                failed[str(filename)] = str(error)
+        response = driver.dumps({"built": built, "failed": failed}, indent=args.indent)
+        if failed:
+            raise Exception(response)
+        return response
+
+
 class CheckCommand(Command):
     """Tests that a value at the target location is equal to a specified value.
 
@@ -324,25 +397,93 @@ class CopyCommand(Command):
             raise Exception("{} is not a valid pointer".format(args.pointer))
 
 
+class DiffCommand(Command):
+    """Computes the JSON Patch that transforms a document into another.
+
+    examples::
+
+        %(prog)s --document-file=old.json --new-file=new.json
+        %(prog)s --new-file=new.json < old.json
+        %(prog)s --new-json='{"foo": ["bar"]}' --document-json='{"foo": []}'
+        %(prog)s --new-file=new.json --limit=100 < old.json
+        %(prog)s --new-file=new.json --merge < old.json
+    """
+
+    help = "compute the patch between two documents"
+
+    def arguments(self, parser):
+        document_arguments(parser)
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument(
+            "--new-json",
+            type=JSONStruct,
+            help="json structure",
+            dest="new_json",
+            metavar="<new>",
+        )
+        group.add_argument(
+            "--new-file",
+            type=JSONFile("r"),
+            help="json filename",
+            dest="new_file",
+            metavar="<new>",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="replace the whole document above this count of operations",
+            metavar="<count>",
+        )
+        parser.add_argument(
+            "--merge",
+            action="store_true",
+            help="return a merge patch instead of a json patch",
+        )
+        indentation_arguments(parser)
+
+    def run(self, args):
+        parse_document(args)
+        new = args.new_json if args.new_file is None else args.new_file
+
+        from jsonspec.operations import diff, merge_diff
+
+        if args.merge:
+            response = merge_diff(args.document, new)
+        else:
+            response = diff(args.document, new, limit=args.limit)
+        return driver.dumps(response, indent=args.indent)
+
+
 class ExtractCommand(Command):
     """Extract a fragment from a json document.
 
+    With several pointers, the fragments are extracted in a single traversal
+    and printed as an object of pointer to fragment. Pointers that do not
+    match are left out.
+
     examples::
 
         %(prog)s '#/foo/1' --document-json='{"foo": ["bar", "baz"]}'
         echo '{"foo": ["bar", "baz"]}' | %(prog)s '#/foo/1'
         %(prog)s '#/foo/1' --document-file=doc.json
         %(prog)s '#/foo/1' < doc.json
+        %(prog)s '#/foo/0' '#/foo/1' < doc.json
     """
 
     help = "extract a member of a document"
 
     def arguments(self, parser):
-        pointer_arguments(parser)
+        parser.add_argument(
+            "pointer", type=str, help="json pointer", metavar="<pointer>", nargs="+"
+        )
         document_arguments(parser)
         indentation_arguments(parser)
 
     def run(self, args):
+        pointers = args.pointer
+        if len(pointers) > 1:
+            return self.run_many(args, pointers)
+        args.pointer = pointers[0]
         parse_pointer(args)
         parse_document(args)
 
@@ -357,6 +498,68 @@ class ExtractCommand(Command):
         except ParseError:
             raise Exception("{} is not a valid pointer".format(args.pointer))
 
+    def run_many(self, args, pointers):
+        parse_document(args)
+
+        from jsonspec.pointer import Missing, ParseError, PointerSet
+
+        try:
+            compiled = PointerSet(
+                pointer[1:] if pointer.startswith("#") else pointer
+                for pointer in pointers
+            )
+        except ParseError as error:
+            raise Exception("{} is not a valid pointer".format(error.pointer))
+
+        values = compiled.extract(args.document)
+        response = {}
+        for pointer, key in zip(pointers, compiled):
+            if values[key] is not Missing:
+                response[pointer] = values[key]
+        return driver.dumps(response, indent=args.indent)
+
+
+class MergeCommand(Command):
+    """Applies a merge patch to a json document.
+
+    examples::
+
+        %(prog)s --patch-json='{"foo": {"bar": null}}' --document-json='{"foo": {"bar": 1}}'
+        %(prog)s --patch-file=patch.json < doc.json
+        %(prog)s --patch-file=patch.json --document-file=doc.json
+    """
+
+    help = "apply a merge patch to a json document"
+
+    def arguments(self, parser):
+        document_arguments(parser)
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument(
+            "--patch-json",
+            type=JSONStruct,
+            help="json structure",
+            dest="patch_json",
+            metavar="<patch>",
+        )
+        group.add_argument(
+            "--patch-file",
+            type=JSONFile("r"),
+            help="json filename",
+            dest="patch_file",
+            metavar="<patch>",
+        )
+        indentation_arguments(parser)
+
+    def run(self, args):
+        parse_document(args)
+        patch = args.patch_json if args.patch_file is None else args.patch_file
+
+        from jsonspec.operations import merge
+
+        # the document is owned, and the patch is not used afterwards
+        response = merge(args.document, patch, inplace=True)
+        return driver.dumps(response, indent=args.indent)
+
 
 class MoveCommand(Command):
     """Removes the value at a specified location and adds it to the target location.
@@ -473,21 +676,54 @@ class ValidateCommand(Command):
         echo '{"foo": ["bar", "baz"]}' | %(prog)s --schema-file=schema.json
         %(prog)s --schema-file=schema.json --document-file=doc.json
         %(prog)s --schema-file=schema.json < doc.json
+        %(prog)s --schema-file=schema.json --check < doc.json
+        %(prog)s --schema-file=schema.json --ndjson < events.ndjson
+        %(prog)s --schema-file=schema.json --ndjson=events.ndjson --jobs=4
     """
 
     help = "validate a document against a schema"
 
+    #: lines validated at once by each job, in ndjson mode
+    window = 1000
+
     def arguments(self, parser):
         document_arguments(parser)
         schema_arguments(parser)
         indentation_arguments(parser)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="only tell if document is valid, stopping at the first error",
+        )
+        parser.add_argument(
+            "--ndjson",
+            nargs="?",
+            const="-",
+            type=argparse.FileType("r"),
+            help="validate every line of a newline-delimited json file",
+            metavar="<file>",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="number of processes validating ndjson lines",
+            metavar="<jobs>",
+        )
 
     def run(self, args):
-        parse_document(args)
         parse_schema(args)
+        if args.ndjson:
+            return self.run_ndjson(args)
+        parse_document(args)
 
         from jsonspec.validators import ValidationError, load
 
+        if args.check:
+            if load(args.schema).is_valid(args.document):
+                return "document is valid"
+            raise Exception("document does not validate with schema.")
+
         try:
             validated = load(args.schema).validate(args.document)
             return driver.dumps(validated, indent=args.indent)
@@ -500,6 +736,79 @@ class ValidateCommand(Command):
                 msg += "\n"
             raise Exception(msg)
 
+    def run_ndjson(self, args):
+        """Validates lines by windows, so that memory stays constant.
+
+        Every failure is written as a {line, pointer, reason} record,
+        every valid line as a {line, valid} record.
+        """
+        from itertools import islice
+        from timeit import default_timer
+
+        from jsonspec.validators import Executor, load
+
+        if args.jobs > 1:
+            executor = Executor(
+                args.schema, processes=args.jobs, chunksize=self.window
+            ).start()
+            validate_many = executor.validate_many
+        else:
+            executor = None
+            validate_many = load(args.schema).validate_many
+
+        start = default_timer()
+        records = invalid = 0
+        lines = enumerate(args.ndjson, 1)
+        try:
+            while True:
+                window = list(islice(lines, self.window * args.jobs))
+                if not window:
+                    break
+                parsed = []
+                for number, line in window:
+                    if not line.strip():
+                        continue
+                    try:
+                        parsed.append((number, driver.loads(line), None))
+                    except ValueError as error:
+                        parsed.append((number, None, error))
+                documents = [doc for _, doc, error in parsed if error is None]
+                results = validate_many(documents)
+                for number, doc, error in parsed:
+                    records += 1
+                    if error is not None:
+                        errors = {"#": ["Invalid JSON: {}".format(error)]}
+                    else:
+                        errors = next(results).errors
+                    if not errors:
+                        self.emit({"line": number, "valid": True})
+                        continue
+                    invalid += 1
+                    for pointer, reasons in sorted(errors.items()):
+                        for reason in sorted(reasons):
+                            self.emit(
+                                {"line": number, "pointer": pointer, "reason": reason}
+                            )
+        finally:
+            if executor:
+                executor.close()
+
+        elapsed = default_timer() - start
+        summary = driver.dumps(
+            {
+                "records": records,
+                "invalid": invalid,
+                "elapsed": round(elapsed, 3),
+                "records/sec": round(records / elapsed, 1) if elapsed else None,
+            }
+        )
+        if invalid:
+            raise Exception(summary)
+        return summary
+
+    def emit(self, record):
+        sys.stdout.write(driver.dumps(record) + "\n")
+
 
 def get_parser():
     parser = argparse.ArgumentParser(
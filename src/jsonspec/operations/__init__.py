@@ -10,13 +10,26 @@ __all__ = [
     "replace",
     "move",
     "copy",
+    "apply_patch",
+    "apply_to_many",
+    "compile_patch",
+    "diff",
+    "merge",
+    "merge_diff",
     "Error",
     "NonexistentTarget",
+    "Outcome",
+    "PatchProgram",
+    "MutableTarget",
+    "SharedTarget",
     "Target",
 ]
 
-from .bases import Target
+from .bases import MutableTarget, SharedTarget, Target
+from .diff import diff
 from .exceptions import Error, NonexistentTarget
+from .merge import merge_diff
+from .program import Outcome, PatchProgram, apply_to_many, compile_patch
 
 
 def check(doc, pointer, expected, raise_onerror=False):
@@ -31,34 +44,46 @@ def check(doc, pointer, expected, raise_onerror=False):
     return Target(doc).check(pointer, expected, raise_onerror)
 
 
-def remove(doc, pointer):
+def remove(doc, pointer, share=False, inplace=False):
     """Remove element from sequence, member from mapping.
 
     :param doc: the document base
     :param pointer: the path to search in
+    :param share: copy only the containers along the path, and share the
+                  other members with doc, see :class:`SharedTarget`
+    :param inplace: modify doc directly and return it, see
+                    :class:`MutableTarget`
     :return: the new object
     """
 
-    return Target(doc).remove(pointer).document
+    return target(doc, share, inplace).remove(pointer).document
 
 
-def add(doc, pointer, value):
+def add(doc, pointer, value, share=False, inplace=False):
     """Add element to sequence, member to mapping.
 
     :param doc: the document base
     :param pointer: the path to add in it
     :param value: the new value
+    :param share: copy only the containers along the path, and share the
+                  other members with doc, see :class:`SharedTarget`
+    :param inplace: modify doc directly and return it, see
+                    :class:`MutableTarget`
     :return: the new object
     """
-    return Target(doc).add(pointer, value).document
+    return target(doc, share, inplace).add(pointer, value).document
 
 
-def replace(doc, pointer, value):
+def replace(doc, pointer, value, share=False, inplace=False):
     """Replace element from sequence, member from mapping.
 
     :param doc: the document base
     :param pointer: the path to search in
     :param value: the new value
+    :param share: copy only the containers along the path, and share the
+                  other members with doc, see :class:`SharedTarget`
+    :param inplace: modify doc directly and return it, see
+                    :class:`MutableTarget`
     :return: the new object
 
     .. note::
@@ -68,10 +93,10 @@ def replace(doc, pointer, value):
         location with the replacement value.
     """
 
-    return Target(doc).replace(pointer, value).document
+    return target(doc, share, inplace).replace(pointer, value).document
 
 
-def move(doc, dest, src):
+def move(doc, dest, src, share=False, inplace=False):
     """Move element from sequence, member from mapping.
 
     :param doc: the document base
@@ -79,6 +104,10 @@ def move(doc, dest, src):
     :type dest: Pointer
     :param src: the source
     :type src: Pointer
+    :param share: copy only the containers along the path, and share the
+                  other members with doc, see :class:`SharedTarget`
+    :param inplace: modify doc directly and return it, see
+                    :class:`MutableTarget`
     :return: the new object
 
     .. note::
@@ -88,10 +117,10 @@ def move(doc, dest, src):
 
     """
 
-    return Target(doc).move(dest, src).document
+    return target(doc, share, inplace).move(dest, src).document
 
 
-def copy(doc, dest, src):
+def copy(doc, dest, src, share=False, inplace=False):
     """Copy element from sequence, member from mapping.
 
     :param doc: the document base
@@ -99,7 +128,61 @@ def copy(doc, dest, src):
     :type dest: Pointer
     :param src: the source
     :type src: Pointer
+    :param share: copy only the containers along the path, and share the
+                  other members with doc, see :class:`SharedTarget`
+    :param inplace: modify doc directly and return it, see
+                    :class:`MutableTarget`
     :return: the new object
     """
 
-    return Target(doc).copy(dest, src).document
+    return target(doc, share, inplace).copy(dest, src).document
+
+
+def apply_patch(doc, operations, share=False, inplace=False):
+    """Apply a JSON Patch, a list of operations.
+
+    :param doc: the document base
+    :param operations: the operations, for example
+                       ``{'op': 'add', 'path': '/foo', 'value': 42}``
+    :type operations: list
+    :param share: copy only the containers along the path, and share the
+                  other members with doc, see :class:`SharedTarget`
+    :param inplace: modify doc directly and return it, see
+                    :class:`MutableTarget`
+    :return: the new object
+    :raises Error: an operation is malformed or cannot be applied
+
+    The document is copied once, and all the operations are applied to this
+    copy. The patch is atomic: when an operation fails, nothing is returned
+    and doc is untouched. In place, the operations applied before the
+    failing one are kept.
+    """
+
+    return target(doc, share, inplace).patch(operations).document
+
+
+def merge(doc, patch, share=False, inplace=False):
+    """Apply a JSON Merge Patch.
+
+    :param doc: the document base
+    :param patch: the merge patch. Its members replace the ones of doc,
+                  null members are removed, and objects are merged
+                  recursively.
+    :param share: copy only the objects modified by the patch, and share
+                  the other members with doc, see :class:`SharedTarget`
+    :param inplace: modify doc directly and return it, see
+                    :class:`MutableTarget`
+    :return: the new object
+    """
+
+    return target(doc, share, inplace).merge(patch).document
+
+
+def target(doc, share=False, inplace=False):
+    if share and inplace:
+        raise ValueError("share and inplace are exclusive")
+    if inplace:
+        return MutableTarget(doc)
+    if share:
+        return SharedTarget(doc)
+    return Target(doc)
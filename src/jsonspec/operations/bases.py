@@ -4,18 +4,23 @@
 """
 
 
-__all__ = ["Target"]
+__all__ = ["MutableTarget", "SharedTarget", "Target"]
 
 import logging
 from collections.abc import Mapping, MutableSequence
-from copy import deepcopy
+from copy import copy, deepcopy
 
 from jsonspec.pointer import ExtractError, LastElement, OutOfBounds, OutOfRange, Pointer
+from jsonspec.pointer.bases import compile_pointer
 
 from .exceptions import Error, NonexistentTarget
+from .merge import merge_value
 
 logger = logging.getLogger(__name__)
 
+#: values inserted without being copied
+scalar_types = {str, int, float, bool, type(None)}
+
 
 class Target:
     """
@@ -26,6 +31,20 @@ class Target:
     def __init__(self, document):
         self.document = document
 
+    def prepare(self, *pointers):
+        """Returns the document that operations on pointers will modify.
+
+        :param pointers: the locations that are going to be modified
+        """
+        return deepcopy(self.document)
+
+    def detach(self, value):
+        """Returns the value that operations will insert into the document.
+
+        :param value: the value given to the operation
+        """
+        return deepcopy(value)
+
     def check(self, pointer, expected, raise_onerror=False):
         """Check if value exists into object.
 
@@ -34,16 +53,7 @@ class Target:
         :param raise_onerror: should raise on error?
         :return: boolean
         """
-        obj = self.document
-        for token in Pointer(pointer):
-            try:
-                obj = token.extract(obj, bypass_ref=True)
-            except ExtractError as error:
-                if raise_onerror:
-                    raise Error(*error.args)
-                logger.exception(error)
-                return False
-        return obj == expected
+        return check_value(self.document, pointer, expected, raise_onerror)
 
     def remove(self, pointer):
         """Remove element from sequence, member from mapping.
@@ -52,23 +62,8 @@ class Target:
         :return: resolved document
         :rtype: Target
         """
-        doc = deepcopy(self.document)
-        parent, obj = None, doc
-        try:
-            # fetching
-            for token in Pointer(pointer):
-                parent, obj = obj, token.extract(obj, bypass_ref=True)
-
-            # removing
-            if isinstance(parent, Mapping):
-                del parent[token]
-
-            if isinstance(parent, MutableSequence):
-                parent.pop(int(token))
-        except Exception as error:
-            raise Error(*error.args)
-
-        return Target(doc)
+        doc = self.prepare(pointer)
+        return self.__class__(remove_value(doc, pointer))
 
     def add(self, pointer, value):
         """Add element to sequence, member to mapping.
@@ -98,29 +93,8 @@ class Target:
             has the effect of appending the value to the sequence.
 
         """
-        doc = deepcopy(self.document)
-        parent, obj = None, doc
-        try:
-            for token in Pointer(pointer):
-                parent, obj = obj, token.extract(obj, bypass_ref=True)
-            else:
-                if isinstance(parent, MutableSequence):
-                    raise OutOfRange(parent)
-                if isinstance(parent, Mapping):
-                    raise OutOfBounds(parent)
-                raise Error("already setted")
-        except (OutOfBounds, OutOfRange, LastElement) as error:
-            if not token.last:
-                raise NonexistentTarget(obj)
-            value = deepcopy(value)
-            if isinstance(error, OutOfBounds):
-                error.obj[str(token)] = value
-            elif isinstance(error, OutOfRange):
-                error.obj.insert(int(token), value)
-            elif isinstance(error, LastElement):
-                error.obj.append(value)
-
-        return Target(doc)
+        doc = self.prepare(pointer)
+        return self.__class__(add_value(doc, pointer, self.detach(value)))
 
     def replace(self, pointer, value):
         """Replace element from sequence, member from mapping.
@@ -130,24 +104,8 @@ class Target:
         :return: resolved document
         :rtype: Target
         """
-        doc = deepcopy(self.document)
-        parent, obj = None, doc
-        try:
-            # fetching
-            for token in Pointer(pointer):
-                parent, obj = obj, token.extract(obj, bypass_ref=True)
-
-            # replace
-            value = deepcopy(value)
-            if isinstance(parent, Mapping):
-                parent[token] = value
-
-            if isinstance(parent, MutableSequence):
-                parent[int(token)] = value
-        except Exception as error:
-            raise Error(*error.args)
-
-        return Target(doc)
+        doc = self.prepare(pointer)
+        return self.__class__(replace_value(doc, pointer, self.detach(value)))
 
     def move(self, dest, src):
         """Move element from sequence, member from mapping.
@@ -169,22 +127,8 @@ class Target:
             location; i.e., a location cannot be moved into one of its children
 
         """
-
-        doc = deepcopy(self.document)
-
-        # delete
-        parent, fragment = None, doc
-        for token in Pointer(src):
-            parent, fragment = fragment, token.extract(fragment, bypass_ref=True)
-
-        if isinstance(parent, Mapping):
-            del parent[token]
-
-        if isinstance(parent, MutableSequence):
-            parent.pop(int(token))
-
-        # insert
-        return Target(doc).add(dest, fragment)
+        doc = self.prepare(src, dest)
+        return self.__class__(move_value(doc, dest, src))
 
     def copy(self, dest, src):
         """Copy element from sequence, member from mapping.
@@ -196,8 +140,352 @@ class Target:
         :return: resolved document
         :rtype: Target
         """
-        doc = fragment = deepcopy(self.document)
-        for token in Pointer(src):
-            fragment = token.extract(fragment, bypass_ref=True)
+        doc = self.prepare(dest)
+        return self.__class__(copy_value(doc, dest, src))
+
+    def patch(self, operations):
+        """Apply a list of operations, as described by JSON Patch.
+
+        The document is copied once, then every operation is applied to this
+        copy. If any of them fails, the whole patch fails.
+
+        :param operations: the operations, for example
+                           ``{'op': 'add', 'path': '/foo', 'value': 42}``
+        :type operations: list
+        :return: resolved document
+        :rtype: Target
+        :raises Error: an operation is malformed or cannot be applied
+        """
+        doc = self.prepare()
+        for operation in operations:
+            doc = apply_operation(doc, operation, self.detach)
+        return self.__class__(doc)
+
+    def merge(self, patch):
+        """Apply a merge patch, as described by JSON Merge Patch.
+
+        :param patch: the merge patch, for example
+                      ``{'foo': {'bar': 42, 'baz': None}}``
+        :return: resolved document
+        :rtype: Target
+        """
+        return self.__class__(merge_value(self.prepare(), patch, self.detach))
+
 
-        return Target(doc).add(dest, fragment)
+class SharedTarget(Target):
+    """
+    Operations copy only the containers along their locations, and share
+    every other member with the previous document.
+
+    Documents must not be mutated afterwards, as they share their members
+    with the next ones.
+
+    :ivar document: the document base
+    """
+
+    def prepare(self, *pointers):
+        return copy_paths(self.document, pointers)
+
+    def patch(self, operations):
+        """Apply a list of operations, as described by JSON Patch.
+
+        Containers are copied once, the first time an operation modifies
+        them. If any operation fails, the whole patch fails.
+
+        :param operations: the operations
+        :type operations: list
+        :return: resolved document
+        :rtype: SharedTarget
+        :raises Error: an operation is malformed or cannot be applied
+        """
+        doc, copied = self.document, set()
+        for operation in operations:
+            validate_operation(operation)
+            if operation["op"] != "test":
+                pointers = [
+                    operation[key]
+                    for key in ("from", "path")
+                    if key in operation_members[operation["op"]] + ("path",)
+                ]
+                doc = copy_paths(doc, pointers, copied)
+            doc = apply_operation(doc, operation, self.detach)
+        return SharedTarget(doc)
+
+    def merge(self, patch):
+        """Apply a merge patch, as described by JSON Merge Patch.
+
+        Only the objects along the members of the patch are copied.
+
+        :param patch: the merge patch
+        :return: resolved document
+        :rtype: SharedTarget
+        """
+        return SharedTarget(merge_value(self.document, patch, self.detach, copy))
+
+
+class MutableTarget(Target):
+    """
+    Operations modify the document directly, and return it. Scalar values
+    are inserted as they are given, containers are copied so that the
+    document never shares them with the patch.
+
+    Single operations raise before modifying the document. A patch stops on
+    its first failing operation, and the previous ones stay applied; only
+    malformed operations are rejected before applying any of them.
+
+    :ivar document: the document base
+    """
+
+    def prepare(self, *pointers):
+        return self.document
+
+    def detach(self, value):
+        if value.__class__ in scalar_types:
+            return value
+        return deepcopy(value)
+
+    def patch(self, operations):
+        """Apply a list of operations, as described by JSON Patch.
+
+        :param operations: the operations
+        :type operations: list
+        :return: resolved document
+        :rtype: MutableTarget
+        :raises Error: an operation is malformed or cannot be applied
+        """
+        operations = list(operations)
+        for operation in operations:
+            validate_operation(operation)
+        return super().patch(operations)
+
+
+def copy_paths(doc, pointers, copied=None):
+    """Copies the containers that lead to the last token of pointers.
+
+    :param doc: the document base
+    :param pointers: the pointers to follow
+    :param copied: identities of the containers already copied, which are
+                   modified directly
+    :type copied: set
+    :return: the new document
+    """
+    copied = set() if copied is None else copied
+    if id(doc) not in copied and is_container(doc):
+        doc = copy(doc)
+        copied.add(id(doc))
+
+    for pointer in pointers:
+        obj = doc
+        for token in parse_tokens(pointer)[:-1]:
+            found, event = token.lookup(obj, bypass_ref=True)
+            if event is not None or not is_container(found):
+                # operations raise on this location
+                break
+            if id(found) not in copied:
+                if isinstance(obj, Mapping) and token in obj:
+                    key = str(token)
+                else:
+                    key = token.index
+                found = copy(found)
+                obj[key] = found
+                copied.add(id(found))
+            obj = found
+    return doc
+
+
+def is_container(obj):
+    cls = obj.__class__
+    return cls is dict or cls is list or isinstance(obj, (Mapping, MutableSequence))
+
+
+def parse_tokens(pointer):
+    """Returns the tokens of pointer.
+
+    :param pointer: a string, a Pointer instance, or a tuple of tokens
+                    already parsed
+    :rtype: tuple
+    """
+    if isinstance(pointer, tuple):
+        return pointer
+    if isinstance(pointer, Pointer):
+        return tuple(pointer.tokens)
+    return compile_pointer(pointer)[0]
+
+
+# These functions apply an operation directly to doc, and return the
+# resulting document. doc is untouched when they fail. Pointers may be
+# given as tuples of tokens.
+
+
+def check_value(doc, pointer, expected, raise_onerror=False):
+    obj = doc
+    for token in parse_tokens(pointer):
+        found, event = token.lookup(obj, bypass_ref=True)
+        if event is not None:
+            if raise_onerror:
+                try:
+                    token.extract(obj, bypass_ref=True)
+                except ExtractError as error:
+                    raise Error(*error.args)
+            logger.debug("%s not found", pointer)
+            return False
+        obj = found
+    return obj == expected
+
+
+def remove_value(doc, pointer):
+    parent, obj = None, doc
+    try:
+        # fetching
+        for token in parse_tokens(pointer):
+            parent, obj = obj, token.extract(obj, bypass_ref=True)
+
+        # removing
+        if isinstance(parent, Mapping):
+            del parent[token]
+
+        if isinstance(parent, MutableSequence):
+            parent.pop(int(token))
+    except Exception as error:
+        raise Error(*error.args)
+    return doc
+
+
+def add_value(doc, pointer, value):
+    parent, obj = None, doc
+    for token in parse_tokens(pointer):
+        found, event = token.lookup(obj, bypass_ref=True)
+        if event is None:
+            parent, obj = obj, found
+            continue
+        if event not in (OutOfBounds, OutOfRange, LastElement):
+            # raises the event
+            token.extract(obj, bypass_ref=True)
+        if not token.last:
+            raise NonexistentTarget(obj)
+        break
+    else:
+        if isinstance(parent, MutableSequence):
+            event, obj = OutOfRange, parent
+        elif isinstance(parent, Mapping):
+            event, obj = OutOfBounds, parent
+        else:
+            raise Error("already setted")
+
+    if event is OutOfBounds:
+        obj[str(token)] = value
+    elif event is OutOfRange:
+        obj.insert(int(token), value)
+    else:
+        obj.append(value)
+    return doc
+
+
+def replace_value(doc, pointer, value):
+    parent, obj = None, doc
+    try:
+        # fetching
+        tokens = parse_tokens(pointer)
+        if not tokens:
+            # replaces the whole document
+            return value
+        for token in tokens:
+            parent, obj = obj, token.extract(obj, bypass_ref=True)
+
+        # replace
+        if isinstance(parent, Mapping):
+            parent[token] = value
+
+        if isinstance(parent, MutableSequence):
+            parent[int(token)] = value
+    except Exception as error:
+        raise Error(*error.args)
+    return doc
+
+
+def move_value(doc, dest, src):
+    # fetching
+    parent, fragment = None, doc
+    for token in parse_tokens(src):
+        parent, fragment = fragment, token.extract(fragment, bypass_ref=True)
+
+    # removing, then adding. the fragment is restored when dest is not
+    # reachable, so that doc is untouched.
+    if isinstance(parent, MutableSequence):
+        index = int(token)
+        del parent[index]
+        try:
+            return add_value(doc, dest, fragment)
+        except Exception:
+            parent.insert(index, fragment)
+            raise
+
+    if isinstance(parent, Mapping):
+        del parent[token]
+        try:
+            return add_value(doc, dest, fragment)
+        except Exception:
+            parent[token] = fragment
+            raise
+
+    return add_value(doc, dest, fragment)
+
+
+def copy_value(doc, dest, src):
+    fragment = doc
+    for token in parse_tokens(src):
+        fragment = token.extract(fragment, bypass_ref=True)
+
+    return add_value(doc, dest, deepcopy(fragment))
+
+
+#: members required by each operation, besides op and path
+operation_members = {
+    "add": ("value",),
+    "remove": (),
+    "replace": ("value",),
+    "move": ("from",),
+    "copy": ("from",),
+    "test": ("value",),
+}
+
+
+def validate_operation(operation):
+    """Checks that operation is well formed.
+
+    :raises Error: operation is malformed
+    """
+    try:
+        members = operation_members[operation["op"]]
+        for member in ("path",) + members:
+            value = operation[member]
+            if member != "value" and not isinstance(value, str):
+                # pointers are strings
+                raise TypeError(member)
+    except (KeyError, TypeError):
+        raise Error("{!r} is not a valid operation".format(operation))
+
+
+def apply_operation(doc, operation, detach=deepcopy):
+    """Applies a single JSON Patch operation to doc.
+
+    :param detach: applied to the values inserted into doc
+    """
+    validate_operation(operation)
+    op, path = operation["op"], operation["path"]
+    try:
+        if op == "add":
+            return add_value(doc, path, detach(operation["value"]))
+        if op == "remove":
+            return remove_value(doc, path)
+        if op == "replace":
+            return replace_value(doc, path, detach(operation["value"]))
+        if op == "move":
+            return move_value(doc, path, operation["from"])
+        if op == "copy":
+            return copy_value(doc, path, operation["from"])
+        if not check_value(doc, path, operation["value"], raise_onerror=True):
+            raise Error("{!r} does not match {!r}".format(path, operation))
+        return doc
+    except (ExtractError, TypeError) as error:
+        raise Error("{!r} cannot be applied".format(operation), *error.args)
@@ -0,0 +1,276 @@
+"""
+    jsonspec.operations.diff
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Computes the JSON Patch that transforms a document into another.
+
+"""
+
+__all__ = ["diff"]
+
+import logging
+from collections.abc import Mapping, Sequence
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
+
+logger = logging.getLogger(__name__)
+
+#: above this product of lengths, the members between two anchors are
+#: compared by position instead of being matched
+MATCH_LIMIT = 10000
+
+
+class LimitReached(Exception):
+    pass
+
+
+def diff(old, new, limit=None, moves=True):
+    """Computes the operations that transform old into new.
+
+    :param old: the original document
+    :param new: the expected document
+    :param limit: when the patch needs more operations, a single replace
+                  of the whole document is returned instead
+    :type limit: int
+    :param moves: detect members relocated from an object to another
+    :type moves: bool
+    :return: a JSON Patch, see :func:`apply_patch`
+    :rtype: list
+
+    Equal subtrees are skipped by their structural hash, which is computed
+    once per node. Common heads and tails of sequences are skipped, and
+    what remains is matched by their members hashes.
+
+    Values of the operations are members of new, they are not copied.
+    """
+    differ = Differ(limit)
+    try:
+        differ.compare(old, new, "", True)
+    except LimitReached:
+        logger.debug("more than %s operations", limit)
+        return [{"op": "replace", "path": "", "value": new}]
+    if moves:
+        differ.detect_moves()
+    return differ.operations
+
+
+def match(old, new):
+    """Matches two sequences of hashes, and returns the opcodes that
+    transform old into new, like :meth:`difflib.SequenceMatcher.get_opcodes`.
+
+    Hashes that are unique in both sequences are anchors, the longest
+    increasing sequence of them is kept. Members between two anchors are
+    matched by :class:`~difflib.SequenceMatcher` when they are few, or by
+    position otherwise.
+    """
+    anchors = [(-1, -1)] + unique_anchors(old, new) + [(len(old), len(new))]
+    opcodes = []
+    for (i0, j0), (i1, j1) in zip(anchors, anchors[1:]):
+        i0, j0 = i0 + 1, j0 + 1
+        if i0 < i1 or j0 < j1:
+            if (i1 - i0) * (j1 - j0) <= MATCH_LIMIT:
+                matcher = SequenceMatcher(None, old[i0:i1], new[j0:j1], False)
+                for tag, a1, a2, b1, b2 in matcher.get_opcodes():
+                    opcodes.append((tag, i0 + a1, i0 + a2, j0 + b1, j0 + b2))
+            else:
+                opcodes.append(("replace", i0, i1, j0, j1))
+        if i1 < len(old):
+            opcodes.append(("equal", i1, i1 + 1, j1, j1 + 1))
+    return opcodes
+
+
+def unique_anchors(old, new):
+    old_counts, new_counts = Counter(old), Counter(new)
+    positions = {
+        value: position for position, value in enumerate(new) if new_counts[value] == 1
+    }
+    pairs = [
+        (i, positions[value])
+        for i, value in enumerate(old)
+        if old_counts[value] == 1 and value in positions
+    ]
+
+    # longest increasing subsequence of new positions, by patience sorting
+    tails, values, links = [], [], []
+    for index, (_, j) in enumerate(pairs):
+        slot = bisect_left(values, j)
+        links.append(tails[slot - 1] if slot else None)
+        if slot == len(tails):
+            tails.append(index)
+            values.append(j)
+        else:
+            tails[slot] = index
+            values[slot] = j
+    result = []
+    index = tails[-1] if tails else None
+    while index is not None:
+        result.append(pairs[index])
+        index = links[index]
+    result.reverse()
+    return result
+
+
+#: types that are hashed directly
+scalar_types = {str, int, float, bool, type(None)}
+
+
+def escape(member):
+    return str(member).replace("~", "~0").replace("/", "~1")
+
+
+def is_sequence(obj):
+    return isinstance(obj, Sequence) and not isinstance(obj, str)
+
+
+def is_subtree(obj):
+    return isinstance(obj, (Mapping, list)) and len(obj) > 0
+
+
+class Differ:
+    """
+    :ivar operations: the operations computed so far
+    :ivar digests: structural hashes of containers, by identity
+    :ivar removed: removed subtrees, that may be moved instead
+    :ivar added: added subtrees, that may be moved from elsewhere
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.operations = []
+        self.digests = {}
+        self.removed = []
+        self.added = []
+
+    def digest(self, obj):
+        """Hashes obj from the hashes of its members."""
+        cls = obj.__class__
+        if cls in scalar_types:
+            return hash((bool, obj)) if cls is bool else hash(obj)
+        try:
+            return self.digests[id(obj)]
+        except KeyError:
+            pass
+        if cls is dict or isinstance(obj, Mapping):
+            members = frozenset((key, self.digest(value)) for key, value in obj.items())
+            digest = hash((dict, members))
+        elif cls is list or is_sequence(obj):
+            digest = hash((list, tuple(self.digest(value) for value in obj)))
+        else:
+            return hash(obj)
+        self.digests[id(obj)] = digest
+        return digest
+
+    def same(self, old, new):
+        if old is new:
+            return True
+        return self.digest(old) == self.digest(new) and old == new
+
+    def emit(self, operation):
+        self.operations.append(operation)
+        if self.limit is not None and len(self.operations) > self.limit:
+            raise LimitReached
+
+    def add(self, path, value):
+        if is_subtree(value):
+            self.added.append((len(self.operations), path, value))
+        self.emit({"op": "add", "path": path, "value": value})
+
+    def remove(self, path, value, keyed):
+        if keyed and is_subtree(value):
+            self.removed.append((len(self.operations), path, value))
+        self.emit({"op": "remove", "path": path})
+
+    def compare(self, old, new, path, keyed):
+        """
+        :param keyed: path does not go through sequences, so it is not
+                      shifted by the other operations
+        """
+        if self.same(old, new):
+            return
+        if isinstance(old, Mapping) and isinstance(new, Mapping):
+            self.compare_mappings(old, new, path, keyed)
+        elif is_sequence(old) and is_sequence(new):
+            self.compare_sequences(old, new, path)
+        else:
+            self.emit({"op": "replace", "path": path, "value": new})
+
+    def compare_mappings(self, old, new, path, keyed):
+        for member, value in old.items():
+            if member not in new:
+                self.remove(path + "/" + escape(member), value, keyed)
+        for member, value in new.items():
+            location = path + "/" + escape(member)
+            if member in old:
+                self.compare(old[member], value, location, keyed)
+            else:
+                self.add(location, value)
+
+    def compare_sequences(self, old, new, path):
+        size = min(len(old), len(new))
+        start = 0
+        while start < size and self.same(old[start], new[start]):
+            start += 1
+        end = 0
+        while end < size - start and self.same(old[-1 - end], new[-1 - end]):
+            end += 1
+        old, new = old[start : len(old) - end], new[start : len(new) - end]
+
+        opcodes = match(
+            [self.digest(member) for member in old],
+            [self.digest(member) for member in new],
+        )
+
+        # once an opcode is applied, the sequence starts like new[:j2],
+        # and ends like old[i2:]
+        for tag, i1, i2, j1, j2 in opcodes:
+            index = start + j1
+            common = 0
+            if tag == "equal":
+                # members hashes may collide
+                for k in range(i2 - i1):
+                    location = "{}/{}".format(path, index + k)
+                    self.compare(old[i1 + k], new[j1 + k], location, False)
+            if tag == "replace":
+                common = min(i2 - i1, j2 - j1)
+                for k in range(common):
+                    location = "{}/{}".format(path, index + k)
+                    self.compare(old[i1 + k], new[j1 + k], location, False)
+            if tag in ("replace", "delete"):
+                for k in range(i1 + common, i2):
+                    location = "{}/{}".format(path, index + common)
+                    self.remove(location, old[k], False)
+            if tag in ("replace", "insert"):
+                for k in range(j1 + common, j2):
+                    location = "{}/{}".format(path, start + k)
+                    self.add(location, new[k])
+
+    def detect_moves(self):
+        """Replaces the adds of removed subtrees by moves.
+
+        Only subtrees removed from objects are moved: their location does
+        not depend on the operations applied between the remove and the add.
+        """
+        candidates = {}
+        for removal in self.removed:
+            candidates.setdefault(self.digest(removal[2]), []).append(removal)
+
+        dropped = set()
+        for position, path, value in self.added:
+            for removal in candidates.get(self.digest(value), []):
+                origin, source, removed = removal
+                if origin in dropped or removed != value:
+                    continue
+                if (path + "/").startswith(source + "/"):
+                    continue
+                if (source + "/").startswith(path + "/"):
+                    continue
+                self.operations[position] = {"op": "move", "from": source, "path": path}
+                dropped.add(origin)
+                break
+        if dropped:
+            self.operations = [
+                operation
+                for position, operation in enumerate(self.operations)
+                if position not in dropped
+            ]
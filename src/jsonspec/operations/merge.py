@@ -0,0 +1,94 @@
+"""
+    jsonspec.operations.merge
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Applies and computes JSON Merge Patches.
+
+"""
+
+__all__ = ["merge_value", "merge_diff"]
+
+from collections.abc import Mapping
+from copy import deepcopy
+
+from .diff import Differ, escape
+from .exceptions import Error
+
+
+def merge_value(doc, patch, detach=deepcopy, own=None):
+    """Applies a merge patch to doc, in a single pass over the patch.
+
+    :param doc: the document base
+    :param patch: the merge patch
+    :param detach: applied to the values inserted into doc
+    :param own: applied to the objects of doc before modifying them, for
+                example :func:`copy.copy`. They are modified directly
+                when None.
+    :return: the resulting document
+
+    Only the objects along the members of the patch are visited, every
+    other member of doc is left as is.
+    """
+    if not isinstance(patch, Mapping):
+        return detach(patch)
+    if not isinstance(doc, Mapping):
+        doc = {}
+    elif own is not None:
+        doc = own(doc)
+    for member, value in patch.items():
+        if value is None:
+            doc.pop(member, None)
+        elif isinstance(value, Mapping):
+            doc[member] = merge_value(doc.get(member), value, detach, own)
+        else:
+            doc[member] = detach(value)
+    return doc
+
+
+def merge_diff(old, new):
+    """Computes the merge patch that transforms old into new.
+
+    :param old: the original document
+    :param new: the expected document
+    :return: the merge patch
+    :raises Error: new has null members, a merge patch cannot set them
+    """
+    return MergeDiffer().compare(old, new)
+
+
+class MergeDiffer(Differ):
+    def compare(self, old, new):
+        if isinstance(old, Mapping) and isinstance(new, Mapping):
+            return self.compare_mappings(old, new, "")
+        return self.value(new, "")
+
+    def compare_mappings(self, old, new, path):
+        patch = {member: None for member in old if member not in new}
+        for member, value in new.items():
+            location = path + "/" + escape(member)
+            if member not in old:
+                patch[member] = self.value(value, location)
+            elif self.same(old[member], value):
+                continue
+            elif isinstance(old[member], Mapping) and isinstance(value, Mapping):
+                patch[member] = self.compare_mappings(old[member], value, location)
+            else:
+                patch[member] = self.value(value, location)
+        return patch
+
+    def value(self, value, path):
+        """Checks that the patch sets value as is.
+
+        Merge patches remove null members, so they cannot set them.
+        """
+        pending = [(path, value)]
+        while pending:
+            location, obj = pending.pop()
+            if obj is None and location:
+                raise Error("{} is null, a merge patch cannot set it".format(location))
+            if isinstance(obj, Mapping):
+                pending.extend(
+                    (location + "/" + escape(member), child)
+                    for member, child in obj.items()
+                )
+        return value
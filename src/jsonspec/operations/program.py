@@ -0,0 +1,262 @@
+"""
+    jsonspec.operations.program
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compiles a JSON Patch once, and applies it to many documents.
+
+"""
+
+__all__ = ["Outcome", "PatchProgram", "compile_patch", "apply_to_many"]
+
+import logging
+from collections import namedtuple
+from copy import deepcopy
+
+from jsonspec.pointer import ExtractError
+from jsonspec.pointer.bases import ChildToken
+
+from .bases import (
+    add_value,
+    check_value,
+    copy_paths,
+    copy_value,
+    move_value,
+    parse_tokens,
+    remove_value,
+    replace_value,
+    scalar_types,
+    validate_operation,
+)
+from .exceptions import Error
+
+logger = logging.getLogger(__name__)
+
+
+class Outcome(namedtuple("Outcome", "document error")):
+    """
+    Outcome of one document of :meth:`PatchProgram.apply_many`.
+
+    :ivar document: the patched document, or the original one when the
+                    patch failed
+    :ivar error: the :class:`~jsonspec.operations.Error` raised, None when
+                 the patch applied
+    """
+
+    __slots__ = ()
+
+    @property
+    def applied(self):
+        return self.error is None
+
+
+class PatchProgram:
+    """
+    A JSON Patch validated and parsed once, that applies to many documents.
+
+    Operations are turned into steps bound to their parsed pointers, so
+    that applying the patch neither parses nor dispatches anything.
+
+    Tests that do not depend on any previous operation are checked against
+    the original document, before it is copied: documents that do not
+    match fail without any copy.
+
+    :ivar operations: the operations, as given
+    :ivar checks: the tests checked before any modification
+    :ivar steps: the other operations, in order
+    """
+
+    def __init__(self, operations, share=False, inplace=False):
+        if share and inplace:
+            raise ValueError("share and inplace are exclusive")
+        self.share = share
+        self.inplace = inplace
+        self.operations = list(operations)
+        self.checks = []
+        self.steps = []
+
+        modified = []
+        for operation in self.operations:
+            validate_operation(operation)
+            pointers = [
+                compile_tokens(operation[key])
+                for key in ("from", "path")
+                if key in operation
+            ]
+            step = self.step(operation, *pointers)
+            if operation["op"] == "test":
+                if all(independent(pointers[0], other) for other in modified):
+                    self.checks.append(step)
+                    continue
+                pointers = []
+            else:
+                modified.extend(pointers)
+            if share:
+                step = shared(step, pointers)
+            self.steps.append(step)
+        logger.debug(
+            "compiled %s operations, %s checked first",
+            len(self.operations),
+            len(self.checks),
+        )
+
+    def step(self, operation, *pointers):
+        """Binds operation to its parsed pointers.
+
+        :return: a function that applies operation to a document
+        """
+        op = operation["op"]
+        path = pointers[-1]
+        src = pointers[0]
+        value = operation.get("value")
+        # every document gets its own copy of the containers
+        detach = None if value.__class__ in scalar_types else deepcopy
+
+        if op == "test":
+
+            def apply(doc):
+                if not check_value(doc, path, value, raise_onerror=True):
+                    raise Error(
+                        "{!r} does not match {!r}".format(operation["path"], operation)
+                    )
+                return doc
+
+        elif op == "add":
+
+            def apply(doc):
+                return add_value(doc, path, detach(value) if detach else value)
+
+        elif op == "replace":
+
+            def apply(doc):
+                return replace_value(doc, path, detach(value) if detach else value)
+
+        elif op == "remove":
+
+            def apply(doc):
+                return remove_value(doc, path)
+
+        elif op == "move":
+
+            def apply(doc):
+                return move_value(doc, path, src)
+
+        else:
+
+            def apply(doc):
+                return copy_value(doc, path, src)
+
+        return apply
+
+    def __call__(self, doc):
+        """Applies the patch to doc.
+
+        :param doc: the document base
+        :return: the new object
+        :raises Error: the patch cannot be applied
+        """
+        try:
+            for check in self.checks:
+                check(doc)
+            if self.share:
+                copied = set()
+                for step in self.steps:
+                    doc = step(doc, copied)
+                return doc
+            if not self.inplace:
+                doc = deepcopy(doc)
+            for step in self.steps:
+                doc = step(doc)
+            return doc
+        except (ExtractError, TypeError) as error:
+            raise Error("patch cannot be applied", *error.args)
+
+    def apply_many(self, documents):
+        """
+        Applies the patch to many documents, lazily.
+
+        Documents that cannot be patched do not raise, their error is
+        yielded instead.
+
+        :param documents: the documents, it may be a generator
+        :return: an :class:`Outcome` per document, in the same order
+        """
+        for doc in documents:
+            try:
+                yield Outcome(self(doc), None)
+            except Error as error:
+                yield Outcome(doc, error)
+
+    def __repr__(self):
+        return "<{}({} operations)>".format(
+            self.__class__.__name__, len(self.operations)
+        )
+
+
+def shared(step, pointers):
+    """Copies the containers along pointers before applying step.
+
+    :param pointers: the locations modified by step
+    """
+
+    def apply(doc, copied):
+        if pointers:
+            doc = copy_paths(doc, pointers, copied)
+        return step(doc)
+
+    return apply
+
+
+def compile_tokens(pointer):
+    try:
+        return parse_tokens(pointer)
+    except (ValueError, TypeError, AttributeError) as error:
+        raise Error("{!r} is not a valid pointer".format(pointer), *error.args)
+
+
+def independent(tokens, other):
+    """Tells if the locations of tokens and other never overlap.
+
+    They must differ by a member of the same object. Indexes of sequences
+    may be shifted by the operations, and stages are relative.
+    """
+    for token, other_token in zip(tokens, other):
+        if token == other_token and token.__class__ is other_token.__class__:
+            continue
+        return all(
+            isinstance(value, ChildToken) and value.index is None and value != "-"
+            for value in (token, other_token)
+        )
+    # one of them contains the other
+    return False
+
+
+def compile_patch(operations, share=False, inplace=False):
+    """Compiles a JSON Patch, to apply it to many documents.
+
+    :param operations: the operations, for example
+                       ``{'op': 'add', 'path': '/foo', 'value': 42}``
+    :type operations: list
+    :param share: copy only the containers along the paths, and share the
+                  other members with each document
+    :param inplace: modify documents directly and return them
+    :return: a callable that applies the patch to a document
+    :rtype: PatchProgram
+    :raises Error: an operation is malformed
+    """
+    return PatchProgram(operations, share, inplace)
+
+
+def apply_to_many(documents, operations, share=False, inplace=False):
+    """Applies a JSON Patch to many documents, lazily.
+
+    :param documents: the documents, it may be a generator
+    :param operations: the operations, or a :class:`PatchProgram`
+    :param share: copy only the containers along the paths, and share the
+                  other members with each document
+    :param inplace: modify documents directly and return them
+    :return: an :class:`Outcome` per document, in the same order
+    :raises Error: an operation is malformed
+    """
+    if not isinstance(operations, PatchProgram):
+        operations = compile_patch(operations, share, inplace)
+    return operations.apply_many(documents)
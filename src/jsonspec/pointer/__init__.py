@@ -9,10 +9,13 @@
 
 __all__ = [
     "extract",
+    "extract_many",
     "stage",
     "DocumentPointer",
     "Pointer",
+    "PointerSet",
     "PointerToken",
+    "Missing",
     "ExtractError",
     "RefError",
     "LastElement",
@@ -34,6 +37,7 @@ from .exceptions import (
     WrongType,
 )
 from .stages import stage
+from .trie import Missing, PointerSet, extract_many
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +10,7 @@ __all__ = ["DocumentPointer", "Pointer", "PointerToken"]
 import logging
 from abc import ABCMeta, abstractmethod
 from collections.abc import Mapping, Sequence
+from functools import lru_cache
 
 from .exceptions import (
     ExtractError,
@@ -89,43 +90,25 @@ class Pointer:
     """Defines a pointer
 
     :ivar tokens: list of PointerToken
+    :ivar path: tuple of decoded members and their integer index, None
+                when the pointer starts with a relative stage
     """
 
     def __init__(self, pointer):
         """
         :param pointer: a string or Pointer instance
         """
-        self.tokens = self.parse(pointer)
-
-        if self.tokens:
-            self.tokens[-1].last = True
+        if isinstance(pointer, Pointer):
+            tokens, self.path = pointer.tokens, pointer.path
+        else:
+            tokens, self.path = compile_pointer(pointer)
+        self.tokens = list(tokens)
 
     def parse(self, pointer):
         """parse pointer into tokens"""
         if isinstance(pointer, Pointer):
             return pointer.tokens[:]
-        elif pointer == "":
-            return []
-
-        tokens = []
-        staged, _, children = pointer.partition("/")
-        if staged:
-            try:
-                token = StagesToken(staged)
-                token.last = False
-                tokens.append(token)
-            except ValueError:
-                raise ParseError("pointer must start with / or int", pointer)
-
-        if _:
-            for part in children.split("/"):
-                part = part.replace("~1", "/")
-                part = part.replace("~0", "~")
-                token = ChildToken(part)
-                token.last = False
-                tokens.append(token)
-
-        return tokens
+        return list(compile_pointer(pointer)[0])
 
     def extract(self, obj, bypass_ref=False):
         """
@@ -134,6 +117,30 @@ class Pointer:
         :param obj: the object source
         :param bypass_ref: disable JSON Reference errors
         """
+        path = self.path
+        if path is not None:
+            # plain dicts and lists are walked without any token dispatch
+            found = obj
+            for member, index in path:
+                cls = found.__class__
+                if cls is dict:
+                    if member not in found or not bypass_ref and "$ref" in found:
+                        break
+                    found = found[member]
+                elif cls is list and index is not None and index < len(found):
+                    found = found[index]
+                else:
+                    break
+            else:
+                if (
+                    bypass_ref
+                    or not path
+                    or found.__class__ is not dict
+                    or "$ref" not in found
+                ):
+                    return found
+
+        # stages, other containers and errors are handled by tokens
         for token in self.tokens:
             obj = token.extract(obj, bypass_ref)
         return obj
@@ -162,6 +169,47 @@ class Pointer:
         return "<{}({!r})>".format(self.__class__.__name__, self.__str__())
 
 
+@lru_cache(maxsize=1024)
+def compile_pointer(pointer):
+    """Parses pointer into its tokens and its path.
+
+    Parsed pointers are kept in a bounded LRU cache, so parsing again the
+    same pointer is a lookup.
+
+    :param pointer: the pointer to parse
+    :type pointer: str
+    :return: tuple of tokens, and path or None
+    :rtype: tuple
+    """
+    if pointer == "":
+        return (), ()
+
+    tokens = []
+    path = []
+    staged, _, children = pointer.partition("/")
+    if staged:
+        try:
+            token = StagesToken(staged)
+            token.last = False
+            tokens.append(token)
+        except ValueError:
+            raise ParseError(pointer, "pointer must start with / or int")
+        path = None
+
+    if _:
+        for part in children.split("/"):
+            part = part.replace("~1", "/")
+            part = part.replace("~0", "~")
+            token = ChildToken(part)
+            token.last = False
+            tokens.append(token)
+            if path is not None:
+                path.append((part, token.index))
+
+    tokens[-1].last = True
+    return tuple(tokens), None if path is None else tuple(path)
+
+
 class PointerToken(str, metaclass=ABCMeta):
     """
     A single token
@@ -177,6 +225,20 @@ class PointerToken(str, metaclass=ABCMeta):
         """
         pass
 
+    def lookup(self, obj, bypass_ref=False):
+        """
+        Extract like :meth:`extract`, but report failures instead of raising.
+
+        :param obj: the object source
+        :param bypass_ref: disable JSON Reference errors
+        :return: the subelement and None, or the faulty object and the
+                 class of the event :meth:`extract` would raise
+        """
+        try:
+            return self.extract(obj, bypass_ref), None
+        except ExtractError as error:
+            return error.obj, error.__class__
+
 
 class StagesToken(PointerToken):
     """
@@ -215,8 +277,13 @@ class StagesToken(PointerToken):
 class ChildToken(PointerToken):
     """
     A child token
+
+    :ivar index: the integer value of the token, None if it is not an index
     """
 
+    def __init__(self, value, *args, **kwargs):
+        self.index = int(self) if self.isdigit() and self.isascii() else None
+
     def extract(self, obj, bypass_ref=False):
         """
         Extract subelement from obj, according to current token.
@@ -225,51 +292,82 @@ class ChildToken(PointerToken):
         :param bypass_ref: disable JSON Reference errors
         """
         try:
-            if isinstance(obj, Mapping):
-                if not bypass_ref and "$ref" in obj:
-                    raise RefError(obj, "presence of a $ref member")
-                obj = self.extract_mapping(obj)
-            elif isinstance(obj, Sequence) and not isinstance(obj, str):
-                obj = self.extract_sequence(obj)
-            else:
-                raise WrongType(
-                    obj, "{!r} does not apply " "for {!r}".format(str(self), obj)
-                )
-
-            if isinstance(obj, Mapping):
-                if not bypass_ref and "$ref" in obj:
-                    raise RefError(obj, "presence of a $ref member")
-            return obj
-        except ExtractError as error:
-            logger.exception(error)
-            raise
+            found, event = self.lookup(obj, bypass_ref)
         except Exception as error:
-            logger.exception(error)
+            logger.debug(error)
             args = [arg for arg in error.args if arg not in (self, obj)]
             raise ExtractError(obj, *args)
+        if event is None:
+            return found
+
+        if event is RefError:
+            message = "presence of a $ref member"
+        elif event is OutOfBounds:
+            message = "member {!r} not found".format(str(self))
+        elif event is OutOfRange:
+            message = "element {!r} not found".format(str(self))
+        elif event is LastElement:
+            message = "last element is needed"
+        elif is_sequence(found):
+            message = "{!r} does not apply for sequence".format(str(self))
+        else:
+            message = "{!r} does not apply for {!r}".format(str(self), found)
+        logger.debug(message)
+        raise event(found, message)
 
-    def extract_mapping(self, obj):
-        if self in obj:
-            return obj[self]
-
-        if self.isdigit():
-            key = int(self)
-            if key in obj:
-                return obj[key]
+    def lookup(self, obj, bypass_ref=False):
+        """
+        Extract subelement from obj, without raising when it is missing.
 
-        raise OutOfBounds(obj, "member {!r} not found".format(str(self)))
+        :param obj: the object source
+        :param bypass_ref: disable JSON Reference errors
+        :return: the subelement and None, or the faulty object and the
+                 class of the event :meth:`extract` would raise
+        """
+        if is_mapping(obj):
+            if not bypass_ref and "$ref" in obj:
+                return obj, RefError
+            if self in obj:
+                obj = obj[self]
+            elif self.index is not None and self.index in obj:
+                obj = obj[self.index]
+            else:
+                return obj, OutOfBounds
+        elif is_sequence(obj):
+            if self.index is None:
+                return obj, LastElement if self == "-" else WrongType
+            if self.index >= len(obj):
+                return obj, OutOfRange
+            obj = obj[self.index]
+        else:
+            return obj, WrongType
 
-    def extract_sequence(self, obj):
-        if self == "-":
-            raise LastElement(obj, "last element is needed")
-        if not self.isdigit():
-            raise WrongType(
-                obj, "{!r} does not apply " "for sequence".format(str(self))
-            )
-        try:
-            return obj[int(self)]
-        except IndexError:
-            raise OutOfRange(obj, "element {!r} not found".format(str(self)))
+        if not bypass_ref and is_mapping(obj) and "$ref" in obj:
+            return obj, RefError
+        return obj, None
 
     def __repr__(self):
         return "<{}({!r})>".format(self.__class__.__name__, str(self))
+
+
+#: types that are neither mappings nor sequences of members
+scalar_types = (str, int, float, bool, type(None))
+
+
+def is_mapping(obj):
+    cls = obj.__class__
+    if cls is dict:
+        return True
+    return cls is not list and cls not in scalar_types and isinstance(obj, Mapping)
+
+
+def is_sequence(obj):
+    cls = obj.__class__
+    if cls is list:
+        return True
+    return (
+        cls is not dict
+        and not isinstance(obj, str)
+        and cls not in scalar_types
+        and isinstance(obj, Sequence)
+    )
@@ -0,0 +1,134 @@
+"""
+    jsonspec.pointer.trie
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Extracts many pointers from a document in a single traversal.
+
+"""
+
+__all__ = ["Missing", "PointerSet", "extract_many"]
+
+from .bases import ChildToken, Pointer, is_mapping
+
+
+class MissingType:
+    """Marks pointers that do not match a document."""
+
+    def __repr__(self):
+        return "<Missing>"
+
+    def __reduce__(self):
+        return "Missing"
+
+
+#: the value of pointers that do not match the document
+Missing = MissingType()
+
+
+class Node:
+    __slots__ = ("token", "member", "index", "pointers", "children")
+
+    def __init__(self, token=None):
+        self.token = token
+        #: the member and the index of children tokens, for plain containers
+        self.member = str(token) if isinstance(token, ChildToken) else None
+        self.index = getattr(token, "index", None)
+        #: pointers that end on this node
+        self.pointers = []
+        self.children = {}
+
+
+class PointerSet:
+    """
+    A set of pointers, compiled into a prefix trie.
+
+    Pointers that share a prefix walk it only once:
+
+    >>> pointers = PointerSet(['/items/3/price', '/items/3/qty'])
+    >>> pointers.extract({'items': [...]})
+    {'/items/3/price': 12, '/items/3/qty': 1}
+
+    :ivar pointers: the pointers, as given
+    """
+
+    def __init__(self, pointers):
+        """
+        :param pointers: strings or Pointer instances
+        """
+        self.pointers = []
+        self.root = Node()
+        for pointer in pointers:
+            key = pointer if isinstance(pointer, str) else str(pointer)
+            node = self.root
+            for token in Pointer(pointer):
+                # stages and children tokens may have the same value
+                member = (token.__class__, str(token))
+                if member not in node.children:
+                    node.children[member] = Node(token)
+                node = node.children[member]
+            node.pointers.append(key)
+            self.pointers.append(key)
+
+    def extract(self, obj, bypass_ref=False):
+        """
+        Extract every pointer from obj.
+
+        :param obj: the object source
+        :param bypass_ref: disable JSON Reference errors
+        :return: the values by pointer, :data:`Missing` for the pointers
+                 that cannot be extracted
+        :rtype: dict
+        """
+        results = dict.fromkeys(self.pointers, Missing)
+        root = self.root
+        pending = [(root, obj)]
+        while pending:
+            node, obj = pending.pop()
+            if not bypass_ref and is_mapping(obj) and "$ref" in obj:
+                # only the whole document may be a reference
+                if node is root:
+                    for key in node.pointers:
+                        results[key] = obj
+                continue
+            for key in node.pointers:
+                results[key] = obj
+
+            cls = obj.__class__
+            for child in node.children.values():
+                index = child.index
+                if cls is dict and child.member in obj:
+                    pending.append((child, obj[child.member]))
+                elif cls is list and index is not None and index < len(obj):
+                    pending.append((child, obj[index]))
+                else:
+                    # stages, other containers and misses
+                    found, event = child.token.lookup(obj, bypass_ref)
+                    if event is None:
+                        pending.append((child, found))
+        return results
+
+    def __iter__(self):
+        return iter(self.pointers)
+
+    def __len__(self):
+        return len(self.pointers)
+
+    def __repr__(self):
+        return "<{}({!r})>".format(self.__class__.__name__, self.pointers)
+
+
+def extract_many(obj, pointers, bypass_ref=False):
+    """Extract many members or elements of obj, in a single traversal.
+
+    :param obj: the object source
+    :param pointers: the pointers, compiled once by :class:`PointerSet`
+    :type pointers: PointerSet, list
+    :param bypass_ref: bypass JSON Reference event
+    :type bypass_ref: boolean
+    :return: the values by pointer, :data:`Missing` for the pointers
+             that cannot be extracted
+    :rtype: dict
+    """
+    if not isinstance(pointers, PointerSet):
+        pointers = PointerSet(pointers)
+    return pointers.extract(obj, bypass_ref)
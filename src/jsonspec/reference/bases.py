@@ -30,7 +30,7 @@ class Registry(Provider, MutableMapping):
     """
 
     def __init__(self, provider=None):
-        self.provider = provider or {}
+        self.provider = provider if provider is not None else {}
         super(Registry, self).__init__()
 
     def prototype(self, dp):
@@ -87,7 +87,7 @@ class LocalRegistry(Registry):
 
     def __init__(self, doc, provider=None):
         self.doc = doc
-        self.provider = provider or {}
+        self.provider = provider if provider is not None else {}
 
     def prototype(self, dp):
         if dp.is_inner():
@@ -7,12 +7,15 @@ jsonspec.reference.providers
 import json
 import logging
 import os
+from collections import OrderedDict
 from pathlib import Path
+from threading import RLock
 
 from jsonspec._compat import load_entry_points
 
 from .bases import Provider
 from .exceptions import NotFound
+from .watcher import Changes, Watcher
 
 __all__ = ["Provider", "FilesystemProvider", "PkgProvider", "SpecProvider"]
 
@@ -87,13 +90,48 @@ class FilesystemProvider(Provider):
             baz/
                 quux.json   -> my:pref:baz/quux#
 
+    By default, every document is loaded on the first lookup. With
+    ``lazy=True``, only their names are indexed, and a document is parsed
+    the first time it is requested. At most ``maxsize`` parsed documents
+    are kept.
+
+    Lazily, documents are named by their path until they are parsed. A
+    lookup that misses parses the whole directory once, so that documents
+    named by their ``id`` are found. A manifest, written by
+    :meth:`build_manifest`, gives every name upfront, and is trusted
+    instead.
+
+    Documents are loaded once. :meth:`refresh` reloads the files that
+    changed since, and :meth:`watch` refreshes them in the background.
+
+    :ivar manifest: json file of names and their relative paths
+    :ivar maxsize: the maximum of documents kept lazily, None for unbounded
     """
 
-    def __init__(self, directory, prefix=None, aliases=None):
+    def __init__(
+        self,
+        directory,
+        prefix=None,
+        aliases=None,
+        lazy=False,
+        manifest=None,
+        maxsize=128,
+    ):
         self.directory = directory
         self.prefix = prefix or ""
         self.loaded = False
         self.aliases = aliases or {}
+        self.lazy = lazy or manifest is not None
+        self.manifest = manifest
+        self.maxsize = maxsize
+        self.scanned = False
+        self._index = None
+        self._documents = OrderedDict()
+        self._lock = RLock()
+        #: modification time and size of the files, when they were parsed
+        self._stats = {}
+        #: documents loaded eagerly, by filename
+        self._sources = {}
 
     def _spec_name(self, schema, filename):
         # Let's assume the schema knows its name more accurately than
@@ -101,51 +139,361 @@ class FilesystemProvider(Provider):
         if schema.get("id"):
             return schema["id"]
         else:
-            return filename.as_posix()[len(self.directory) : -5].lstrip("/")
+            return self._path_name(filename)
+
+    def _path_name(self, filename):
+        return filename.as_posix()[len(self.directory) : -5].lstrip("/")
+
+    def _filenames(self):
+        manifest = Path(self.manifest).resolve() if self.manifest else None
+        for filename in Path(self.directory).glob("**/*.json"):
+            if manifest is None or filename.resolve() != manifest:
+                yield filename
+
+    def _parse(self, filename):
+        stat = filename.stat()
+        with filename.open() as file:
+            schema = json.load(file)
+        self._stats[filename] = (stat.st_mtime_ns, stat.st_size)
+        return schema
 
     @property
     def data(self):
         if not self.loaded:
             data = {}
+            sources = {}
 
-            for filename in Path(self.directory).glob("**/*.json"):
-                with filename.open() as file:
-                    schema = json.load(file)
+            for filename in self._filenames():
+                schema = self._parse(filename)
 
                 # Let's assume the schema knows its name more accurately than
                 # its path can provide.
                 spec = self._spec_name(schema, filename)
                 data[spec] = schema
+                sources[filename] = schema
             # set the fallbacks
-            for spec in sorted(data.keys(), reverse=True):
-                if spec.startswith("draft-"):
-                    metaspec = spec.split("/", 1)[1]
-                    if metaspec not in data:
-                        data[metaspec] = data[spec]
+            fallbacks(data)
 
-            self._data = data
+            self._data, self._sources = data, sources
             self.loaded = True
         return self._data
 
-    def __getitem__(self, uri):
+    @property
+    def index(self):
+        """Names of the documents, and their filenames. Documents are not
+        parsed, unless the directory has been scanned.
+        """
+        if self._index is None:
+            if self.manifest:
+                with open(self.manifest) as file:
+                    manifest = json.load(file)
+                directory = Path(self.directory)
+                index = {spec: directory / path for spec, path in manifest.items()}
+            else:
+                index = {self._path_name(name): name for name in self._filenames()}
+                fallbacks(index)
+            self._index = index
+        return self._index
+
+    def build_manifest(self, filename=None):
+        """Parses every document, and returns their names and paths.
+
+        :param filename: where to write the manifest, as json
+        :return: the paths relative to the directory, by name
+        :rtype: dict
+        """
+        self.scan()
+        directory = Path(self.directory)
+        manifest = {
+            spec: path.relative_to(directory).as_posix()
+            for spec, path in sorted(self.index.items())
+        }
+        if filename:
+            with open(filename, "w") as file:
+                json.dump(manifest, file, indent=2)
+        return manifest
+
+    def scan(self):
+        """Parses every document once, to index them by their names."""
+        index = {}
+        for filename in self._filenames():
+            schema = self._parse(filename)
+            index[self._spec_name(schema, filename)] = filename
+            self._store(filename, schema)
+        fallbacks(index)
+        with self._lock:
+            self._index = index
+            self.scanned = True
+        logger.debug("scanned %s documents in %s", len(index), self.directory)
+
+    def _store(self, filename, schema):
+        with self._lock:
+            self._documents[filename] = schema
+            self._documents.move_to_end(filename)
+            if self.maxsize is not None:
+                while len(self._documents) > self.maxsize:
+                    self._documents.popitem(last=False)
+
+    def _fetch(self, spec):
+        with self._lock:
+            filename = self.index[spec]
+            try:
+                schema = self._documents[filename]
+            except KeyError:
+                pass
+            else:
+                self._documents.move_to_end(filename)
+                return schema
+
+        schema = self._parse(filename)
+        self._store(filename, schema)
+        if not self.manifest and not self.scanned:
+            name = self._spec_name(schema, filename)
+            if name != self._path_name(filename):
+                # the document is named by its id, not by its path
+                with self._lock:
+                    index = self.index
+                    for key in [
+                        key for key, value in index.items() if value == filename
+                    ]:
+                        del index[key]
+                    index[name] = filename
+                    fallbacks(index)
+                if index.get(spec) != filename:
+                    raise KeyError(spec)
+        return schema
+
+    def _lookup(self, spec):
+        if not self.lazy:
+            return self.data[spec]
+        try:
+            return self._fetch(spec)
+        except KeyError:
+            if self.manifest or self.scanned:
+                raise
+        self.scan()
+        return self._fetch(spec)
+
+    def _spec(self, uri):
         spec = uri
         if uri.startswith(self.prefix):
             spec = uri[len(self.prefix) :]
             if spec.endswith("#"):
                 spec = spec[:-1]
 
-        spec = self.aliases.get(spec, spec)
+        return self.aliases.get(spec, spec)
+
+    def __getitem__(self, uri):
         try:
-            return self.data[spec]
+            return self._lookup(self._spec(uri))
         except (KeyError, UnboundLocalError):
             raise NotFound(uri)
 
+    def source(self, uri):
+        """Tells which file a loaded document comes from.
+
+        :param uri: the uri of the document
+        :return: its filename, with its modification time and size when it
+                 was parsed, or None when it is not loaded
+        :rtype: tuple
+        """
+        spec = self._spec(uri)
+        with self._lock:
+            if self.lazy:
+                filename = (self._index or {}).get(spec)
+            else:
+                document = self._data.get(spec) if self.loaded else None
+                filename = next(
+                    (
+                        filename
+                        for filename, schema in self._sources.items()
+                        if schema is document
+                    ),
+                    None,
+                )
+            stat = self._stats.get(filename)
+        if stat is None:
+            return None
+        return (str(filename),) + stat
+
+    def _names(self):
+        if not self.lazy:
+            return self.data.keys()
+        if not self.manifest and not self.scanned:
+            self.scan()
+        return list(self.index.keys())
+
     def __iter__(self):
-        for spec in self.data.keys():
+        for spec in self._names():
             yield "{}{}#".format(self.prefix, spec)
 
     def __len__(self):
-        return len(self.data.keys())
+        return len(self._names())
+
+    def __bool__(self):
+        # counting the documents would scan a lazy directory
+        return True
+
+    def refresh(self, caches=None):
+        """Reloads the files added, changed or removed since they have been
+        loaded.
+
+        Only these files are parsed again, lookups keep being served
+        meanwhile. Then, every validator compiled with this provider is
+        dropped from caches, whether or not it refers to the files changed,
+        as references may be resolved lazily. Validators already held by
+        callers are left as they are, and may keep stale documents until
+        they are loaded again.
+
+        :param caches: the caches of validators to invalidate, defaults to
+                       :data:`~jsonspec.validators.default_cache`
+        :return: the files reloaded
+        :rtype: Changes
+        """
+        current = {}
+        for filename in self._filenames():
+            try:
+                stat = filename.stat()
+            except OSError:
+                continue
+            current[filename] = (stat.st_mtime_ns, stat.st_size)
+
+        if self.lazy:
+            known = set(self._index.values()) if self._index is not None else None
+        else:
+            known = set(self._sources) if self.loaded else None
+        if known is None:
+            # nothing loaded yet
+            return Changes([], [], [])
+
+        added = sorted(set(current) - known)
+        removed = sorted(known - set(current))
+        changed = sorted(
+            filename
+            for filename in known.intersection(current)
+            if self._stats.get(filename, current[filename]) != current[filename]
+        )
+        if self.lazy:
+            self._reindex(added, changed, removed)
+        else:
+            self._reload(added, changed, removed)
+        changes = Changes(
+            [str(filename) for filename in added],
+            [str(filename) for filename in changed],
+            [str(filename) for filename in removed],
+        )
+        if changes:
+            if caches is None:
+                from jsonspec.validators.cache import default_cache
+
+                caches = [default_cache]
+            for cache in caches:
+                cache.invalidate(provider=self)
+            logger.info("refreshed %s: %s", self.directory, changes)
+        return changes
+
+    def _reparse(self, filenames):
+        parsed = {}
+        for filename in filenames:
+            try:
+                parsed[filename] = self._parse(filename)
+            except (OSError, ValueError) as error:
+                # the file may be being written, it is parsed again later
+                logger.warning("cannot parse %s: %s", filename, error)
+        return parsed
+
+    def _reload(self, added, changed, removed):
+        parsed = self._reparse(added + changed)
+        with self._lock:
+            data, sources = dict(self._data), dict(self._sources)
+            for filename in removed + list(parsed):
+                previous = sources.pop(filename, None)
+                for spec in [spec for spec, value in data.items() if value is previous]:
+                    del data[spec]
+            for filename, schema in parsed.items():
+                data[self._spec_name(schema, filename)] = schema
+                sources[filename] = schema
+            fallbacks(data)
+            self._data, self._sources = data, sources
+        for filename in removed:
+            self._stats.pop(filename, None)
+
+    def _reindex(self, added, changed, removed):
+        # documents may be named by their id only when they are parsed
+        named = self.scanned or self.manifest
+        if named:
+            # any changed file may have gained, changed or lost its id
+            reparsed = added + changed
+        else:
+            with self._lock:
+                index = self._index
+                reparsed = [
+                    filename
+                    for filename in changed
+                    if any(
+                        value == filename and spec != self._path_name(filename)
+                        for spec, value in index.items()
+                    )
+                ]
+        parsed = self._reparse(reparsed)
+
+        with self._lock:
+            index = dict(self._index)
+            for filename in removed + list(parsed):
+                for spec in [
+                    spec for spec, value in index.items() if value == filename
+                ]:
+                    del index[spec]
+            for filename in removed + changed:
+                self._documents.pop(filename, None)
+            for filename in changed:
+                if filename not in parsed:
+                    self._stats.pop(filename, None)
+            for filename in added:
+                if filename not in parsed:
+                    index[self._path_name(filename)] = filename
+            for filename, schema in parsed.items():
+                index[self._spec_name(schema, filename)] = filename
+                self._store(filename, schema)
+            fallbacks(index)
+            self._index = index
+        for filename in removed:
+            self._stats.pop(filename, None)
+
+    def watch(self, interval=1.0, callback=None, caches=None, poll=False):
+        """Refreshes the documents in the background, whenever their files
+        change.
+
+        :param interval: seconds between two polls of the directory
+        :param callback: called with the :class:`Changes` of every refresh
+        :param caches: the caches of validators to invalidate
+        :param poll: poll the directory, even when inotify is available
+        :return: the running watcher, stop it with :meth:`Watcher.stop`
+        :rtype: Watcher
+        """
+        watcher = Watcher(self, interval, callback, caches, poll)
+        watcher.start()
+        return watcher
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+
+def fallbacks(data):
+    """Exposes draft documents by their names without the draft, unless
+    a document already has this name.
+    """
+    for spec in sorted(data.keys(), reverse=True):
+        if spec.startswith("draft-"):
+            metaspec = spec.split("/", 1)[1]
+            if metaspec not in data:
+                data[metaspec] = data[spec]
 
 
 class SpecProvider(FilesystemProvider):
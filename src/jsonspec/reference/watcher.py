@@ -0,0 +1,129 @@
+"""
+jsonspec.reference.watcher
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Reloads providers when their files change.
+
+"""
+
+import logging
+import os
+from collections import namedtuple
+from threading import Event, Thread
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+__all__ = ["Changes", "Watcher"]
+
+logger = logging.getLogger(__name__)
+
+
+class Changes(namedtuple("Changes", "added changed removed")):
+    """
+    Files reloaded by :meth:`FilesystemProvider.refresh`.
+
+    :ivar added: files that appeared
+    :ivar changed: files whose modification time or size changed
+    :ivar removed: files that disappeared
+    """
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return any((self.added, self.changed, self.removed))
+
+
+class Watcher(Thread):
+    """
+    Refreshes a provider in the background, whenever its directory changes.
+
+    Changes are notified by inotify when `inotify_simple`_ is installed,
+    the directory is polled every ``interval`` seconds otherwise.
+
+    :ivar provider: the provider to refresh
+    :ivar interval: seconds between two polls
+    :ivar callback: called with the :class:`Changes` of every refresh
+    :ivar caches: the caches of the validators to invalidate
+
+    .. _`inotify_simple`: https://pypi.org/project/inotify-simple/
+    """
+
+    def __init__(self, provider, interval=1.0, callback=None, caches=None, poll=False):
+        super().__init__(name="watcher {}".format(provider.directory), daemon=True)
+        self.provider = provider
+        self.interval = interval
+        self.callback = callback
+        self.caches = caches
+        self.poll = poll or INotify is None
+        self.watched = {}
+        self.stopped = Event()
+
+    def run(self):
+        notifier = None if self.poll else self.notifier()
+        try:
+            while not self.stopped.is_set():
+                if notifier is None:
+                    if self.stopped.wait(self.interval):
+                        break
+                else:
+                    events = notifier.read(
+                        timeout=int(self.interval * 1000), read_delay=50
+                    )
+                    if not events:
+                        continue
+                    self.forget(events)
+                    self.watch(notifier)
+                self.refresh()
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def refresh(self):
+        try:
+            changes = self.provider.refresh(self.caches)
+        except Exception as error:
+            logger.warning("cannot refresh %s: %s", self.provider.directory, error)
+            return
+        if changes and self.callback:
+            self.callback(changes)
+
+    def notifier(self):
+        notifier = INotify()
+        self.watch(notifier)
+        return notifier
+
+    def watch(self, notifier):
+        """Watches the directories that are not watched yet."""
+        mask = (
+            flags.CREATE
+            | flags.CLOSE_WRITE
+            | flags.DELETE
+            | flags.MOVED_FROM
+            | flags.MOVED_TO
+        )
+        for directory, _, _ in os.walk(self.provider.directory):
+            if directory not in self.watched:
+                self.watched[directory] = notifier.add_watch(directory, mask)
+
+    def forget(self, events):
+        """Forgets the directories that are not watched anymore."""
+        ignored = {event.wd for event in events if event.mask & flags.IGNORED}
+        for directory, descriptor in list(self.watched.items()):
+            if descriptor in ignored:
+                del self.watched[directory]
+
+    def stop(self, timeout=None):
+        """Stops watching, and waits for the thread to end."""
+        self.stopped.set()
+        self.join(timeout)
+
+    def __enter__(self):
+        if not self.is_alive():
+            self.start()
+        return self
+
+    def __exit__(self, type, value, tb):
+        self.stop()
@@ -4,21 +4,35 @@
 
 """
 
+from functools import partial
+
 from . import draft03  # noqa
 from . import draft04  # noqa
-from .bases import ReferenceValidator, Validator
+from .bases import ReferenceValidator, Result, Validator
+from .cache import ValidatorCache, default_cache
+from .codegen import CodeValidator, generate
 from .draft03 import Draft03Validator  # noqa
 from .draft04 import Draft04Validator  # noqa
 from .exceptions import CompilationError, ReferenceError, ValidationError
 from .factorize import Context, Factory, register
+from .linker import link
+from .parallel import Executor
+from .store import SchemaStore
 
 __all__ = [
     "load",
+    "link",
     "register",
     "Factory",
     "Context",
     "Validator",
     "ReferenceValidator",
+    "Result",
+    "CodeValidator",
+    "ValidatorCache",
+    "Executor",
+    "SchemaStore",
+    "default_cache",
     "Draft03Validator",
     "Draft04Validator",
     "CompilationError",
@@ -27,7 +41,9 @@ __all__ = [
 ]
 
 
-def load(schema, uri=None, spec=None, provider=None):
+def load(
+    schema, uri=None, spec=None, provider=None, backend=None, cache=None, eager=False
+):
     """Scaffold a validator against a schema.
 
     :param schema: the schema to compile into a Validator
@@ -41,6 +57,27 @@ def load(schema, uri=None, spec=None, provider=None):
     :param provider: the other schemas, in case of cross
                      referencing
     :type provider: Mapping, Provider...
+    :param backend: compile the validator with this backend.
+                    ``"codegen"`` generates specialized python functions,
+                    see :mod:`jsonspec.validators.codegen`
+    :type backend: str
+    :param cache: compiled validators are shared by default, or when
+                  True, see :data:`default_cache`. False disables caching.
+    :type cache: ValidatorCache, bool
+    :param eager: resolve every reference now, see :func:`link`.
+                  The codegen backend is always eager.
+    :type eager: bool
     """
-    factory = Factory(provider, spec)
-    return factory(schema, uri or "#")
+    factory = Factory(provider, spec, cache=cache)
+    validator = factory(schema, uri or "#")
+    if backend == "codegen":
+        return factory.cached(
+            schema, uri or "#", spec, partial(generate, validator), backend
+        )
+    elif backend:
+        raise CompilationError("{!r} backend not registered".format(backend), schema)
+    elif eager:
+        return factory.cached(
+            schema, uri or "#", spec, partial(link, validator), "linked"
+        )
+    return validator
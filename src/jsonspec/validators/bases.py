@@ -6,16 +6,41 @@
 
 import logging
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
+from copy import copy, deepcopy
 
 from jsonspec.pointer import DocumentPointer
 
-from .exceptions import ValidationError
+from .exceptions import Invalid, ValidationError
+from .pointer_util import pointer_join
 
-__all__ = ["ValidationError", "Validator", "ReferenceValidator"]
+__all__ = [
+    "ValidationError",
+    "Validator",
+    "ReferenceValidator",
+    "ValidationContext",
+    "CheckContext",
+    "Result",
+]
 
 logger = logging.getLogger(__name__)
 
 
+class Result(namedtuple("Result", "document errors")):
+    """
+    Outcome of one document of :meth:`Validator.validate_many`.
+
+    :ivar document: the validated document
+    :ivar errors: flattened errors, None when document is valid
+    """
+
+    __slots__ = ()
+
+    @property
+    def valid(self):
+        return self.errors is None
+
+
 class Validator(metaclass=ABCMeta):
     """
     The mother of Validators.
@@ -50,6 +75,60 @@ class Validator(metaclass=ABCMeta):
         """
         pass
 
+    def evaluate(self, obj, pointer, ctx):
+        """
+        Validate object without copying it.
+
+        obj is never mutated: the containers that must be changed,
+        for example to inject defaults, are shallow copied first.
+
+        :param obj: the object to validate
+        :param pointer: the object pointer
+        :param ctx: the context of this call
+        :type ctx: ValidationContext
+        """
+        return self.validate(obj, pointer)
+
+    def validate_many(self, iterable, pointer=None, copy=False):
+        """
+        Validate many objects, lazily.
+
+        Unlike :meth:`validate`, invalid objects do not raise, their
+        flattened errors are yielded instead.
+
+        :param iterable: the objects to validate, it may be a generator
+        :param pointer: the pointer of every object
+        :param copy: validate a deep copy of every object
+        :return: a :class:`Result` per object, in the same order
+        """
+        evaluate = self.evaluate
+        pointer = pointer or "#"
+        ctx = ValidationContext()
+        for obj in iterable:
+            if copy:
+                obj = deepcopy(obj)
+            ctx.reset()
+            try:
+                yield Result(evaluate(obj, pointer, ctx), None)
+            except ValidationError as error:
+                yield Result(obj, error.flatten())
+
+    def is_valid(self, obj):
+        """
+        Tells if object is valid, without telling why.
+
+        Validation stops on the first failure, obj is neither copied
+        nor mutated.
+
+        :param obj: the object to validate
+        :rtype: bool
+        """
+        try:
+            self.evaluate(obj, "#", CheckContext())
+        except ValidationError:
+            return False
+        return True
+
     def __call__(self, obj, pointer=None):
         """shortcut for validate()"""
         return self.validate(obj, pointer)
@@ -93,11 +172,108 @@ class ReferenceValidator(Validator):
     def is_optional(self):
         return self.validator.is_optional()
 
-    def validate(self, obj, pointer=None):
+    def validate(self, obj, pointer=None, copy=True):
         """
         Validate object against validator.
 
         :param obj: the object to validate
         :param pointer: the object pointer
+        :param copy: validate a deep copy of obj
         """
-        return self.validator.validate(obj, pointer)
+        return self.validator.validate(obj, pointer, copy)
+
+    def evaluate(self, obj, pointer, ctx):
+        return self.validator.evaluate(obj, pointer, ctx)
+
+    def validate_many(self, iterable, pointer=None, copy=False):
+        return self.validator.validate_many(iterable, pointer, copy)
+
+
+class ValidationContext:
+    """
+    Holds the state of a single validation call.
+
+    :ivar errors: the errors collected so far
+    :ivar fail_fast: raise on the first error instead of collecting it
+    """
+
+    def __init__(self, fail_fast=False):
+        self.errors = []
+        self.fail_fast = fail_fast
+        self.copied = None
+
+    def spawn(self):
+        """Returns a new context for a nested validation."""
+        return ValidationContext(self.fail_fast)
+
+    def reset(self):
+        """Makes the context reusable for another validation call."""
+        self.errors.clear()
+        self.copied = None
+
+    def assign(self, obj, key, value):
+        """
+        Set obj[key] to value.
+
+        obj is shallow copied the first time this context writes into it,
+        so that the validated document is never mutated.
+
+        :return: obj or its copy
+        """
+        if obj is not self.copied:
+            obj = self.copied = copy(obj)
+        obj[key] = value
+        return obj
+
+    def join(self, pointer, *parts):
+        """Returns the pointer of a member of obj."""
+        return pointer_join(pointer, *parts)
+
+    def fail(self, reason, obj, pointer=None):
+        """
+        Called when validation fails.
+        """
+        pointer = pointer_join(pointer)
+        err = ValidationError(reason, obj, pointer)
+        if self.fail_fast:
+            raise err
+        else:
+            self.errors.append(err)
+        return err
+
+    def catch_fail(self):
+        return FailCatcher(self)
+
+
+class CheckContext(ValidationContext):
+    """
+    Context of :meth:`Validator.is_valid`.
+
+    It stops on the first failure, and builds neither errors nor pointers.
+    """
+
+    def __init__(self):
+        super(CheckContext, self).__init__(fail_fast=True)
+
+    def spawn(self):
+        return CheckContext()
+
+    def join(self, pointer, *parts):
+        return pointer
+
+    def fail(self, reason, obj, pointer=None):
+        raise Invalid()
+
+
+class FailCatcher:
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, tb):
+        if isinstance(value, ValidationError) and not self.ctx.fail_fast:
+            self.ctx.errors.append(value)
+            return True
+        return False
@@ -0,0 +1,133 @@
+"""
+    jsonspec.validators.cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict, namedtuple
+from threading import RLock
+
+__all__ = ["CacheInfo", "ValidatorCache", "default_cache", "fingerprint"]
+
+logger = logging.getLogger(__name__)
+
+CacheInfo = namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+
+def fingerprint(schema):
+    """Computes the canonical hash of a schema.
+
+    Two schemas with the same content, regardless of the order of their
+    members, share the same fingerprint.
+
+    :param schema: the schema to hash
+    :type schema: Mapping
+    :return: the hexadecimal digest
+    :rtype: str
+    """
+    data = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class ValidatorCache:
+    """Bounded and thread-safe cache of compiled validators.
+
+    Least recently used validators are evicted once :attr:`maxsize` is
+    reached.
+
+    :ivar maxsize: the maximum of validators kept, None for unbounded
+    :ivar hits: number of lookups served by the cache
+    :ivar misses: number of lookups that needed a compilation
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = RLock()
+
+    def fetch(self, key, builder, *refs):
+        """Returns the cached validator for key, or builds it.
+
+        :param key: the cache key
+        :type key: tuple
+        :param builder: callable that compiles the validator
+        :param refs: objects that must live as long as the entry,
+                     for example the provider whose identity is in key
+        """
+        with self.lock:
+            try:
+                validator, _ = self.entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return validator
+
+        validator = builder()
+        with self.lock:
+            self.entries[key] = validator, refs
+            self.entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self.entries) > self.maxsize:
+                    evicted, _ = self.entries.popitem(last=False)
+                    logger.debug("evict %s", evicted)
+        return validator
+
+    def invalidate(self, schema=None, uri=None, provider=None):
+        """Drops cached validators.
+
+        Without arguments, every validator is dropped.
+        Otherwise, only validators matching all the given criteria are.
+
+        :param schema: the schema they have been compiled from
+        :type schema: Mapping
+        :param uri: the uri they have been compiled with
+        :type uri: str
+        :param provider: the provider they have been compiled with
+        :return: the number of validators dropped
+        :rtype: int
+        """
+        digest = fingerprint(schema) if schema is not None else None
+        with self.lock:
+            dropped = [
+                key
+                for key in self.entries
+                if (digest is None or key[0] == digest)
+                and (uri is None or key[1] == str(uri))
+                and (provider is None or key[3] == id(provider))
+            ]
+            for key in dropped:
+                del self.entries[key]
+            return len(dropped)
+
+    def clear(self):
+        """Drops every validator and resets the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        """Reports the cache statistics.
+
+        :rtype: CacheInfo
+        """
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __reduce__(self):
+        # compiled validators refer to their factory, and then to its cache.
+        # an empty cache is rebuilt when they are unpickled.
+        return ValidatorCache, (self.maxsize,)
+
+
+#: the cache shared by :func:`jsonspec.validators.load` and :class:`Factory`
+default_cache = ValidatorCache()
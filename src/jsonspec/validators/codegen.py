@@ -0,0 +1,649 @@
+"""
+    jsonspec.validators.codegen
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compiles validators into specialized python functions.
+
+    Every subschema becomes a plain function that only checks the keywords
+    the subschema declares, with its constants inlined.
+"""
+
+import logging
+import math
+from contextlib import contextmanager
+from copy import deepcopy
+from decimal import Decimal
+
+
+from . import draft03, draft04
+from .bases import ValidationContext, Validator
+from .exceptions import ValidationError
+from .linker import resolve
+from .util import has_duplicates
+
+__all__ = ["generate", "CodeValidator"]
+
+logger = logging.getLogger(__name__)
+
+sequence_types = (list, set, tuple)
+number_types = (int, float, Decimal)
+
+#: python expressions that tell if obj is of a JSON type
+type_checks = {
+    "array": "isinstance(obj, sequence_types)",
+    "boolean": "isinstance(obj, bool)",
+    "integer": "(isinstance(obj, int) and not isinstance(obj, bool))",
+    "null": "obj is None",
+    "number": "(isinstance(obj, number_types) and not isinstance(obj, bool))",
+    "object": "isinstance(obj, dict)",
+    "string": "isinstance(obj, str)",
+}
+
+
+def generate(validator):
+    """
+    Compiles a validator tree into python functions.
+
+    References are resolved while generating, so every subschema
+    is generated only once, even when it is recursive.
+
+    :param validator: the validator to compile, usually returned by
+                      :func:`jsonspec.validators.load`
+    :type validator: Validator
+    :return: the compiled validator
+    :rtype: CodeValidator
+    """
+    generator = Generator()
+    name = generator.function(validator)
+    source, namespace = generator.build()
+    target = resolve(validator)
+    return CodeValidator(
+        namespace[name],
+        source,
+        uri=target.uri,
+        default=target.default,
+        has_default=target.has_default(),
+        optional=True if isinstance(target, Draft04) else target.is_optional(),
+    )
+
+
+class CodeValidator(Validator):
+    """
+    Wraps a generated function.
+
+    :ivar function: the generated function
+    :ivar source: the generated source code
+    :ivar uri: uri of the current validator
+    """
+
+    def __init__(self, function, source, uri=None, default=None, **attrs):
+        super(CodeValidator, self).__init__(uri=uri)
+        self.function = function
+        self.source = source
+        self.default = default
+        self._has_default = attrs.get("has_default", False)
+        self._optional = attrs.get("optional", True)
+
+    def has_default(self):
+        return self._has_default
+
+    def is_optional(self):
+        return self._optional
+
+    def validate(self, obj, pointer=None, copy=True):
+        """
+        Validate object against validator
+
+        :param obj: the object to validate
+        :param pointer: the object pointer
+        :param copy: validate a deep copy of obj
+        """
+        if copy:
+            obj = deepcopy(obj)
+        return self.function(obj, pointer or "#", ValidationContext())
+
+    def evaluate(self, obj, pointer, ctx):
+        return self.function(obj, pointer, ctx)
+
+
+Draft03 = draft03.Draft03Validator
+Draft04 = draft04.Draft04Validator
+
+
+class Generator:
+    """
+    Writes the source of the functions.
+
+    :ivar namespace: globals of the generated module
+    :ivar lines: lines of the generated module
+    """
+
+    def __init__(self):
+        self.namespace = {
+            "Decimal": Decimal,
+            "ValidationError": ValidationError,
+            "deepcopy": deepcopy,
+            "has_duplicates": has_duplicates,
+            "logger": logger,
+            "number_types": number_types,
+            "sequence_types": sequence_types,
+        }
+        self.lines = []
+        self.level = 0
+        self.functions = {}
+        self.pending = []
+        self.kept = []
+        self.counter = 0
+        self.targets = {}
+
+    def build(self):
+        while self.pending:
+            name, validator = self.pending.pop(0)
+            if isinstance(validator, Draft04):
+                self.draft04(name, validator)
+            elif isinstance(validator, Draft03):
+                self.draft03(name, validator)
+            else:
+                # unknown validators are called as is
+                self.namespace[name] = validator.evaluate
+        source = "\n".join(self.lines) + "\n"
+        code = compile(source, "<jsonspec.validators.codegen>", "exec")
+        exec(code, self.namespace)
+        return source, self.namespace
+
+    def function(self, validator):
+        """Returns the name of the function that implements validator."""
+        validator = resolve(validator, self.targets)
+        if id(validator) not in self.functions:
+            self.counter += 1
+            name = "validate_{}".format(self.counter)
+            self.functions[id(validator)] = name
+            self.pending.append((name, validator))
+            self.kept.append(validator)
+        return self.functions[id(validator)]
+
+    def functions_tuple(self, validators):
+        """Returns a python expression of the tuple of their functions."""
+        return "({})".format("".join(self.function(v) + ", " for v in validators))
+
+    def constant(self, value):
+        """Returns a python expression of value."""
+        if value is None or isinstance(value, (bool, int, str)):
+            return repr(value)
+        if isinstance(value, float) and math.isfinite(value):
+            return repr(value)
+        self.counter += 1
+        name = "c{}".format(self.counter)
+        self.namespace[name] = value
+        return name
+
+    def write(self, line):
+        self.lines.append("    " * self.level + line)
+
+    @contextmanager
+    def block(self, line):
+        self.write(line)
+        self.level += 1
+        yield
+        self.level -= 1
+
+    @contextmanager
+    def function_block(self, name, validator):
+        self.write("")
+        self.write("")
+        with self.block("def {}(obj, pointer, ctx):".format(name)):
+            self.write("# {!r}".format(validator.uri))
+            yield
+            with self.block("if ctx.errors:"):
+                self.write(
+                    'raise ValidationError("multiple errors", obj, errors=ctx.errors)'
+                )
+            self.write("return obj")
+
+    @contextmanager
+    def catch_fail(self):
+        with self.block("try:"):
+            yield
+        with self.block("except ValidationError as error:"):
+            with self.block("if ctx.fail_fast:"):
+                self.write("raise")
+            self.write("ctx.errors.append(error)")
+
+    def fail(self, reason, pointer="pointer"):
+        self.write("ctx.fail({!r}, obj, {})".format(reason, pointer))
+
+    def call(self, validator, obj="obj", pointer="pointer"):
+        name = self.function(validator)
+        return "{}({}, {}, ctx.spawn())".format(name, obj, pointer)
+
+    def assign(self, value, key, element):
+        with self.block("if {} is not {}:".format(value, element)):
+            self.write("obj = ctx.assign(obj, {}, {})".format(key, value))
+
+    # shared keywords
+
+    def enum(self, validator):
+        if validator.enum is not None:
+            enum = self.constant(validator.enum)
+            with self.block("if obj not in {}:".format(enum)):
+                self.fail("Forbidden value")
+
+    def length(self, attrs, keyword, operator, reason):
+        if keyword in attrs:
+            limit = self.constant(attrs[keyword])
+            with self.block("if len(obj) {} {}:".format(operator, limit)):
+                self.fail(reason)
+
+    def multiple(self, attrs, keyword, reason):
+        if keyword in attrs:
+            factor = self.constant(Decimal(str(attrs[keyword])))
+            with self.block("if Decimal(str(obj)) % {} != 0:".format(factor)):
+                self.fail(reason)
+
+    def unique_items(self, attrs):
+        if attrs.get("unique_items"):
+            with self.block("if has_duplicates(obj):"):
+                self.fail("Elements must be unique")
+
+    def single_items(self, validator):
+        with self.block("for index, element in enumerate(obj):"):
+            with self.catch_fail():
+                call = self.call(validator, "element", "ctx.join(pointer, index)")
+                self.write("value = {}".format(call))
+            with self.block("else:"):
+                self.assign("value", "index", "element")
+
+    def format(self, validator, aliases):
+        name = validator.attrs["format"]
+        return self.constant(validator.formats[aliases.get(name, name)])
+
+    # draft04
+
+    def draft04(self, name, validator):
+        attrs = validator.attrs
+        with self.function_block(name, validator):
+            self.enum(validator)
+            if "type" in attrs:
+                checks = [
+                    type_checks.get(t) for t in attrs["type"] if isinstance(t, str)
+                ]
+                checks = [check for check in checks if check]
+                with self.block("if not ({}):".format(" or ".join(checks) or "False")):
+                    self.fail("Wrong type")
+            if "not" in attrs:
+                with self.block("try:"):
+                    self.write(self.call(attrs["not"]))
+                with self.block("except ValidationError:"):
+                    self.write("pass")
+                with self.block("else:"):
+                    self.fail("Forbidden value")
+            for sub in attrs.get("all_of", []):
+                self.write("obj = {}".format(self.call(sub)))
+            if "any_of" in attrs:
+                self.any_of(attrs["any_of"])
+            if "one_of" in attrs:
+                self.one_of(attrs["one_of"])
+
+            groups = [
+                (type_checks["array"], self.draft04_array),
+                (type_checks["number"], self.draft04_number),
+                (type_checks["object"], self.draft04_object),
+                (type_checks["string"], self.draft04_string),
+            ]
+            keyword = "if"
+            for check, group in groups:
+                position = len(self.lines)
+                with self.block("{} {}:".format(keyword, check)):
+                    group(validator)
+                if len(self.lines) == position + 1:
+                    # nothing to check for this type
+                    self.lines[position:] = []
+                else:
+                    keyword = "elif"
+
+    def any_of(self, validators):
+        functions = self.functions_tuple(validators)
+        with self.block("for function in {}:".format(functions)):
+            with self.block("try:"):
+                self.write("obj = function(obj, pointer, ctx.spawn())")
+                self.write("break")
+            with self.block("except ValidationError:"):
+                self.write("pass")
+        with self.block("else:"):
+            self.fail("Not in any_of")
+
+    def one_of(self, validators):
+        functions = self.functions_tuple(validators)
+        self.write("validated = 0")
+        with self.block("for function in {}:".format(functions)):
+            with self.block("try:"):
+                self.write("validated_obj = function(obj, pointer, ctx.spawn())")
+                self.write("validated += 1")
+            with self.block("except ValidationError:"):
+                self.write("pass")
+        with self.block("if not validated:"):
+            self.fail("Validates noone", None)
+        with self.block("elif validated == 1:"):
+            self.write("obj = validated_obj")
+        with self.block("else:"):
+            self.fail("Validates more than once", None)
+
+    def draft04_array(self, validator):
+        attrs = validator.attrs
+        items = attrs.get("items")
+        if isinstance(items, Validator):
+            self.single_items(items)
+        elif isinstance(items, (list, tuple)):
+            additionals = attrs["additional_items"]
+            functions = self.functions_tuple(items)
+            self.write("validated = list(obj)")
+            self.write("changed = False")
+            with self.block("for index, element in enumerate(validated):"):
+                with self.block("if index < {}:".format(len(items))):
+                    self.write("function = {}[index]".format(functions))
+                with self.block("else:"):
+                    if additionals is True:
+                        self.write("break")
+                    elif additionals is False:
+                        uri = self.constant(validator.uri)
+                        self.fail("Forbidden value", "ctx.join({}, index)".format(uri))
+                        self.write("continue")
+                    else:
+                        self.write("function = {}".format(self.function(additionals)))
+                with self.catch_fail():
+                    call = "function(element, ctx.join(pointer, index), ctx.spawn())"
+                    self.write("value = {}".format(call))
+                with self.block("else:"):
+                    with self.block("if value is not element:"):
+                        self.write("validated[index] = value")
+                        self.write("changed = True")
+            with self.block("if changed:"):
+                self.write("obj = obj.__class__(validated)")
+        self.length(attrs, "max_items", ">", "Too many elements")
+        self.length(attrs, "min_items", "<", "Too few elements")
+        self.unique_items(attrs)
+
+    def draft04_number(self, validator):
+        attrs = validator.attrs
+        if "maximum" in attrs:
+            operator = "<" if attrs["exclusive_maximum"] else "<="
+            maximum = self.constant(attrs["maximum"])
+            with self.block("if not obj {} {}:".format(operator, maximum)):
+                self.fail("Exceeded maximum")
+        if "minimum" in attrs:
+            operator = ">" if attrs["exclusive_minimum"] else ">="
+            minimum = self.constant(attrs["minimum"])
+            with self.block("if not obj {} {}:".format(operator, minimum)):
+                self.fail("Too small")
+        self.multiple(attrs, "multiple_of", "Forbidden value")
+
+    def draft04_object(self, validator):
+        attrs = validator.attrs
+        for name in attrs.get("required", []):
+            with self.block("if {} not in obj:".format(self.constant(name))):
+                pointer = "ctx.join(pointer, {})".format(self.constant(name))
+                self.fail("Missing property", pointer)
+        self.length(attrs, "max_properties", ">", "Too many properties")
+        self.length(attrs, "min_properties", "<", "Too few properties")
+        for key, dependencies in attrs.get("dependencies", {}).items():
+            with self.block("if {} in obj:".format(self.constant(key))):
+                if isinstance(dependencies, Validator):
+                    self.write(self.call(dependencies))
+                    continue
+                names = self.constant(frozenset(dependencies))
+                with self.block("for name in {}:".format(names)):
+                    with self.block("if name not in obj:"):
+                        self.fail("Missing property", "ctx.join(pointer, name)")
+        self.draft04_properties(validator)
+        for name, sub in attrs["properties"].items():
+            if sub.has_default():
+                name = self.constant(name)
+                default = self.constant(sub.default)
+                with self.block("if {} not in obj:".format(name)):
+                    value = "deepcopy({})".format(default)
+                    self.write("obj = ctx.assign(obj, {}, {})".format(name, value))
+
+    def draft04_properties(self, validator):
+        attrs = validator.attrs
+        properties = attrs["properties"]
+        patterns = attrs["pattern_properties"]
+        additionals = attrs["additional_properties"]
+        if not properties and not patterns and additionals is True:
+            return
+
+        with self.block("if obj:"):
+            track = additionals is not True
+            if track:
+                self.write("pending = set(obj.keys())")
+            for name, sub in properties.items():
+                name = self.constant(name)
+                with self.block("if {} in obj:".format(name)):
+                    if track:
+                        self.write("pending.discard({})".format(name))
+                    self.write("element = obj[{}]".format(name))
+                    pointer = "ctx.join(pointer, {})".format(name)
+                    with self.catch_fail():
+                        self.write(
+                            "value = {}".format(self.call(sub, "element", pointer))
+                        )
+                    with self.block("else:"):
+                        self.assign("value", name, "element")
+            if patterns:
+                dispatch = self.constant(validator.pattern_dispatch)
+                self.write("matches = {}(obj)".format(dispatch))
+            for i, sub in enumerate(patterns.values()):
+                with self.block("for name in matches[{}]:".format(i)):
+                    if track:
+                        self.write("pending.discard(name)")
+                    self.write("element = obj[name]")
+                    pointer = "ctx.join(pointer, name)"
+                    with self.catch_fail():
+                        self.write(
+                            "value = {}".format(self.call(sub, "element", pointer))
+                        )
+                    with self.block("else:"):
+                        self.assign("value", "name", "element")
+            if additionals is False:
+                with self.block("for name in pending:"):
+                    self.fail("Forbidden property", "ctx.join(pointer, name)")
+            elif additionals is not True:
+                with self.block("for name in sorted(pending):"):
+                    self.write("element = obj[name]")
+                    pointer = "ctx.join(pointer, name)"
+                    self.write(
+                        "value = {}".format(self.call(additionals, "element", pointer))
+                    )
+                    self.assign("value", "name", "element")
+
+    def draft04_string(self, validator):
+        attrs = validator.attrs
+        self.length(attrs, "max_length", ">", "Too long")
+        self.length(attrs, "min_length", "<", "Too short")
+        if "pattern" in attrs:
+            with self.block(
+                "if not {}.search(obj):".format(self.constant(validator.regex))
+            ):
+                self.fail("Forbidden value")
+        if "format" in attrs:
+            function = self.format(validator, draft04.format_aliases)
+            with self.block("try:"):
+                self.write("obj = {}(obj)".format(function))
+            with self.block("except ValidationError as error:"):
+                self.write("logger.error(error)")
+                self.fail("Forbidden value")
+
+    # draft03
+
+    def draft03(self, name, validator):
+        attrs = validator.attrs
+        with self.function_block(name, validator):
+            self.enum(validator)
+            if "type" in attrs:
+                self.draft03_types(attrs["type"], match=True)
+            if "disallow" in attrs:
+                self.draft03_types(attrs["disallow"], match=False)
+            extends = attrs.get("extends", [])
+            if not isinstance(extends, sequence_types):
+                extends = [extends]
+            for sub in extends:
+                self.write("obj = {}".format(self.call(sub)))
+
+            groups = [
+                (type_checks["array"], self.draft03_array),
+                (type_checks["number"], self.draft03_number),
+                (type_checks["object"], self.draft03_object),
+                (type_checks["string"], self.draft03_string),
+            ]
+            for check, group in groups:
+                position = len(self.lines)
+                with self.block("if {}:".format(check)):
+                    group(validator)
+                if len(self.lines) == position + 1:
+                    # nothing to check for this type
+                    self.lines[position:] = []
+
+    def draft03_types(self, types, match):
+        if not isinstance(types, sequence_types):
+            types = [types]
+        self.write("matched = False")
+        for type in types:
+            with self.block("if not matched:"):
+                if isinstance(type, Validator):
+                    with self.block("try:"):
+                        call = self.call(type)
+                        self.write("{} = {}".format("obj" if match else "_", call))
+                        self.write("matched = True")
+                    with self.block("except ValidationError:"):
+                        self.write("pass")
+                elif type == "any":
+                    self.write("matched = True")
+                else:
+                    with self.block("if {}:".format(type_checks.get(type, "False"))):
+                        self.write("matched = True")
+        with self.block("if {}matched:".format("not " if match else "")):
+            self.fail("Wrong type")
+
+    def draft03_array(self, validator):
+        attrs = validator.attrs
+        self.length(attrs, "max_items", ">", "Too many items")
+        self.length(attrs, "min_items", "<", "Too few items")
+        items = attrs.get("items")
+        if isinstance(items, Validator):
+            self.single_items(items)
+        elif isinstance(items, (list, tuple)):
+            additionals = attrs["additional_items"]
+            functions = self.functions_tuple(items)
+            with self.block("for index, element in enumerate(obj):"):
+                with self.block("if index < {}:".format(len(items))):
+                    self.write("function = {}[index]".format(functions))
+                with self.block("else:"):
+                    if additionals is True:
+                        self.write("break")
+                    elif additionals is False:
+                        pointer = "ctx.join(pointer, index)"
+                        self.fail("Additional elements are forbidden", pointer)
+                        self.write("continue")
+                    else:
+                        self.write("function = {}".format(self.function(additionals)))
+                with self.catch_fail():
+                    call = "function(element, ctx.join(pointer, index), ctx.spawn())"
+                    self.write("value = {}".format(call))
+                with self.block("else:"):
+                    self.assign("value", "index", "element")
+        self.unique_items(attrs)
+
+    def draft03_number(self, validator):
+        attrs = validator.attrs
+        if "maximum" in attrs:
+            operator = ">=" if attrs["exclusive_maximum"] else ">"
+            maximum = self.constant(attrs["maximum"])
+            with self.block("if obj {} {}:".format(operator, maximum)):
+                self.fail("Too big number")
+        if "minimum" in attrs:
+            operator = "<=" if attrs["exclusive_minimum"] else "<"
+            minimum = self.constant(attrs["minimum"])
+            with self.block("if obj {} {}:".format(operator, minimum)):
+                self.fail("Too low number")
+        self.multiple(attrs, "divisible_by", "Not a multiple of {}")
+
+    def draft03_object(self, validator):
+        attrs = validator.attrs
+        if "dependencies" in attrs:
+            self.write("missing = False")
+            for key, dependencies in attrs["dependencies"].items():
+                with self.block("if {} in obj:".format(self.constant(key))):
+                    if isinstance(dependencies, Validator):
+                        self.write("obj = {}".format(self.call(dependencies)))
+                        continue
+                    if not isinstance(dependencies, sequence_types):
+                        dependencies = [dependencies]
+                    for name in dependencies:
+                        with self.block(
+                            "if {} not in obj:".format(self.constant(name))
+                        ):
+                            self.write("missing = True")
+            with self.block("if missing:"):
+                self.fail("Missing properties")
+        self.draft03_properties(validator)
+
+    def draft03_properties(self, validator):
+        attrs = validator.attrs
+        properties = attrs["properties"]
+        patterns = attrs["pattern_properties"]
+        additionals = attrs["additional_properties"]
+
+        self.write("validated = set()")
+        self.write("pending = set(obj.keys())")
+        for name, sub in properties.items():
+            name = self.constant(name)
+            with self.block("if {} in obj:".format(name)):
+                self.write("pending.discard({})".format(name))
+                self.write("element = obj[{}]".format(name))
+                pointer = "ctx.join(pointer, {})".format(name)
+                with self.catch_fail():
+                    self.write("value = {}".format(self.call(sub, "element", pointer)))
+                with self.block("else:"):
+                    self.assign("value", name, "element")
+                    self.write("validated.add({})".format(name))
+            if not sub.is_optional():
+                with self.block("else:"):
+                    self.fail("Required property")
+        if patterns:
+            dispatch = self.constant(validator.pattern_dispatch)
+            self.write("matches = {}(list(obj.keys()))".format(dispatch))
+        for i, sub in enumerate(patterns.values()):
+            with self.block("for name in matches[{}]:".format(i)):
+                self.write("pending.discard(name)")
+                self.write("element = obj[name]")
+                pointer = "ctx.join(pointer, name)"
+                with self.catch_fail():
+                    self.write("value = {}".format(self.call(sub, "element", pointer)))
+                with self.block("else:"):
+                    self.assign("value", "name", "element")
+                    self.write("validated.add(name)")
+        if additionals is False:
+            with self.block("if pending and len(obj) > len(validated):"):
+                self.fail("Additional properties are forbidden")
+        elif additionals is not True:
+            with self.block("if pending:"):
+                with self.block("for name in list(obj.keys()):"):
+                    with self.block("if name not in validated:"):
+                        self.write("element = obj[name]")
+                        pointer = "ctx.join(pointer, name)"
+                        call = self.call(additionals, "element", pointer)
+                        self.write("value = {}".format(call))
+                        self.assign("value", "name", "element")
+                        self.write("validated.add(name)")
+
+    def draft03_string(self, validator):
+        attrs = validator.attrs
+        self.length(attrs, "max_length", ">", "Too long")
+        self.length(attrs, "min_length", "<", "Too short")
+        if "pattern" in attrs:
+            with self.block(
+                "if not {}.search(obj):".format(self.constant(validator.regex))
+            ):
+                self.fail("Does not match pattern")
+        if "format" in attrs:
+            function = self.format(validator, draft03.format_aliases)
+            self.write("obj = {}(obj)".format(function))
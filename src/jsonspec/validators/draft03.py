@@ -11,12 +11,16 @@ from copy import deepcopy
 from decimal import Decimal
 from urllib.parse import urljoin
 
-from jsonspec import driver as json
 from jsonspec.validators.exceptions import ValidationError
 from jsonspec.validators.pointer_util import pointer_join
-from jsonspec.validators.util import uncamel
-
-from .bases import ReferenceValidator, Validator
+from jsonspec.validators.util import (
+    EnumIndex,
+    PatternDispatch,
+    has_duplicates,
+    uncamel,
+)
+
+from .bases import ReferenceValidator, ValidationContext, Validator
 from .exceptions import CompilationError
 from .factorize import register
 
@@ -26,6 +30,22 @@ sequence_types = (list, set, tuple)
 number_types = (int, float, Decimal)
 logger = logging.getLogger(__name__)
 
+format_aliases = {
+    "color": "css.color",
+    "date-time": "utc.datetime",
+    "date": "utc.date",
+    "time": "utc.time",
+    "utc-millisec": "utc.millisec",
+    "regex": "regex",
+    "style": "css.style",
+    "phone": "phone",
+    "uri": "uri",
+    "email": "email",
+    "ip-address": "ipv4",
+    "ipv6": "ipv6",
+    "host-name": "hostname",
+}
+
 
 @register(spec="http://json-schema.org/draft-03/schema#")
 def compile(schema, pointer, context, scope=None):
@@ -192,6 +212,10 @@ def compile(schema, pointer, context, scope=None):
         attrs["pattern"] = schm.pop("pattern")
         if not isinstance(attrs["pattern"], str):
             raise CompilationError("pattern must be a string", schema)
+        try:
+            re.compile(attrs["pattern"])
+        except re.error:
+            raise CompilationError("pattern must be a valid regex", schema)
 
     if "patternProperties" in schm:
         attrs["pattern_properties"] = schm.pop("patternProperties")
@@ -199,6 +223,12 @@ def compile(schema, pointer, context, scope=None):
             raise CompilationError(
                 "patternProperties must be an object", schema
             )  # noqa
+        try:
+            PatternDispatch(attrs["pattern_properties"])
+        except re.error:
+            raise CompilationError(
+                "patternProperties must be valid regexes", schema
+            )  # noqa
         for name, value in attrs["pattern_properties"].items():
             subpointer = pointer_join(pointer, "patternProperties", name)
             attrs["pattern_properties"][name] = compile(
@@ -264,11 +294,13 @@ class Draft03Validator(Validator):
         self.attrs.setdefault("exclusive_minimum", False)
         self.attrs.setdefault("additional_properties", True)
         self.attrs.setdefault("properties", {})
+        self.dispatch = {}
+        self.regex = re.compile(attrs["pattern"]) if "pattern" in attrs else None
+        self.enum = EnumIndex(attrs["enum"]) if "enum" in attrs else None
+        self.pattern_dispatch = PatternDispatch(self.attrs["pattern_properties"])
         self.uri = uri
         self.formats = formats or {}
         self.default = self.attrs.get("default", None)
-        self.fail_fast = True
-        self.errors = []
 
     def is_array(self, obj):
         return isinstance(obj, sequence_types)
@@ -291,59 +323,107 @@ class Draft03Validator(Validator):
     def is_string(self, obj):
         return isinstance(obj, str)
 
-    def validate(self, obj, pointer=None):
+    def validate(self, obj, pointer=None, copy=True):
         """
         Validate object against validator
 
         :param obj: the object to validate
+        :param pointer: the object pointer
+        :param copy: validate a deep copy of obj.
+                     When False, obj is neither copied nor mutated.
         """
 
-        pointer = pointer or "#"
-
-        validator = deepcopy(self)
-        validator.errors = []
-        validator.fail_fast = False
+        if copy:
+            obj = deepcopy(obj)
+        return self.evaluate(obj, pointer or "#", ValidationContext())
 
-        obj = deepcopy(obj)
-        obj = validator.validate_enum(obj, pointer)
-        obj = validator.validate_type(obj, pointer)
-        obj = validator.validate_disallow(obj, pointer)
-        obj = validator.validate_extends(obj, pointer)
+    def evaluate(self, obj, pointer, ctx):
+        try:
+            checks = self.dispatch[obj.__class__]
+        except KeyError:
+            checks = self.dispatch[obj.__class__] = self.checks_for(obj)
 
-        if validator.is_array(obj):
-            obj = validator.validate_max_items(obj, pointer)
-            obj = validator.validate_min_items(obj, pointer)
-            obj = validator.validate_items(obj, pointer)
-            obj = validator.validate_unique_items(obj, pointer)
+        for check in checks:
+            obj = check(self, obj, pointer, ctx)
 
-        if validator.is_number(obj):
-            obj = validator.validate_maximum(obj, pointer)
-            obj = validator.validate_minimum(obj, pointer)
-            obj = validator.validate_divisible_by(obj, pointer)
+        if ctx.errors:
+            raise ValidationError("multiple errors", obj, errors=ctx.errors)
 
-        if validator.is_object(obj):
-            obj = validator.validate_dependencies(obj, pointer)
-            obj = validator.validate_properties(obj, pointer)
+        return obj
 
-        if validator.is_string(obj):
-            obj = validator.validate_max_length(obj, pointer)
-            obj = validator.validate_min_length(obj, pointer)
-            obj = validator.validate_pattern(obj, pointer)
-            obj = validator.validate_format(obj, pointer)
+    def checks_for(self, obj):
+        """
+        Lists the checks that apply to obj, in the order they run.
 
-        if validator.errors:
-            raise ValidationError("multiple errors", obj, errors=validator.errors)
+        Only the keywords declared by the schema are checked, and the
+        list only depends on the type of obj.
+        Types and disallow declaring schemas are always checked.
+        """
+        attrs = self.attrs
+        declared = set(attrs)
+        if self.enum is None:
+            declared.discard("enum")
+        if "type" in attrs and self.matches_types(attrs["type"], obj) is True:
+            declared.discard("type")
+        if "disallow" in attrs:
+            if self.matches_types(attrs["disallow"], obj) is False:
+                declared.discard("disallow")
+        if not (
+            attrs["properties"]
+            or attrs["pattern_properties"]
+            or attrs["additional_properties"] is not True
+        ):
+            declared.discard("properties")
+
+        keywords = ["enum", "type", "disallow", "extends"]
+        if self.is_array(obj):
+            keywords += ["max_items", "min_items", "items", "unique_items"]
+        elif self.is_number(obj):
+            keywords += ["maximum", "minimum", "divisible_by"]
+        elif self.is_object(obj):
+            keywords += ["dependencies", "properties"]
+        elif self.is_string(obj):
+            keywords += ["max_length", "min_length", "pattern", "format"]
+        cls = type(self)
+        return [getattr(cls, "validate_" + k) for k in keywords if k in declared]
+
+    def matches_types(self, types, obj):
+        """
+        Tells if obj is one of the simple types.
 
-        return obj
+        :return: None when types declare schemas, they depend on obj value
+        """
+        if not isinstance(types, sequence_types):
+            types = [types]
+        if any(isinstance(type, Validator) for type in types):
+            return None
+        for type in types:
+            if type == "any":
+                return True
+            elif type == "array" and self.is_array(obj):
+                return True
+            elif type == "boolean" and self.is_boolean(obj):
+                return True
+            elif type == "integer" and self.is_integer(obj):
+                return True
+            elif type == "null" and self.is_null(obj):
+                return True
+            elif type == "number" and self.is_number(obj):
+                return True
+            elif type == "object" and self.is_object(obj):
+                return True
+            elif type == "string" and self.is_string(obj):
+                return True
+        return False
 
-    def validate_dependencies(self, obj, pointer=None):
+    def validate_dependencies(self, obj, pointer, ctx):
         if "dependencies" in self.attrs:
             missings = set()
             for name, dependencies in self.attrs["dependencies"].items():
                 if name not in obj:
                     continue
                 if isinstance(dependencies, Validator):
-                    obj[name] = dependencies(obj)
+                    obj = dependencies.evaluate(obj, pointer, ctx.spawn())
                 elif isinstance(dependencies, sequence_types):
                     for d in dependencies:
                         if d not in obj:
@@ -352,10 +432,10 @@ class Draft03Validator(Validator):
                     missings.add(dependencies)
             if missings:
                 missings = sorted(missings)
-                self.fail("Missing properties", obj, pointer)
+                ctx.fail("Missing properties", obj, pointer)
         return obj
 
-    def validate_disallow(self, obj, pointer=None):
+    def validate_disallow(self, obj, pointer, ctx):
         if "disallow" in self.attrs:
             disallows = self.attrs["disallow"]
             if not isinstance(disallows, sequence_types):
@@ -364,7 +444,7 @@ class Draft03Validator(Validator):
             for type in disallows:
                 try:
                     if isinstance(type, Validator):
-                        type(obj)
+                        type.evaluate(obj, pointer, ctx.spawn())
                         disallowed += 1
                     elif type == "any":
                         disallowed += 1
@@ -386,33 +466,33 @@ class Draft03Validator(Validator):
                     # let it, it may be good
                     pass
             if disallowed:
-                self.fail("Wrong type", obj, pointer)
+                ctx.fail("Wrong type", obj, pointer)
         return obj
 
-    def validate_divisible_by(self, obj, pointer=None):
+    def validate_divisible_by(self, obj, pointer, ctx):
         if "divisible_by" in self.attrs:
             factor = Decimal(str(self.attrs["divisible_by"]))
             orig = Decimal(str(obj))
             if orig % factor != 0:
-                self.fail("Not a multiple of {}", obj, pointer)
+                ctx.fail("Not a multiple of {}", obj, pointer)
         return obj
 
-    def validate_enum(self, obj, pointer=None):
-        if "enum" in self.attrs:
-            if obj not in self.attrs["enum"]:
-                self.fail("Forbidden value", obj, pointer)
+    def validate_enum(self, obj, pointer, ctx):
+        if self.enum is not None:
+            if obj not in self.enum:
+                ctx.fail("Forbidden value", obj, pointer)
         return obj
 
-    def validate_extends(self, obj, pointer=None):
+    def validate_extends(self, obj, pointer, ctx):
         if "extends" in self.attrs:
             extends = self.attrs["extends"]
             if not isinstance(extends, sequence_types):
                 extends = [extends]
             for type in extends:
-                obj = type(obj)
+                obj = type.evaluate(obj, pointer, ctx.spawn())
         return obj
 
-    def validate_format(self, obj, pointer=None):
+    def validate_format(self, obj, pointer, ctx):
         """
         ================= ============
         Expected draft03  Alias of
@@ -435,137 +515,131 @@ class Draft03Validator(Validator):
         """
 
         if "format" in self.attrs:
-            substituted = {
-                "color": "css.color",
-                "date-time": "utc.datetime",
-                "date": "utc.date",
-                "time": "utc.time",
-                "utc-millisec": "utc.millisec",
-                "regex": "regex",
-                "style": "css.style",
-                "phone": "phone",
-                "uri": "uri",
-                "email": "email",
-                "ip-address": "ipv4",
-                "ipv6": "ipv6",
-                "host-name": "hostname",
-            }.get(self.attrs["format"], self.attrs["format"])
+            substituted = format_aliases.get(self.attrs["format"], self.attrs["format"])
             logger.debug("use %s", substituted)
             return self.formats[substituted](obj)
         return obj
 
-    def validate_items(self, obj, pointer=None):
+    def validate_items(self, obj, pointer, ctx):
         if "items" in self.attrs:
             items = self.attrs["items"]
             if isinstance(items, Validator):
                 validator = items
                 for index, element in enumerate(obj):
-                    with self.catch_fail():
-                        obj[index] = validator(
-                            element, pointer_join(pointer, index)
+                    with ctx.catch_fail():
+                        value = validator.evaluate(
+                            element, ctx.join(pointer, index), ctx.spawn()
                         )  # noqa
+                        if value is not element:
+                            obj = ctx.assign(obj, index, value)
                 return obj
             elif isinstance(items, (list, tuple)):
                 additionals = self.attrs["additional_items"]
                 validators = items
                 for index, element in enumerate(obj):
-                    with self.catch_fail():
+                    with ctx.catch_fail():
                         try:
                             validator = validators[index]
                         except IndexError:
                             if additionals is True:
                                 return obj
                             elif additionals is False:
-                                self.fail(
+                                ctx.fail(
                                     "Additional elements are forbidden",
                                     obj,
-                                    pointer_join(pointer, index),
+                                    ctx.join(pointer, index),
                                 )
                                 continue
                             validator = additionals
-                        obj[index] = validator(
-                            element, pointer_join(pointer, index)
+                        value = validator.evaluate(
+                            element, ctx.join(pointer, index), ctx.spawn()
                         )  # noqa
+                        if value is not element:
+                            obj = ctx.assign(obj, index, value)
                 return obj
             else:
                 raise NotImplementedError(items)
         return obj
 
-    def validate_max_items(self, obj, pointer=None):
+    def validate_max_items(self, obj, pointer, ctx):
         if "max_items" in self.attrs:
             count = len(obj)
             if count > self.attrs["max_items"]:
-                self.fail("Too many items", obj, pointer)
+                ctx.fail("Too many items", obj, pointer)
         return obj
 
-    def validate_max_length(self, obj, pointer=None):
+    def validate_max_length(self, obj, pointer, ctx):
         if "max_length" in self.attrs:
             length = len(obj)
             if length > self.attrs["max_length"]:
-                self.fail("Too long", obj, pointer)
+                ctx.fail("Too long", obj, pointer)
         return obj
 
-    def validate_maximum(self, obj, pointer=None):
+    def validate_maximum(self, obj, pointer, ctx):
         if "maximum" in self.attrs:
             if obj > self.attrs["maximum"]:
-                self.fail("Too big number", obj, pointer)
+                ctx.fail("Too big number", obj, pointer)
             if self.attrs["exclusive_maximum"] and obj == self.attrs["maximum"]:  # noqa
-                self.fail("Too big number", obj, pointer)
+                ctx.fail("Too big number", obj, pointer)
         return obj
 
-    def validate_min_items(self, obj, pointer=None):
+    def validate_min_items(self, obj, pointer, ctx):
         if "min_items" in self.attrs:
             count = len(obj)
             if count < self.attrs["min_items"]:
-                self.fail("Too few items", obj, pointer)
+                ctx.fail("Too few items", obj, pointer)
         return obj
 
-    def validate_min_length(self, obj, pointer=None):
+    def validate_min_length(self, obj, pointer, ctx):
         if "min_length" in self.attrs:
             length = len(obj)
             if length < self.attrs["min_length"]:
-                self.fail("Too short", obj, pointer)
+                ctx.fail("Too short", obj, pointer)
         return obj
 
-    def validate_minimum(self, obj, pointer=None):
+    def validate_minimum(self, obj, pointer, ctx):
         if "minimum" in self.attrs:
             if obj < self.attrs["minimum"]:
-                self.fail("Too low number", obj, pointer)
+                ctx.fail("Too low number", obj, pointer)
             if self.attrs["exclusive_minimum"] and obj == self.attrs["minimum"]:  # noqa
-                self.fail("Too low number", obj, pointer)
+                ctx.fail("Too low number", obj, pointer)
         return obj
 
-    def validate_pattern(self, obj, pointer=None):
-        if "pattern" in self.attrs:
-            regex = re.compile(self.attrs["pattern"])
-            if not regex.search(obj):
-                self.fail("Does not match pattern", obj, pointer)
+    def validate_pattern(self, obj, pointer, ctx):
+        if self.regex is not None:
+            if not self.regex.search(obj):
+                ctx.fail("Does not match pattern", obj, pointer)
         return obj
 
-    def validate_properties(self, obj, pointer=None):
+    def validate_properties(self, obj, pointer, ctx):
         validated = set()
         pending = set(obj.keys())
 
         for name, validator in self.attrs["properties"].items():
             if name in obj:
-                with self.catch_fail():
+                with ctx.catch_fail():
                     pending.discard(name)
-                    obj[name] = validator(
-                        obj[name], pointer_join(pointer, name)
+                    value = validator.evaluate(
+                        obj[name], ctx.join(pointer, name), ctx.spawn()
                     )  # noqa
+                    if value is not obj[name]:
+                        obj = ctx.assign(obj, name, value)
                     validated.add(name)
             elif not validator.is_optional():
-                self.fail("Required property", obj, pointer)
-
-        for pattern, validator in self.attrs["pattern_properties"].items():
-            regex = re.compile(pattern)
-            for name, value in obj.items():
-                if regex.search(name):
-                    with self.catch_fail():
+                ctx.fail("Required property", obj, pointer)
+
+        patterns = self.attrs["pattern_properties"]
+        if patterns:
+            matches = self.pattern_dispatch(list(obj.keys()))
+            for validator, names in zip(patterns.values(), matches):
+                for name in names:
+                    with ctx.catch_fail():
                         pending.discard(name)
-                        obj[name] = validator(
-                            obj[name], pointer_join(pointer, name)
+                        value = validator.evaluate(
+                            obj[name], ctx.join(pointer, name), ctx.spawn()
                         )  # noqa
+                        if value is not obj[name]:
+                            obj = ctx.assign(obj, name, value)
                         validated.add(name)
 
         if not pending:
@@ -576,18 +650,22 @@ class Draft03Validator(Validator):
 
         if self.attrs["additional_properties"] is False:
             if len(obj) > len(validated):
-                self.fail("Additional properties are forbidden", obj, pointer)  # noqa
+                ctx.fail("Additional properties are forbidden", obj, pointer)  # noqa
             return obj
 
         validator = self.attrs["additional_properties"]
         for name, value in obj.items():
             if name not in validated:
-                obj[name] = validator(value, pointer_join(pointer, name))
+                validated_value = validator.evaluate(
+                    value, ctx.join(pointer, name), ctx.spawn()
+                )  # noqa
+                if validated_value is not value:
+                    obj = ctx.assign(obj, name, validated_value)
                 validated.add(name)
 
         return obj
 
-    def validate_type(self, obj, pointer=None):
+    def validate_type(self, obj, pointer, ctx):
         if "type" in self.attrs:
             types = self.attrs["type"]
             if not isinstance(types, sequence_types):
@@ -595,7 +673,7 @@ class Draft03Validator(Validator):
             for type in types:
                 try:
                     if isinstance(type, Validator):
-                        return type(obj)
+                        return type.evaluate(obj, pointer, ctx.spawn())
                     elif type == "any":
                         return obj
                     elif type == "array" and self.is_array(obj):
@@ -615,13 +693,13 @@ class Draft03Validator(Validator):
                 except ValidationError:
                     # let it, it may be good
                     pass
-            self.fail("Wrong type", obj, pointer)
+            ctx.fail("Wrong type", obj, pointer)
         return obj
 
-    def validate_unique_items(self, obj, pointer=None):
+    def validate_unique_items(self, obj, pointer, ctx):
         if self.attrs.get("unique_items"):
-            if len(obj) > len(set(json.dumps(element) for element in obj)):
-                self.fail("Elements must be unique", obj, pointer)
+            if has_duplicates(obj):
+                ctx.fail("Elements must be unique", obj, pointer)
         return obj
 
     def has_default(self):
@@ -633,32 +711,3 @@ class Draft03Validator(Validator):
         True by default.
         """
         return not self.attrs.get("required", False)
-
-    def fail(self, reason, obj, pointer=None):
-        """
-        Called when validation fails.
-        """
-        pointer = pointer_join(pointer)
-        err = ValidationError(reason, obj, pointer)
-        if self.fail_fast:
-            raise err
-        else:
-            self.errors.append(err)
-        return err
-
-    def catch_fail(self):
-        return FailCatcher(self)
-
-
-class FailCatcher:
-    def __init__(self, validator):
-        self.validator = validator
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, type, value, tb):
-        if isinstance(value, ValidationError) and not self.validator.fail_fast:
-            self.validator.errors.append(value)
-            return True
-        return False
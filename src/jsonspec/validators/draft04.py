@@ -11,12 +11,16 @@ from copy import deepcopy
 from decimal import Decimal
 from urllib.parse import urljoin
 
-from jsonspec import driver as json
 from jsonspec.validators.exceptions import ValidationError
 from jsonspec.validators.pointer_util import pointer_join
-from jsonspec.validators.util import uncamel
-
-from .bases import ReferenceValidator, Validator
+from jsonspec.validators.util import (
+    EnumIndex,
+    PatternDispatch,
+    has_duplicates,
+    uncamel,
+)
+
+from .bases import ReferenceValidator, ValidationContext, Validator
 from .exceptions import CompilationError
 from .factorize import register
 
@@ -26,6 +30,15 @@ sequence_types = (list, set, tuple)
 number_types = (int, float, Decimal)
 logger = logging.getLogger(__name__)
 
+format_aliases = {
+    "date-time": "rfc3339.datetime",
+    "email": "email",
+    "hostname": "hostname",
+    "ipv4": "ipv4",
+    "ipv6": "ipv6",
+    "uri": "uri",
+}
+
 
 @register(spec="http://json-schema.org/draft-04/schema#")
 def compile(schema, pointer, context, scope=None):
@@ -220,6 +233,10 @@ def compile(schema, pointer, context, scope=None):
         attrs["pattern"] = schm.pop("pattern")
         if not isinstance(attrs["pattern"], str):
             raise CompilationError("pattern must be a string", schema)
+        try:
+            re.compile(attrs["pattern"])
+        except re.error:
+            raise CompilationError("pattern must be a valid regex", schema)
 
     if "properties" in schm:
         attrs["properties"] = schm.pop("properties")
@@ -236,6 +253,12 @@ def compile(schema, pointer, context, scope=None):
             raise CompilationError(
                 "patternProperties must be an object", schema
             )  # noqa
+        try:
+            PatternDispatch(attrs["pattern_properties"])
+        except re.error:
+            raise CompilationError(
+                "patternProperties must be valid regexes", schema
+            )  # noqa
         for subname, subschema in attrs["pattern_properties"].items():
             subpointer = pointer_join(pointer, "patternProperties", subname)
             compiled = compile(subschema, subpointer, context, scope)
@@ -288,58 +311,78 @@ class Draft04Validator(Validator):
         self.attrs.setdefault("exclusive_minimum", False),
         self.attrs.setdefault("pattern_properties", {})
         self.attrs.setdefault("properties", {})
+        self.regex = re.compile(attrs["pattern"]) if "pattern" in attrs else None
+        self.enum = EnumIndex(attrs["enum"]) if "enum" in attrs else None
+        self.pattern_dispatch = PatternDispatch(self.attrs["pattern_properties"])
+        self.dispatch = {}
         self.uri = uri
         self.default = self.attrs.get("default", None)
-        self.fail_fast = True
-        self.errors = []
 
-    def validate(self, obj, pointer=None):
+    def validate(self, obj, pointer=None, copy=True):
         """
         Validate object against validator
 
         :param obj: the object to validate
+        :param pointer: the object pointer
+        :param copy: validate a deep copy of obj.
+                     When False, obj is neither copied nor mutated, only the
+                     containers that receive defaults are shallow copied.
         """
 
-        pointer = pointer or "#"
+        if copy:
+            obj = deepcopy(obj)
+        return self.evaluate(obj, pointer or "#", ValidationContext())
+
+    def evaluate(self, obj, pointer, ctx):
+        try:
+            checks = self.dispatch[obj.__class__]
+        except KeyError:
+            checks = self.dispatch[obj.__class__] = self.checks_for(obj)
 
-        validator = deepcopy(self)
-        validator.errors = []
-        validator.fail_fast = False
+        for check in checks:
+            obj = check(self, obj, pointer, ctx)
 
-        obj = deepcopy(obj)
-        obj = validator.validate_enum(obj, pointer)
-        obj = validator.validate_type(obj, pointer)
-        obj = validator.validate_not(obj, pointer)
-        obj = validator.validate_all_of(obj, pointer)
-        obj = validator.validate_any_of(obj, pointer)
-        obj = validator.validate_one_of(obj, pointer)
+        if ctx.errors:
+            raise ValidationError("multiple errors", obj, errors=ctx.errors)
+
+        return obj
+
+    def checks_for(self, obj):
+        """
+        Lists the checks that apply to obj, in the order they run.
 
+        Only the keywords declared by the schema are checked, and the
+        list only depends on the type of obj.
+        """
+        attrs = self.attrs
+        declared = set(attrs)
+        if self.enum is None:
+            declared.discard("enum")
+        if "type" in attrs and self.matches_type(obj):
+            declared.discard("type")
+        if attrs["properties"]:
+            declared.add("default_properties")
+        elif not attrs["pattern_properties"] and attrs["additional_properties"] is True:
+            declared.discard("properties")
+
+        keywords = ["enum", "type", "not", "all_of", "any_of", "one_of"]
         if self.is_array(obj):
-            obj = validator.validate_items(obj, pointer)
-            obj = validator.validate_max_items(obj, pointer)
-            obj = validator.validate_min_items(obj, pointer)
-            obj = validator.validate_unique_items(obj, pointer)
+            keywords += ["items", "max_items", "min_items", "unique_items"]
         elif self.is_number(obj):
-            obj = validator.validate_maximum(obj, pointer)
-            obj = validator.validate_minimum(obj, pointer)
-            obj = validator.validate_multiple_of(obj, pointer)
+            keywords += ["maximum", "minimum", "multiple_of"]
         elif self.is_object(obj):
-            obj = validator.validate_required(obj, pointer)
-            obj = validator.validate_max_properties(obj, pointer)
-            obj = validator.validate_min_properties(obj, pointer)
-            obj = validator.validate_dependencies(obj, pointer)
-            obj = validator.validate_properties(obj, pointer)
-            obj = validator.validate_default_properties(obj, pointer)
+            keywords += [
+                "required",
+                "max_properties",
+                "min_properties",
+                "dependencies",
+                "properties",
+                "default_properties",
+            ]
         elif self.is_string(obj):
-            obj = validator.validate_max_length(obj, pointer)
-            obj = validator.validate_min_length(obj, pointer)
-            obj = validator.validate_pattern(obj, pointer)
-            obj = validator.validate_format(obj, pointer)
-
-        if validator.errors:
-            raise ValidationError("multiple errors", obj, errors=validator.errors)
-
-        return obj
+            keywords += ["max_length", "min_length", "pattern", "format"]
+        cls = type(self)
+        return [getattr(cls, "validate_" + k) for k in keywords if k in declared]
 
     def is_array(self, obj):
         return isinstance(obj, sequence_types)
@@ -362,48 +405,48 @@ class Draft04Validator(Validator):
     def has_default(self):
         return "default" in self.attrs
 
-    def validate_all_of(self, obj, pointer=None):
+    def validate_all_of(self, obj, pointer, ctx):
         for validator in self.attrs.get("all_of", []):
-            obj = validator(obj)
+            obj = validator.evaluate(obj, pointer, ctx.spawn())
         return obj
 
-    def validate_any_of(self, obj, pointer=None):
+    def validate_any_of(self, obj, pointer, ctx):
         if "any_of" in self.attrs:
             for validator in self.attrs["any_of"]:
                 try:
-                    obj = validator(obj)
+                    obj = validator.evaluate(obj, pointer, ctx.spawn())
                     return obj
                 except ValidationError:
                     pass
-            self.fail("Not in any_of", obj, pointer)
+            ctx.fail("Not in any_of", obj, pointer)
         return obj
 
-    def validate_default_properties(self, obj, pointer=None):
+    def validate_default_properties(self, obj, pointer, ctx):
         # Reinject defaults from properties.
         for name, validator in self.attrs.get("properties", {}).items():
             if name not in obj and validator.has_default():
-                obj[name] = deepcopy(validator.default)
+                obj = ctx.assign(obj, name, deepcopy(validator.default))
         return obj
 
-    def validate_dependencies(self, obj, pointer=None):
+    def validate_dependencies(self, obj, pointer, ctx):
         for key, dependencies in self.attrs.get("dependencies", {}).items():
             if key in obj:
                 if isinstance(dependencies, sequence_types):
                     for name in set(dependencies) - set(obj.keys()):
-                        self.fail(
-                            "Missing property", obj, pointer_join(pointer, name)
+                        ctx.fail(
+                            "Missing property", obj, ctx.join(pointer, name)
                         )  # noqa
                 else:
-                    dependencies(obj)
+                    dependencies.evaluate(obj, pointer, ctx.spawn())
         return obj
 
-    def validate_enum(self, obj, pointer=None):
-        if "enum" in self.attrs:
-            if obj not in self.attrs["enum"]:
-                self.fail("Forbidden value", obj, pointer)
+    def validate_enum(self, obj, pointer, ctx):
+        if self.enum is not None:
+            if obj not in self.enum:
+                ctx.fail("Forbidden value", obj, pointer)
         return obj
 
-    def validate_format(self, obj, pointer=None):
+    def validate_format(self, obj, pointer, ctx):
         """
         ================= ============
         Expected draft04  Alias of
@@ -418,63 +461,63 @@ class Draft04Validator(Validator):
 
         """
         if "format" in self.attrs:
-            substituted = {
-                "date-time": "rfc3339.datetime",
-                "email": "email",
-                "hostname": "hostname",
-                "ipv4": "ipv4",
-                "ipv6": "ipv6",
-                "uri": "uri",
-            }.get(self.attrs["format"], self.attrs["format"])
+            substituted = format_aliases.get(self.attrs["format"], self.attrs["format"])
             logger.debug("use %s", substituted)
             try:
                 return self.formats[substituted](obj)
             except ValidationError as error:
                 logger.error(error)
-                self.fail("Forbidden value", obj, pointer)
+                ctx.fail("Forbidden value", obj, pointer)
         return obj
 
-    def validate_items(self, obj, pointer=None):
+    def validate_items(self, obj, pointer, ctx):
         if "items" in self.attrs:
             items = self.attrs["items"]
             if isinstance(items, Validator):
                 validator = items
                 for index, element in enumerate(obj):
-                    with self.catch_fail():
-                        obj[index] = validator(
-                            element, pointer_join(pointer, index)
+                    with ctx.catch_fail():
+                        value = validator.evaluate(
+                            element, ctx.join(pointer, index), ctx.spawn()
                         )  # noqa
+                        if value is not element:
+                            obj = ctx.assign(obj, index, value)
                 return obj
             elif isinstance(items, (list, tuple)):
                 additionals = self.attrs["additional_items"]
                 validators = items
 
                 validated = list(obj)
+                changed = False
                 for index, element in enumerate(validated):
-                    with self.catch_fail():
+                    with ctx.catch_fail():
                         try:
                             validator = validators[index]
                         except IndexError:
                             if additionals is True:
-                                return obj
+                                break
                             elif additionals is False:
-                                self.fail(
+                                ctx.fail(
                                     "Forbidden value",
                                     obj,
-                                    pointer=pointer_join(self.uri, index),
+                                    pointer=ctx.join(self.uri, index),
                                 )  # noqa
                                 continue
                             validator = additionals
-                        validated[index] = validator(
-                            element, pointer_join(pointer, index)
+                        value = validator.evaluate(
+                            element, ctx.join(pointer, index), ctx.spawn()
                         )  # noqa
-                obj = obj.__class__(validated)
+                        if value is not element:
+                            validated[index] = value
+                            changed = True
+                if changed:
+                    obj = obj.__class__(validated)
                 return obj
             else:
                 raise NotImplementedError(items)
         return obj
 
-    def validate_maximum(self, obj, pointer=None):
+    def validate_maximum(self, obj, pointer, ctx):
         if "maximum" in self.attrs:
             m = self.attrs["maximum"]
             if obj < m:
@@ -482,31 +525,31 @@ class Draft04Validator(Validator):
             exclusive = self.attrs["exclusive_maximum"]
             if not exclusive and (obj == m):
                 return obj
-            self.fail("Exceeded maximum", obj, pointer)
+            ctx.fail("Exceeded maximum", obj, pointer)
         return obj
 
-    def validate_max_items(self, obj, pointer=None):
+    def validate_max_items(self, obj, pointer, ctx):
         if "max_items" in self.attrs:
             count = len(obj)
             if count > self.attrs["max_items"]:
-                self.fail("Too many elements", obj, pointer)
+                ctx.fail("Too many elements", obj, pointer)
         return obj
 
-    def validate_max_length(self, obj, pointer=None):
+    def validate_max_length(self, obj, pointer, ctx):
         if "max_length" in self.attrs:
             length = len(obj)
             if length > self.attrs["max_length"]:
-                self.fail("Too long", obj, pointer)
+                ctx.fail("Too long", obj, pointer)
         return obj
 
-    def validate_max_properties(self, obj, pointer=None):
+    def validate_max_properties(self, obj, pointer, ctx):
         if "max_properties" in self.attrs:
             count = len(obj)
             if count > self.attrs["max_properties"]:
-                self.fail("Too many properties", obj, pointer)
+                ctx.fail("Too many properties", obj, pointer)
         return obj
 
-    def validate_minimum(self, obj, pointer=None):
+    def validate_minimum(self, obj, pointer, ctx):
         if "minimum" in self.attrs:
             m = self.attrs["minimum"]
             if obj > m:
@@ -514,99 +557,103 @@ class Draft04Validator(Validator):
             exclusive = self.attrs["exclusive_minimum"]
             if not exclusive and (obj == m):
                 return obj
-            self.fail("Too small", obj, pointer)
+            ctx.fail("Too small", obj, pointer)
         return obj
 
-    def validate_min_items(self, obj, pointer=None):
+    def validate_min_items(self, obj, pointer, ctx):
         if "min_items" in self.attrs:
             count = len(obj)
             if count < self.attrs["min_items"]:
-                self.fail("Too few elements", obj, pointer)
+                ctx.fail("Too few elements", obj, pointer)
         return obj
 
-    def validate_min_length(self, obj, pointer=None):
+    def validate_min_length(self, obj, pointer, ctx):
         if "min_length" in self.attrs:
             length = len(obj)
             if length < self.attrs["min_length"]:
-                self.fail("Too short", obj, pointer)
+                ctx.fail("Too short", obj, pointer)
         return obj
 
-    def validate_min_properties(self, obj, pointer=None):
+    def validate_min_properties(self, obj, pointer, ctx):
         if "min_properties" in self.attrs:
             count = len(obj)
             if count < self.attrs["min_properties"]:
-                self.fail("Too few properties", obj, pointer)
+                ctx.fail("Too few properties", obj, pointer)
         return obj
 
-    def validate_multiple_of(self, obj, pointer=None):
+    def validate_multiple_of(self, obj, pointer, ctx):
         if "multiple_of" in self.attrs:
             factor = Decimal(str(self.attrs["multiple_of"]))
             orig = Decimal(str(obj))
             if orig % factor != 0:
-                self.fail("Forbidden value", obj, pointer)
+                ctx.fail("Forbidden value", obj, pointer)
         return obj
 
-    def validate_not(self, obj, pointer=None):
+    def validate_not(self, obj, pointer, ctx):
         if "not" in self.attrs:
             try:
                 validator = self.attrs["not"]
-                validator(obj)
+                validator.evaluate(obj, pointer, ctx.spawn())
             except ValidationError:
                 return obj
             else:
-                self.fail("Forbidden value", obj, pointer)
+                ctx.fail("Forbidden value", obj, pointer)
         return obj
 
-    def validate_one_of(self, obj, pointer=None):
+    def validate_one_of(self, obj, pointer, ctx):
         if "one_of" in self.attrs:
             validated = 0
             for validator in self.attrs["one_of"]:
                 try:
-                    validated_obj = validator(obj)
+                    validated_obj = validator.evaluate(obj, pointer, ctx.spawn())
                     validated += 1
                 except ValidationError:
                     pass
             if not validated:
-                self.fail("Validates noone", obj)
+                ctx.fail("Validates noone", obj)
             elif validated == 1:
                 return validated_obj
             else:
-                self.fail("Validates more than once", obj)
+                ctx.fail("Validates more than once", obj)
         return obj
 
-    def validate_pattern(self, obj, pointer=None):
-        if "pattern" in self.attrs:
-            pattern = self.attrs["pattern"]
-            if re.search(pattern, obj):
+    def validate_pattern(self, obj, pointer, ctx):
+        if self.regex is not None:
+            if self.regex.search(obj):
                 return obj
-            self.fail("Forbidden value", obj, pointer)
+            ctx.fail("Forbidden value", obj, pointer)
         return obj
 
-    def validate_properties(self, obj, pointer=None):
+    def validate_properties(self, obj, pointer, ctx):
         validated = set()
         pending = set(obj.keys())
-        response = {}
 
         if not obj:
-            return response
+            return obj
 
         for name, validator in self.attrs["properties"].items():
             if name in obj:
-                with self.catch_fail():
+                with ctx.catch_fail():
                     pending.discard(name)
-                    obj[name] = validator(
-                        obj[name], pointer_join(pointer, name)
+                    value = validator.evaluate(
+                        obj[name], ctx.join(pointer, name), ctx.spawn()
                     )  # noqa
+                    if value is not obj[name]:
+                        obj = ctx.assign(obj, name, value)
                     validated.add(name)
 
-        for pattern, validator in self.attrs["pattern_properties"].items():
-            for name in sorted(obj.keys()):
-                if re.search(pattern, name):
-                    with self.catch_fail():
+        patterns = self.attrs["pattern_properties"]
+        if patterns:
+            matches = self.pattern_dispatch(obj)
+            for validator, names in zip(patterns.values(), matches):
+                for name in names:
+                    with ctx.catch_fail():
                         pending.discard(name)
-                        obj[name] = validator(
-                            obj[name], pointer_join(pointer, name)
+                        value = validator.evaluate(
+                            obj[name], ctx.join(pointer, name), ctx.spawn()
                         )  # noqa
+                        if value is not obj[name]:
+                            obj = ctx.assign(obj, name, value)
                         validated.add(name)
 
         if not pending:
@@ -618,55 +665,57 @@ class Draft04Validator(Validator):
 
         if additionals is False:
             for name in pending:
-                self.fail(
-                    "Forbidden property", obj, pointer_join(pointer, name)
-                )  # noqa
+                ctx.fail("Forbidden property", obj, ctx.join(pointer, name))  # noqa
             return obj
 
         validator = additionals
         for name in sorted(pending):
-            obj[name] = validator(obj.pop(name), pointer_join(pointer, name))  # noqa
+            value = validator.evaluate(
+                obj[name], ctx.join(pointer, name), ctx.spawn()
+            )  # noqa
+            if value is not obj[name]:
+                obj = ctx.assign(obj, name, value)
             validated.add(name)
         return obj
 
-    def validate_required(self, obj, pointer=None):
+    def validate_required(self, obj, pointer, ctx):
         if "required" in self.attrs:
             for name in self.attrs["required"]:
                 if name not in obj:
-                    self.fail(
-                        "Missing property", obj, pointer_join(pointer, name)
-                    )  # noqa
+                    ctx.fail("Missing property", obj, ctx.join(pointer, name))  # noqa
         return obj
 
-    def validate_type(self, obj, pointer=None):
-        if "type" in self.attrs:
-            types = self.attrs["type"]
-            if isinstance(types, str):
-                types = [types]
-
-            for t in types:
-                if t == "array" and self.is_array(obj):
-                    return obj
-                if t == "boolean" and self.is_boolean(obj):
-                    return obj
-                if t == "integer" and self.is_integer(obj):
-                    return obj
-                if t == "number" and self.is_number(obj):
-                    return obj
-                if t == "null" and obj is None:
-                    return obj
-                if t == "object" and self.is_object(obj):
-                    return obj
-                if t == "string" and self.is_string(obj):
-                    return obj
+    def matches_type(self, obj):
+        types = self.attrs["type"]
+        if isinstance(types, str):
+            types = [types]
+
+        for t in types:
+            if t == "array" and self.is_array(obj):
+                return True
+            if t == "boolean" and self.is_boolean(obj):
+                return True
+            if t == "integer" and self.is_integer(obj):
+                return True
+            if t == "number" and self.is_number(obj):
+                return True
+            if t == "null" and obj is None:
+                return True
+            if t == "object" and self.is_object(obj):
+                return True
+            if t == "string" and self.is_string(obj):
+                return True
+        return False
 
-            self.fail("Wrong type", obj, pointer)
+    def validate_type(self, obj, pointer, ctx):
+        if "type" in self.attrs and not self.matches_type(obj):
+            ctx.fail("Wrong type", obj, pointer)
         return obj
 
-    def validate_unique_items(self, obj, pointer=None):
+    def validate_unique_items(self, obj, pointer, ctx):
         if self.attrs.get("unique_items"):
-            if len(obj) > len(set(json.dumps(element) for element in obj)):
-                self.fail("Elements must be unique", obj, pointer)
+            if has_duplicates(obj):
+                ctx.fail("Elements must be unique", obj, pointer)
         return obj
 
     def is_optional(self):
@@ -675,32 +724,3 @@ class Draft04Validator(Validator):
         """
         logger.warn("asking for is_optional")
         return True
-
-    def fail(self, reason, obj, pointer=None):
-        """
-        Called when validation fails.
-        """
-        pointer = pointer_join(pointer)
-        err = ValidationError(reason, obj, pointer)
-        if self.fail_fast:
-            raise err
-        else:
-            self.errors.append(err)
-        return err
-
-    def catch_fail(self):
-        return FailCatcher(self)
-
-
-class FailCatcher:
-    def __init__(self, validator):
-        self.validator = validator
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, type, value, tb):
-        if isinstance(value, ValidationError) and not self.validator.fail_fast:
-            self.validator.errors.append(value)
-            return True
-        return False
@@ -52,6 +52,20 @@ class ValidationError(ValueError):
         return flatten(self)
 
 
+class Invalid(ValidationError):
+    """Raised by :meth:`Validator.is_valid` on the first failure.
+
+    It is cheaper than a regular ValidationError, as it carries neither
+    reason, object nor pointer.
+    """
+
+    obj = pointer = None
+    errors = frozenset()
+
+    def __init__(self):
+        Exception.__init__(self)
+
+
 def flatten(error):
     def iter_it(src):
         if isinstance(src, (list, set, tuple)):
@@ -11,6 +11,7 @@ from jsonspec.pointer import DocumentPointer
 from jsonspec.pointer.exceptions import ExtractError
 from jsonspec.reference import LocalRegistry
 
+from .cache import ValidatorCache, default_cache, fingerprint
 from .exceptions import CompilationError
 from .formats import FormatRegistry
 
@@ -26,30 +27,51 @@ class Context:
     :ivar registry: the current registry
     :ivar spec: the current spec
     :ivar formats: the current formats exposed
+    :ivar resolved: validators already resolved by this compilation,
+                    shared by all of its contexts
     """
 
-    def __init__(self, factory, registry, spec=None, formats=None):
+    def __init__(self, factory, registry, spec=None, formats=None, resolved=None):
         self.factory = factory
         self.registry = registry
         self.spec = spec
         self.formats = formats
+        self.resolved = {} if resolved is None else resolved
 
     def __call__(self, schema, pointer):
         return self.factory(schema, pointer, self.spec)
 
     def resolve(self, pointer):
+        key = (str(pointer), self.spec)
+        try:
+            validator = self.resolved[key]
+        except KeyError:
+            pass
+        else:
+            logger.debug("reuse %s", pointer)
+            self.factory.saved_compilations += 1
+            return validator
+
         try:
             dp = DocumentPointer(pointer)
             if dp.is_inner():
                 logger.debug("resolve inner %s", pointer)
-                return self.factory.local(
-                    self.registry.resolve(pointer), pointer, self.registry, self.spec
+                validator = self.factory.local(
+                    self.registry.resolve(pointer),
+                    pointer,
+                    self.registry,
+                    self.spec,
+                    self.resolved,
+                )
+            else:
+                logger.debug("resolve outside %s", pointer)
+                validator = self.factory(
+                    self.registry.resolve(pointer), pointer, self.spec
                 )
-
-            logger.debug("resolve outside %s", pointer)
-            return self.factory(self.registry.resolve(pointer), pointer, self.spec)
         except ExtractError as error:
             raise CompilationError({}, error)
+        self.resolved[key] = validator
+        return validator
 
 
 class Factory:
@@ -57,17 +79,32 @@ class Factory:
 
     :ivar provider: global registry
     :ivar spec: default spec
+    :ivar cache: compiled validators cache, False to disable it, True or
+                 None for :data:`default_cache`
+    :ivar saved_compilations: number of references resolved to an already
+                              compiled validator
     """
 
     spec = "http://json-schema.org/draft-04/schema#"
     compilers = {}
-
-    def __init__(self, provider=None, spec=None, formats=None):
-        self.provider = provider or {}
+    cache = default_cache
+
+    def __init__(self, provider=None, spec=None, formats=None, cache=None):
+        self.identity = (
+            id(provider) if provider is not None else None,
+            id(formats) if formats is not None else None,
+        )
+        self.refs = (provider, formats)
+        self.provider = provider if provider is not None else {}
         self.spec = spec or self.spec
         if not isinstance(formats, FormatRegistry):
             formats = FormatRegistry(formats)
         self.formats = formats
+        if cache is False or isinstance(cache, ValidatorCache):
+            self.cache = cache
+        elif cache is not None and cache is not True:
+            raise TypeError("cache must be a ValidatorCache or a boolean")
+        self.saved_compilations = 0
 
     def __call__(self, schema, pointer, spec=None):
         try:
@@ -76,6 +113,24 @@ class Factory:
         except KeyError:
             raise CompilationError("{!r} not registered".format(spec), schema)
 
+        return self.cached(
+            schema,
+            pointer,
+            spec,
+            partial(self.compile, schema, pointer, spec, compiler),
+        )
+
+    def cached(self, schema, pointer, spec, builder, backend=None):
+        """Returns the validator built by builder, reusing the cached one
+        when this schema has already been compiled with the same uri, spec,
+        provider and formats.
+        """
+        if self.cache is False:
+            return builder()
+        key = (fingerprint(schema), str(pointer), spec) + self.identity + (backend,)
+        return self.cache.fetch(key, builder, *self.refs)
+
+    def compile(self, schema, pointer, spec, compiler):
         registry = LocalRegistry(schema, self.provider)
         local = DocumentPointer(pointer)
 
@@ -83,16 +138,19 @@ class Factory:
             registry[local.document] = schema
         local.document = "<local>"
         context = Context(self, registry, spec, self.formats)
-        return compiler(schema, pointer, context)
+        validator = compiler(schema, pointer, context)
+        # recursive references link to the root
+        context.resolved.setdefault((str(pointer), spec), validator)
+        return validator
 
-    def local(self, schema, pointer, registry, spec=None):
+    def local(self, schema, pointer, registry, spec=None, resolved=None):
         try:
             spec = schema.get("$schema", spec or self.spec)
             compiler = self.compilers[spec]
         except KeyError:
             raise CompilationError("{!r} not registered".format(spec))
 
-        context = Context(self, registry, spec, self.formats)
+        context = Context(self, registry, spec, self.formats, resolved)
         return compiler(schema, pointer, context)
 
     @classmethod
@@ -0,0 +1,91 @@
+"""
+    jsonspec.validators.linker
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Resolves references of compiled validators ahead of validation.
+
+"""
+
+import logging
+
+from .bases import ReferenceValidator, Validator
+from .exceptions import CompilationError
+
+__all__ = ["link", "resolve"]
+
+logger = logging.getLogger(__name__)
+
+
+def resolve(validator, targets=None):
+    """Follows references until a concrete validator.
+
+    :param targets: validators already reached by absolute uri. Without a
+                    cache, every absolute reference compiles its document
+                    again; reusing them keeps recursive graphs finite.
+    :type targets: dict
+    :raises CompilationError: references loop without reaching a validator
+    """
+    seen = set()
+    chain = []
+    while isinstance(validator, ReferenceValidator):
+        uri = validator.uri
+        if targets is not None and uri in targets:
+            validator = targets[uri]
+            break
+        if uri in seen:
+            raise CompilationError("circular reference {}".format(uri), {})
+        seen.add(uri)
+        if validator.pointer.document:
+            chain.append(uri)
+        validator = validator.validator
+    if targets is not None:
+        for uri in chain:
+            targets[uri] = validator
+    return validator
+
+
+def link(validator):
+    """
+    Resolves every reference of a validator graph, and replaces them with
+    direct links to their targets.
+
+    Recursive schemas link back to the same nodes. Broken references raise
+    here, instead of during the first validation.
+
+    :param validator: the validator to link, usually returned by
+                      :func:`jsonspec.validators.load`
+    :type validator: Validator
+    :return: the validator, or its target when it is a reference
+    """
+    targets = {}
+    root = resolve(validator, targets)
+    visited = set()
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        attrs = getattr(node, "attrs", None)
+        if isinstance(attrs, dict):
+            relink(attrs, pending, targets)
+    logger.debug("linked %s validators", len(visited))
+    return root
+
+
+def relink(container, pending, targets):
+    """Replaces references found in container, and queues nested validators."""
+    if isinstance(container, dict):
+        items = container.items()
+    elif isinstance(container, list):
+        items = enumerate(container)
+    else:
+        return
+    for key, value in list(items):
+        if isinstance(value, Validator):
+            target = resolve(value, targets)
+            if target is not value:
+                container[key] = target
+            pending.append(target)
+        else:
+            relink(value, pending, targets)
@@ -0,0 +1,139 @@
+"""
+    jsonspec.validators.parallel
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Validates large sets of documents with a pool of processes.
+
+"""
+
+import logging
+import os
+from collections import deque
+from itertools import islice
+from multiprocessing import get_context
+from timeit import default_timer
+
+__all__ = ["Executor"]
+
+logger = logging.getLogger(__name__)
+
+#: the validator of the current worker process
+worker_validator = None
+
+
+def initialize(schema, uri, spec, provider, backend):
+    """Compiles the validator once per worker process."""
+    from . import Validator, load
+
+    global worker_validator
+    if isinstance(schema, Validator):
+        worker_validator = schema
+    else:
+        worker_validator = load(schema, uri, spec, provider, backend)
+
+
+def validate_chunk(chunk):
+    return list(worker_validator.validate_many(chunk))
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Executor:
+    """
+    Validates documents against a schema in parallel.
+
+    Each worker compiles the schema once, from its source, uri, spec and
+    provider, which must be picklable. An already compiled validator can be
+    given instead of the schema, it is pickled once per worker; this is not
+    possible with the codegen backend.
+
+    :ivar processes: number of workers, defaults to the number of cpus
+    :ivar chunksize: number of documents sent to a worker at once, at most
+                     two chunks per worker are pending
+    :ivar count: number of documents validated so far
+    :ivar elapsed: seconds spent validating them
+
+    >>> with Executor({'type': 'integer'}, processes=2) as executor:
+    ...     results = list(executor.validate_many(range(10000)))
+    ...     print(executor.throughput)
+    """
+
+    def __init__(
+        self,
+        schema,
+        uri=None,
+        spec=None,
+        provider=None,
+        backend=None,
+        processes=None,
+        chunksize=1000,
+    ):
+        self.source = (schema, uri, spec, provider, backend)
+        self.processes = processes
+        self.chunksize = chunksize
+        self.pool = None
+        self.count = 0
+        self.elapsed = 0.0
+
+    def start(self):
+        if self.pool is None:
+            self.pool = get_context().Pool(
+                self.processes, initializer=initialize, initargs=self.source
+            )
+        return self
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, type, value, tb):
+        self.close()
+
+    def validate_many(self, iterable):
+        """
+        Validate many documents, lazily.
+
+        :param iterable: the documents to validate, it may be a generator
+        :return: a :class:`~jsonspec.validators.Result` per document,
+                 in the same order
+        """
+        self.start()
+        start = default_timer()
+        # chunks are submitted as results are consumed, so that at most
+        # window chunks are held in memory
+        window = 2 * (self.processes or os.cpu_count() or 1)
+        pending = deque()
+        try:
+            for chunk in chunked(iterable, self.chunksize):
+                pending.append(self.pool.apply_async(validate_chunk, (chunk,)))
+                if len(pending) >= window:
+                    yield from self.collect(pending.popleft())
+            while pending:
+                yield from self.collect(pending.popleft())
+        finally:
+            self.elapsed += default_timer() - start
+            logger.debug("%s documents/s", self.throughput)
+
+    def collect(self, pending):
+        results = pending.get()
+        self.count += len(results)
+        return results
+
+    @property
+    def throughput(self):
+        """Documents validated per second."""
+        if not self.elapsed:
+            return 0.0
+        return self.count / self.elapsed
@@ -0,0 +1,275 @@
+"""
+    jsonspec.validators.store
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Keeps compiled validators on disk, between processes.
+
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from jsonspec import __version__
+from jsonspec.reference.bases import Provider
+
+from .cache import fingerprint
+
+__all__ = ["SchemaStore"]
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaStore:
+    """
+    Compiled validators of schema files, pickled into a directory.
+
+    An entry is reused as long as its schema file keeps the same path,
+    modification time and size, the documents it refers to keep the same
+    content, and json-spec keeps the same version. Documents whose files
+    keep the same modification time and size are not fetched again. Otherwise the schema is
+    parsed and compiled again, and its entry is replaced.
+
+    Validators are linked before being stored, see
+    :func:`~jsonspec.validators.link`, so that loading them neither
+    parses nor compiles anything.
+
+    >>> store = SchemaStore('/var/cache/jsonspec')
+    >>> validator = store.load('schemas/user.json', provider=provider)
+
+    Entries are unpickled, so whoever can write into the directory can run
+    code in the processes that load them. The directory must be owned by
+    the current user and writable by nobody else, see :meth:`check`.
+
+    :ivar directory: where entries are stored
+    :ivar hits: number of validators loaded from their entry
+    :ivar misses: number of validators compiled
+    """
+
+    suffix = ".pickle"
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, filename, uri=None, spec=None):
+        """Returns the path of the entry of a schema file."""
+        source = os.path.realpath(filename)
+        key = json.dumps([source, uri, spec]).encode("utf-8")
+        return self.directory / (hashlib.sha1(key).hexdigest() + self.suffix)
+
+    def load(self, filename, uri=None, spec=None, provider=None):
+        """Returns the validator of a schema file, from its entry when it is
+        still fresh, or compiles it and stores it.
+
+        :param filename: the schema file
+        :param uri: the uri of the schema
+        :param spec: fallback to this spec if the schema does not provide
+                     its own
+        :param provider: the other schemas, in case of cross referencing
+        :rtype: Validator
+        :raises PermissionError: the directory cannot be trusted
+        """
+        self.check()
+        entry = self.entry(filename, uri, spec)
+        try:
+            with entry.open("rb") as file:
+                header = pickle.load(file)
+                if self.fresh(header, provider):
+                    validator = pickle.load(file)
+                    self.hits += 1
+                    logger.debug("loaded %s from %s", filename, entry)
+                    return validator
+        except FileNotFoundError:
+            pass
+        except Exception as error:
+            logger.warning("cannot read %s: %s", entry, error)
+        return self.build(filename, uri, spec, provider)
+
+    def build(self, filename, uri=None, spec=None, provider=None):
+        """Compiles a schema file, and stores its validator.
+
+        :rtype: Validator
+        """
+        from . import load
+
+        stat = os.stat(filename)
+        with open(filename) as file:
+            schema = json.load(file)
+        recorder = Recorder(provider)
+        validator = load(schema, uri, spec, recorder, cache=False, eager=True)
+        self.misses += 1
+
+        header = {
+            "version": __version__,
+            "source": os.path.realpath(filename),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "uri": uri,
+            "spec": spec,
+            "dependencies": {
+                key: dependency(provider, key, document)
+                for key, document in recorder.documents.items()
+            },
+        }
+        self.write(self.entry(filename, uri, spec), header, validator)
+        return validator
+
+    def write(self, entry, header, validator):
+        """Writes an entry atomically, so that concurrent processes never
+        read a partial one.
+        """
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.check()
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(header, file, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(validator, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, entry)
+        except Exception:
+            os.unlink(temporary)
+            raise
+        logger.debug("stored %s into %s", header["source"], entry)
+
+    def fresh(self, header, provider=None):
+        """Tells if an entry can still be used.
+
+        :param header: the metadata of the entry
+        :param provider: the provider of the documents it refers to
+        """
+        if header.get("version") != __version__:
+            return False
+        try:
+            stat = os.stat(header["source"])
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) != (header["mtime"], header["size"]):
+            return False
+        if provider is None:
+            provider = {}
+        for uri, dependency in header["dependencies"].items():
+            try:
+                if unchanged(dependency):
+                    continue
+                if fingerprint(provider[uri]) != dependency["digest"]:
+                    return False
+            except Exception as error:
+                # removed, unreadable or unknown
+                logger.debug("cannot fetch %s: %s", uri, error)
+                return False
+        return True
+
+    def check(self):
+        """Refuses a directory that others may write into, as its entries
+        are unpickled.
+
+        :raises PermissionError: the directory is not owned by the current
+                                 user, or its group or others may write
+                                 into it
+        """
+        if not hasattr(os, "getuid"):
+            # permissions are not posix ones
+            return
+        try:
+            stat = self.directory.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_uid != os.getuid():
+            raise PermissionError(
+                "{} is not owned by the current user".format(self.directory)
+            )
+        if stat.st_mode & 0o022:
+            raise PermissionError(
+                "{} is writable by its group or others".format(self.directory)
+            )
+
+    def entries(self):
+        """Lists the entries, by path."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*" + self.suffix))
+
+    def verify(self, provider=None, prune=False):
+        """Checks every entry.
+
+        :param provider: the provider of the documents they refer to
+        :param prune: delete the entries that cannot be used anymore
+        :return: the sources of the fresh and stale entries, and the paths
+                 of the corrupted ones
+        :rtype: dict
+        :raises PermissionError: the directory cannot be trusted
+        """
+        self.check()
+        report = {"fresh": [], "stale": [], "corrupted": []}
+        for entry in self.entries():
+            try:
+                with entry.open("rb") as file:
+                    header = pickle.load(file)
+                    pickle.load(file)
+            except Exception as error:
+                logger.debug("%s is corrupted: %s", entry, error)
+                report["corrupted"].append(str(entry))
+                status = "corrupted"
+            else:
+                status = "fresh" if self.fresh(header, provider) else "stale"
+                report[status].append(header["source"])
+            if prune and status != "fresh":
+                entry.unlink()
+        return report
+
+    def __repr__(self):
+        return "<{}({!r})>".format(self.__class__.__name__, str(self.directory))
+
+
+def dependency(provider, uri, document):
+    """Describes a document an entry refers to.
+
+    Its file is recorded too when the provider tells it, see
+    :meth:`~jsonspec.reference.providers.FilesystemProvider.source`.
+    """
+    source = getattr(provider, "source", None)
+    path, mtime, size = (source and source(uri)) or (None, None, None)
+    return {
+        "digest": fingerprint(document),
+        "path": path,
+        "mtime": mtime,
+        "size": size,
+    }
+
+
+def unchanged(dependency):
+    """Tells if the file of a dependency still has the same modification
+    time and size, so that it is not parsed again.
+    """
+    if dependency.get("path") is None:
+        return False
+    try:
+        stat = os.stat(dependency["path"])
+    except OSError:
+        return False
+    return (stat.st_mtime_ns, stat.st_size) == (dependency["mtime"], dependency["size"])
+
+
+class Recorder(Provider):
+    """Records the documents fetched from a provider."""
+
+    def __init__(self, provider=None):
+        self.provider = provider if provider is not None else {}
+        self.documents = {}
+
+    def __getitem__(self, uri):
+        document = self.provider[uri]
+        self.documents[uri] = document
+        return document
+
+    def __iter__(self):
+        return iter(self.provider)
+
+    def __len__(self):
+        return len(self.provider)
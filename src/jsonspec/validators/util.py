@@ -354,3 +354,144 @@ def validate_uri(obj):
         logger.exception(error)
         raise ValidationError("{!r} is not an uri".format(obj))
     return obj
+
+
+class PatternDispatch:
+    """Matches names against many patterns at once.
+
+    Patterns are folded into a single regex of optional lookaheads, so each
+    name is matched once whatever the number of patterns. Patterns that
+    cannot be folded safely (groups, backreferences or inline flags) are
+    searched one by one.
+
+    >>> dispatch = PatternDispatch(['^f', 'o$'])
+    >>> assert dispatch(['foo', 'bar']) == [['foo'], ['foo']]
+    """
+
+    def __init__(self, patterns):
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+        self.folded, self.singles = [], []
+        for i, regex in enumerate(self.patterns):
+            if regex.groups or regex.flags != re.UNICODE:
+                self.singles.append(i)
+            else:
+                self.folded.append(i)
+        self.regex = None
+        if self.folded:
+            self.regex = re.compile(
+                "".join(
+                    "(?:(?=(?s:.*?)(?:{})()))?".format(self.patterns[i].pattern)
+                    for i in self.folded
+                )
+            )
+
+    def __call__(self, names):
+        """Returns the matching names of every pattern, in patterns order.
+
+        :param names: the names to match, their order is kept
+        :rtype: list
+        """
+        matches = [[] for _ in self.patterns]
+        for name in names:
+            if self.regex:
+                groups = self.regex.match(name).groups()
+                for i, group in zip(self.folded, groups):
+                    if group is not None:
+                        matches[i].append(name)
+            for i in self.singles:
+                if self.patterns[i].search(name):
+                    matches[i].append(name)
+        return matches
+
+
+#: types whose values are their own canonical key
+scalar_types = {str, int, float, type(None)}
+
+
+def canonical_key(obj):
+    """Returns a hashable key of a json value.
+
+    Equal json values share the same key: ``1`` and ``1.0`` are equal,
+    but ``true`` and ``1`` are not, neither are ``false`` and ``0``.
+
+    :raises TypeError: obj is not a json value
+    """
+    cls = obj.__class__
+    if cls in scalar_types:
+        return obj
+    if cls is dict:
+        return dict, frozenset(
+            [
+                (k, v if v.__class__ in scalar_types else canonical_key(v))
+                for k, v in obj.items()
+            ]
+        )
+    if cls is list or cls is tuple:
+        return list, tuple(
+            [e if e.__class__ in scalar_types else canonical_key(e) for e in obj]
+        )
+    if isinstance(obj, bool):
+        return bool, obj
+    if isinstance(obj, (str, *number_types)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return list, tuple([canonical_key(element) for element in obj])
+    if isinstance(obj, dict):
+        return dict, frozenset([(k, canonical_key(v)) for k, v in obj.items()])
+    raise TypeError("{!r} is not a json value".format(obj))
+
+
+class EnumIndex:
+    """Hashed membership of enum values.
+
+    Members that are not json values are compared one by one.
+
+    >>> assert 1.0 in EnumIndex([1, 'foo'])
+    >>> assert True not in EnumIndex([1, 'foo'])
+    """
+
+    def __init__(self, members):
+        self.members = list(members)
+        self.keys = set()
+        self.fallback = []
+        for member in self.members:
+            try:
+                self.keys.add(canonical_key(member))
+            except TypeError:
+                self.fallback.append(member)
+
+    def __contains__(self, obj):
+        try:
+            key = canonical_key(obj)
+        except TypeError:
+            return obj in self.members
+        if key in self.keys:
+            return True
+        return any(obj == member for member in self.fallback)
+
+
+def has_duplicates(elements):
+    """Tells if a json array has equal elements.
+
+    Arrays of strings and numbers are hashed at once, other arrays stop on
+    the first duplicate.
+
+    >>> assert has_duplicates([1, 'foo', 1.0])
+    >>> assert not has_duplicates([1, True, {'a': 1}, {'a': True}])
+    """
+    if set(map(type, elements)) <= scalar_types:
+        return len(set(elements)) < len(elements)
+    seen = set()
+    try:
+        for element in elements:
+            key = canonical_key(element)
+            if key in seen:
+                return True
+            seen.add(key)
+    except TypeError:
+        return any(
+            elements[i] == elements[j]
+            for i in range(len(elements))
+            for j in range(i + 1, len(elements))
+        )
+    return False
@@ -0,0 +1,126 @@
+"""
+    tests.tests_cache
+    ~~~~~~~~~~~~~~~~~
+
+"""
+
+from threading import Thread
+
+import pytest
+
+from jsonspec.validators import Factory, ValidatorCache, load
+
+schema = {
+    "type": "object",
+    "properties": {"foo": {"type": "string"}, "bar": {"$ref": "#/definitions/bar"}},
+    "definitions": {"bar": {"type": "integer"}},
+}
+
+
+def test_hit():
+    cache = ValidatorCache()
+    validator = load(schema, cache=cache)
+    assert cache.info() == (0, 1, 128, 1)
+
+    reordered = dict(reversed(list(schema.items())))
+    assert load(reordered, cache=cache) is validator
+    assert cache.info() == (1, 1, 128, 1)
+    assert validator.validate({"foo": "baz", "bar": 42})
+
+
+def test_keys():
+    cache = ValidatorCache()
+    validator = load(schema, cache=cache)
+    assert load(schema, uri="foo#", cache=cache) is not validator
+    assert load(schema, spec="http://json-schema.org/draft-03/schema#", cache=cache)
+    assert load(schema, provider={}, cache=cache) is not validator
+    assert load(schema, backend="codegen", cache=cache) is not validator
+    assert load({"enum": [1]}, cache=cache) is not load({"enum": [1.0]}, cache=cache)
+    assert cache.hits == 1
+    assert load(schema, cache=cache) is validator
+
+
+def test_eviction():
+    cache = ValidatorCache(maxsize=2)
+    first = load({"type": "string"}, cache=cache)
+    load({"type": "integer"}, cache=cache)
+    load({"type": "string"}, cache=cache)
+    load({"type": "object"}, cache=cache)
+    assert len(cache) == 2
+    assert load({"type": "string"}, cache=cache) is first
+    assert cache.info().misses == 3
+
+
+def test_invalidate():
+    cache = ValidatorCache()
+    provider = {"foo": {"type": "string"}}
+    validator = load(schema, provider=provider, cache=cache)
+    load({"type": "string"}, cache=cache)
+
+    assert cache.invalidate(provider=provider) == 1
+    assert load(schema, provider=provider, cache=cache) is not validator
+    assert cache.invalidate(schema={"type": "string"}) == 1
+    assert cache.invalidate(uri="#") == 1
+    assert len(cache) == 0
+
+    load(schema, cache=cache)
+    cache.clear()
+    assert cache.info() == (0, 0, 128, 0)
+
+
+def test_disabled():
+    assert load(schema, cache=False) is not load(schema, cache=False)
+    factory = Factory(cache=False)
+    assert factory(schema, "#") is not factory(schema, "#")
+
+
+def test_threads():
+    cache = ValidatorCache(maxsize=4)
+    schemas = [{"title": str(i)} for i in range(8)]
+
+    def work():
+        for _ in range(50):
+            for sch in schemas:
+                load(sch, cache=cache).validate("foo")
+
+    threads = [Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache.info()
+    assert info.hits + info.misses == 4 * 50 * 8
+    assert info.currsize == 4
+
+
+def test_references_compiled_once():
+    factory = Factory(cache=False)
+    schema = {
+        "properties": {
+            "a{}".format(i): {"$ref": "#/definitions/name"} for i in range(200)
+        },
+        "definitions": {"name": {"type": "string"}},
+    }
+    validator = factory(schema, "#")
+    document = {"a{}".format(i): "foo" for i in range(200)}
+    assert validator.validate(document) == document
+    assert factory.saved_compilations == 199
+
+    targets = {ref.validator for ref in validator.attrs["properties"].values()}
+    assert len(targets) == 1
+
+
+def test_recursive_references():
+    factory = Factory(cache=False)
+    validator = factory({"items": {"$ref": "#"}, "maxItems": 1}, "#")
+    assert validator.attrs["items"].validator is validator
+    assert validator.is_valid([[[]]])
+    assert not validator.is_valid([[[], []]])
+
+
+def test_cache_argument():
+    schema = {"type": "string", "minLength": 7}
+    assert load(schema, cache=True) is load(schema)
+    assert load(schema, cache=False) is not load(schema, cache=False)
+    with pytest.raises(TypeError):
+        load(schema, cache={})
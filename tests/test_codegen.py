@@ -0,0 +1,98 @@
+"""
+    tests.tests_codegen
+    ~~~~~~~~~~~~~~~~~~~
+
+"""
+
+import pytest
+
+from jsonspec.validators import CodeValidator, CompilationError, ValidationError, load
+
+from .test_errors2 import scenarii, scenarii2, schema, schema2
+
+
+def flatten(validator, document):
+    try:
+        return validator.validate(document)
+    except ValidationError as error:
+        return error.flatten()
+
+
+@pytest.mark.parametrize(
+    "schema, document",
+    [(schema, document) for document, _, _ in scenarii]
+    + [(schema2, document) for document, _, _ in scenarii2],
+)
+def test_same_errors(schema, document):
+    expected = flatten(load(schema), document)
+    assert flatten(load(schema, backend="codegen"), document) == expected
+
+
+def test_only_declared_keywords():
+    validator = load({"type": "string", "maxLength": 4}, backend="codegen")
+    assert isinstance(validator, CodeValidator)
+    assert "len(obj) > 4" in validator.source
+    assert "enum" not in validator.source
+    assert "sequence_types" not in validator.source
+    assert validator.validate("foo") == "foo"
+    with pytest.raises(ValidationError):
+        validator.validate("foo bar")
+
+
+def test_recursive():
+    validator = load(
+        {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "children": {"type": "array", "items": {"$ref": "#"}},
+            },
+        },
+        backend="codegen",
+    )
+    validator.validate({"name": "foo", "children": [{"name": "bar", "children": []}]})
+    with pytest.raises(ValidationError):
+        validator.validate({"name": "foo", "children": [{"name": 42}]})
+    # root, name and children
+    assert validator.source.count("def ") == 3
+
+
+def test_defaults():
+    validator = load(
+        {"properties": {"foo": {"default": 42}, "bar": {"properties": {}}}},
+        backend="codegen",
+    )
+    document = {"bar": {}}
+    assert validator.validate(document, copy=False) == {"foo": 42, "bar": {}}
+    assert document == {"bar": {}}
+
+
+def test_unknown_backend():
+    with pytest.raises(CompilationError):
+        load({}, backend="foo")
+
+
+@pytest.mark.parametrize("backend", [None, "codegen"])
+def test_pattern_properties(backend):
+    validator = load(
+        {
+            "patternProperties": {
+                "^x-": {"type": "string"},
+                "-id$": {"type": "integer"},
+                "(a)\\1": {"maxLength": 1},
+            },
+            "additionalProperties": False,
+        },
+        backend=backend,
+    )
+    assert validator.validate({"user-id": 1, "x-foo": "bar", "aa": "b"})
+    with pytest.raises(ValidationError) as error:
+        validator.validate({"user-id": "foo", "baz": 1, "aa": "bb"})
+    assert set(error.value.flatten()) == {"#/user-id", "#/baz", "#/aa"}
+
+
+def test_invalid_pattern():
+    with pytest.raises(CompilationError):
+        load({"pattern": "(foo"})
+    with pytest.raises(CompilationError):
+        load({"patternProperties": {"(foo": {}}})
@@ -5,6 +5,7 @@
 """
 
 import json
+import os
 from subprocess import PIPE, Popen
 
 import pytest
@@ -34,6 +35,8 @@ scenarii = [
     ("""echo '{"foo": ["bar", "baz"]}' | json extract '#/foo/1'""", True),
     ("""json extract '#/foo/2' --document-json='{"foo": ["bar", "baz"]}'""", False),
     ("""echo '{"foo": ["bar", "baz"]}' | json extract '#/foo/2'""", False),
+    ("""echo '{"foo": ["bar", "baz"]}' | json extract '#/foo/0' '#/foo/2'""", True),
+    ("""echo '{"foo": ["bar", "baz"]}' | json extract '#/foo/0' 'foo'""", False),
     # existant file
     ("""cat fixtures/first.data1.json | json extract '#/name'""", True),
     ("""json extract '#/name' < fixtures/first.data1.json""", True),
@@ -56,6 +59,18 @@ scenarii = [
         """json validate --schema-file=fixtures/three.schema.json < fixtures/three.data2.json""",
         True,
     ),
+    (
+        """json validate --check --schema-file=fixtures/three.schema.json < fixtures/three.data1.json""",
+        False,
+    ),
+    (
+        """json validate --check --schema-file=fixtures/three.schema.json < fixtures/three.data2.json""",
+        True,
+    ),
+    (
+        """json validate --schema-file=fixtures/three.schema.json --ndjson=fixtures/three.valid.ndjson""",
+        True,
+    ),
 ]
 
 
@@ -72,6 +87,56 @@ def test_cli(cmd, success):
         assert False, (ret, stdout, stderr)
 
 
+def test_cli_cache(tmp_path):
+    from . import fixture_dir
+
+    directory = os.path.join(fixture_dir, "fs")
+    args = [directory, "--cache-dir", str(tmp_path)]
+    cmd = cli.CacheCommand()
+    response = json.loads(cmd.run(cmd.parse_args(args)))
+    assert len(response["built"]) == 2
+    response = json.loads(cmd.run(cmd.parse_args(args + ["--verify"])))
+    assert len(response["fresh"]) == 2
+
+
+def test_cli_extract_many():
+    cmd = cli.ExtractCommand()
+    doc = json.dumps({"foo": ["bar", "baz"]})
+    args = ["#/foo/1", "/foo/0", "#/foo/2", "--document-json", doc]
+    runner(cmd, args, True, {"#/foo/1": "baz", "/foo/0": "bar"})
+
+
+def test_cli_diff():
+    cmd = cli.DiffCommand()
+    old = json.dumps({"foo": ["bar", "baz"]})
+    new = json.dumps({"foo": ["bar"], "qux": 42})
+    args = ["--document-json", old, "--new-json", new]
+    runner(
+        cmd,
+        args,
+        True,
+        [
+            {"op": "remove", "path": "/foo/1"},
+            {"op": "add", "path": "/qux", "value": 42},
+        ],
+    )
+    args += ["--limit", "1"]
+    runner(cmd, args, True, [{"op": "replace", "path": "", "value": json.loads(new)}])
+
+
+def test_cli_merge():
+    cmd = cli.MergeCommand()
+    doc = json.dumps({"foo": {"bar": 1, "baz": 2}})
+    patch = json.dumps({"foo": {"bar": None}, "qux": [42]})
+    args = ["--document-json", doc, "--patch-json", patch]
+    runner(cmd, args, True, {"foo": {"baz": 2}, "qux": [42]})
+
+    cmd = cli.DiffCommand()
+    new = json.dumps({"foo": {"baz": 2}, "qux": [42]})
+    args = ["--document-json", doc, "--new-json", new, "--merge"]
+    runner(cmd, args, True, {"foo": {"bar": None}, "qux": [42]})
+
+
 add_scenes = [
     ("#/foo/bar", {"foo": "bar"}, {"baz": "quux"}, False, None),
     ("#/baz", {"foo": "bar"}, "quux", True, {"foo": "bar", "baz": "quux"}),
@@ -149,3 +214,26 @@ def test_cli_copy(pointer, document, target, success, result):
         success,
         result,
     )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_cli_validate_ndjson(jobs):
+    cmd = "json validate --schema-file=fixtures/three.schema.json --jobs={} --ndjson < fixtures/three.data.ndjson".format(
+        jobs
+    )
+    with move_cwd():
+        proc = Popen(cmd, stderr=PIPE, stdout=PIPE, shell=True)
+        stdout, stderr = proc.communicate()
+    assert proc.returncode == 1
+    records = [json.loads(line) for line in stdout.decode("utf-8").splitlines()]
+    assert records[0] == {"line": 1, "valid": True}
+    assert records[1] == {
+        "line": 2,
+        "pointer": "#/shipping_address/type",
+        "reason": "Missing property",
+    }
+    assert records[-1]["line"] == 3
+    assert records[-1]["reason"].startswith("Invalid JSON")
+    summary = json.loads(stderr.decode("utf-8"))
+    assert summary["records"] == 3
+    assert summary["invalid"] == 2
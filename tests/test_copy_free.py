@@ -0,0 +1,88 @@
+"""
+    tests.tests_copy_free
+    ~~~~~~~~~~~~~~~~~~~~~
+
+"""
+
+from copy import deepcopy
+
+import pytest
+
+from jsonspec.validators import ValidationError, load
+
+schema = {
+    "type": "object",
+    "properties": {
+        "foo": {"type": "string"},
+        "bar": {
+            "type": "object",
+            "properties": {
+                "baz": {"type": "integer", "default": 42},
+            },
+        },
+        "items": {"type": "array", "items": {"type": "object"}},
+    },
+}
+
+
+def test_no_copy():
+    document = {"foo": "bar", "items": [{}, {}]}
+    validated = load(schema).validate(document, copy=False)
+    assert validated is document
+    assert validated["items"] is document["items"]
+
+
+def test_defaults_are_copied_on_write():
+    document = {"foo": "bar", "bar": {}, "items": [{}]}
+    expected = deepcopy(document)
+    validated = load(schema).validate(document, copy=False)
+    assert document == expected
+    assert validated == {"foo": "bar", "bar": {"baz": 42}, "items": [{}]}
+
+    # only the containers on the path of the default are copied
+    assert validated is not document
+    assert validated["bar"] is not document["bar"]
+    assert validated["items"] is document["items"]
+
+
+def test_errors():
+    validator = load(schema)
+    with pytest.raises(ValidationError) as error:
+        validator.validate({"foo": 1, "items": [{}, 2]}, copy=False)
+    assert error.value.flatten() == {
+        "#/foo": {"Wrong type"},
+        "#/items/1": {"Wrong type"},
+    }
+
+    # errors are not kept between calls
+    assert validator.validate({"foo": "bar"}, copy=False) == {"foo": "bar"}
+
+
+def test_draft03():
+    validator = load(
+        {
+            "type": "object",
+            "properties": {"foo": {"type": "array", "items": {"type": "string"}}},
+        },
+        spec="http://json-schema.org/draft-03/schema#",
+    )
+    document = {"foo": ["bar", "baz"]}
+    assert validator.validate(document, copy=False) is document
+
+    with pytest.raises(ValidationError):
+        validator.validate({"foo": ["bar", 42]}, copy=False)
+
+
+def test_is_valid(monkeypatch):
+    def forbidden(*args):
+        raise AssertionError("pointer built")
+
+    monkeypatch.setattr("jsonspec.validators.bases.pointer_join", forbidden)
+    document = {"foo": "bar", "bar": {}, "items": [{}, {}]}
+    expected = deepcopy(document)
+    for backend in (None, "codegen"):
+        validator = load(schema, backend=backend)
+        assert validator.is_valid(document)
+        assert not validator.is_valid({"foo": 1, "items": [{}, 2]})
+        assert not validator.is_valid({"bar": {"baz": "qux"}})
+    assert document == expected
@@ -0,0 +1,74 @@
+"""
+    tests.test_diff
+    ~~~~~~~~~~~~~~~
+
+"""
+
+import pytest
+
+from jsonspec.operations import apply_patch, diff
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ({"foo": "bar"}, {"foo": "bar"}),
+        ({"foo": "bar"}, {"foo": "baz", "qux": [1, 2]}),
+        ({"foo": {"a/b": 1, "m~n": 2}}, {"foo": {"a/b": 2}}),
+        ([1, 2, 3, 4, 5], [0, 1, 3, 4, 6, 5]),
+        ([{"a": 1}, {"b": 2}], [{"b": 2}, {"a": 1}]),
+        ({"foo": [1, 2]}, {"foo": {"0": 1}}),
+        ({"foo": 1}, [1]),
+        (True, 1),
+        ([True], [1]),
+        ("foo", None),
+    ],
+)
+def test_roundtrip(old, new):
+    patch = diff(old, new)
+    assert apply_patch(old, patch) == new
+    if old is new or repr(old) == repr(new):
+        assert patch == []
+
+
+def test_minimal_sequences():
+    old = list(range(100))
+    new = old[:10] + ["inserted"] + old[10:50] + old[51:]
+    assert diff(old, new) == [
+        {"op": "add", "path": "/10", "value": "inserted"},
+        {"op": "remove", "path": "/51"},
+    ]
+
+
+def test_root():
+    assert diff({"foo": 1}, ["foo"]) == [
+        {"op": "replace", "path": "", "value": ["foo"]}
+    ]
+
+
+def test_moves():
+    subtree = {"bar": [1, 2, 3], "baz": "qux"}
+    old = {"foo": {"old": subtree}, "other": 1}
+    new = {"foo": {}, "other": 1, "new": subtree}
+    patch = diff(old, new)
+    assert patch == [{"op": "move", "from": "/foo/old", "path": "/new"}]
+    assert apply_patch(old, patch) == new
+
+    assert diff(old, new, moves=False) == [
+        {"op": "remove", "path": "/foo/old"},
+        {"op": "add", "path": "/new", "value": subtree},
+    ]
+
+
+def test_limit():
+    old = {"a": 1, "b": 2, "c": 3}
+    new = {"a": 2, "b": 3, "c": 4}
+    assert len(diff(old, new, limit=3)) == 3
+    assert diff(old, new, limit=2) == [{"op": "replace", "path": "", "value": new}]
+
+
+def test_collisions():
+    # equal hashes, distinct values
+    assert hash(-1) == hash(-2)
+    old, new = {"foo": [-1, 0]}, {"foo": [-2, 0]}
+    assert apply_patch(old, diff(old, new)) == new
@@ -0,0 +1,62 @@
+"""
+    tests.tests_dispatch
+    ~~~~~~~~~~~~~~~~~~~~
+
+"""
+
+from collections import OrderedDict
+
+import pytest
+
+from jsonspec.validators import Draft03Validator, Draft04Validator, load
+
+schema = {
+    "type": ["object", "string"],
+    "enum": [{"foo": "bar"}, "baz"],
+    "properties": {"foo": {"type": "string"}},
+    "maxLength": 3,
+}
+
+
+def names(checks):
+    return [check.__name__ for check in checks]
+
+
+def test_draft04():
+    validator = load(schema)
+    assert names(validator.checks_for({})) == [
+        "validate_enum",
+        "validate_properties",
+        "validate_default_properties",
+    ]
+    assert names(validator.checks_for("baz")) == [
+        "validate_enum",
+        "validate_max_length",
+    ]
+    assert names(validator.checks_for(1)) == ["validate_enum", "validate_type"]
+    assert names(load({}).checks_for([])) == []
+
+
+def test_draft03():
+    validator = load(schema, spec="http://json-schema.org/draft-03/schema#")
+    assert names(validator.checks_for(1)) == ["validate_enum", "validate_type"]
+    assert names(validator.checks_for("baz")) == [
+        "validate_enum",
+        "validate_max_length",
+    ]
+
+    validator = load(
+        {"type": [{"type": "string"}], "disallow": ["integer"]},
+        spec="http://json-schema.org/draft-03/schema#",
+    )
+    assert names(validator.checks_for(1)) == ["validate_type", "validate_disallow"]
+    assert names(validator.checks_for("foo")) == ["validate_type"]
+
+
+@pytest.mark.parametrize("spec", [None, "http://json-schema.org/draft-03/schema#"])
+def test_subclasses(spec):
+    validator = load(schema, spec=spec, cache=False)
+    assert validator.validate(OrderedDict(foo="bar")) == {"foo": "bar"}
+    assert not validator.is_valid(OrderedDict(foo=1))
+    assert set(validator.dispatch) == {OrderedDict}
+    assert isinstance(validator, (Draft03Validator, Draft04Validator))
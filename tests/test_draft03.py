@@ -66,3 +66,35 @@ def test_common(schema, description, data, valid, src):
         if valid:
             logger.exception(error)
             assert False, description
+
+
+@pytest.mark.parametrize("schema, description, data, valid, src", scenarios("draft3"))
+def test_common_codegen(schema, description, data, valid, src):
+    try:
+        load(
+            schema,
+            provider=provider,
+            spec="http://json-schema.org/draft-03/schema#",
+            backend="codegen",
+        ).validate(data)
+        if not valid:
+            assert False, description
+    except (ValidationError, CompilationError) as error:
+        if valid:
+            logger.exception(error)
+            assert False, description
+
+
+@pytest.mark.parametrize("schema, description, data, valid, src", scenarios("draft3"))
+@pytest.mark.parametrize("backend", [None, "codegen"])
+def test_common_is_valid(schema, description, data, valid, src, backend):
+    try:
+        validator = load(schema, provider=provider, backend=backend)
+        validator.validate(data)
+        expected = True
+    except ValidationError:
+        expected = False
+    except Exception:
+        # broken references are covered by test_common
+        return
+    assert validator.is_valid(data) is expected, description
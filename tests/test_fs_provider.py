@@ -4,10 +4,15 @@
 
 """
 
+import json
+import pickle
+from queue import Queue
+
 import pytest
 
 from jsonspec.reference import NotFound
 from jsonspec.reference.providers import FilesystemProvider
+from jsonspec.validators import ValidatorCache, load
 
 from . import fixture_dir
 
@@ -25,3 +30,168 @@ def test_fs_provider():
     with pytest.raises(NotFound):
         provider["foo/bar"]
     assert provider["/foo/bar"]["id"] == "/foo/bar"
+
+
+def counting(provider):
+    parsed = []
+    parse = provider._parse
+
+    def wrapper(filename):
+        parsed.append(filename.name)
+        return parse(filename)
+
+    provider._parse = wrapper
+    return parsed
+
+
+def test_lazy():
+    provider = FilesystemProvider(directory=fixture_dir, lazy=True, maxsize=2)
+    parsed = counting(provider)
+    eager = FilesystemProvider(directory=fixture_dir)
+
+    assert provider["first.data1"] == eager["first.data1"]
+    assert provider["first.schema"] == eager["first.schema"]
+    assert parsed == ["first.data1.json", "first.schema.json"]
+
+    # least recently used documents are parsed again
+    provider["first.data1"]
+    provider["second.schema"]
+    provider["first.data1"]
+    provider["first.schema"]
+    assert parsed.count("first.data1.json") == 1
+    assert parsed.count("first.schema.json") == 2
+    assert len(provider._documents) == 2
+
+
+def test_lazy_ids():
+    provider = FilesystemProvider(directory=fixture_dir, lazy=True)
+    parsed = counting(provider)
+
+    # named by their id once parsed
+    with pytest.raises(NotFound):
+        provider["foo"]
+    assert provider.scanned
+    assert provider["/foo"]["id"] == "/foo"
+    assert provider["/foo/bar"]["id"] == "/foo/bar"
+    with pytest.raises(NotFound):
+        provider["foo/bar"]
+    assert sorted(provider) == sorted(FilesystemProvider(directory=fixture_dir))
+    assert len(parsed) == len(set(parsed))
+
+
+def test_lazy_load():
+    provider = FilesystemProvider(fixture_dir, prefix="test:", lazy=True)
+    parsed = counting(provider)
+    validator = load({"$ref": "test:first.schema#"}, provider=provider, cache=False)
+    validator.validate({"firstName": "John", "lastName": "Doe"})
+    assert parsed == ["first.schema.json"]
+    assert not provider.scanned
+
+
+def test_manifest(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    built = FilesystemProvider(directory=fixture_dir).build_manifest(manifest)
+    assert built["/foo/bar"] == "fs/foo/bar.json"
+
+    provider = FilesystemProvider(directory=fixture_dir, manifest=str(manifest))
+    parsed = counting(provider)
+    assert provider["/foo/bar"]["id"] == "/foo/bar"
+    with pytest.raises(NotFound):
+        provider["foo/bar"]
+    assert parsed == ["bar.json"]
+    assert len(provider) == len(built)
+    assert not provider.scanned
+
+
+def test_pickle():
+    provider = FilesystemProvider(directory=fixture_dir, lazy=True)
+    provider["first.data1"]
+    provider = pickle.loads(pickle.dumps(provider))
+    assert provider["/foo"]["id"] == "/foo"
+
+
+def write(path, schema):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(schema))
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_refresh(tmp_path, lazy):
+    write(tmp_path / "foo.json", {"type": "string"})
+    write(tmp_path / "bar" / "baz.json", {"id": "baz", "type": "integer"})
+    provider = FilesystemProvider(str(tmp_path), lazy=lazy)
+    assert not provider.refresh()
+
+    assert provider["foo"] == {"type": "string"}
+    assert provider["baz"]["type"] == "integer"
+    parsed = counting(provider)
+
+    write(tmp_path / "foo.json", {"type": "string", "maxLength": 3})
+    write(tmp_path / "qux.json", {"type": "null"})
+    (tmp_path / "bar" / "baz.json").unlink()
+    changes = provider.refresh()
+    assert changes.added == [str(tmp_path / "qux.json")]
+    assert changes.changed == [str(tmp_path / "foo.json")]
+    assert changes.removed == [str(tmp_path / "bar" / "baz.json")]
+
+    assert provider["foo"]["maxLength"] == 3
+    assert provider["qux"] == {"type": "null"}
+    with pytest.raises(NotFound):
+        provider["baz"]
+    assert sorted(parsed) == ["foo.json", "qux.json"]
+    assert not provider.refresh()
+
+
+def test_refresh_ids(tmp_path):
+    write(tmp_path / "foo.json", {"id": "foo:1"})
+    provider = FilesystemProvider(str(tmp_path), lazy=True)
+    assert provider["foo:1"]
+
+    write(tmp_path / "foo.json", {"id": "foo:22"})
+    provider.refresh()
+    assert provider["foo:22"] == {"id": "foo:22"}
+    with pytest.raises(NotFound):
+        provider["foo:1"]
+
+
+def test_refresh_scanned_ids(tmp_path):
+    write(tmp_path / "a.json", {"type": "null"})
+    write(tmp_path / "b.json", {"type": "string"})
+    provider = FilesystemProvider(str(tmp_path), prefix="my:", lazy=True)
+    provider.scan()
+    assert provider["my:b#"] == {"type": "string"}
+
+    write(tmp_path / "b.json", {"type": "string", "id": "other"})
+    assert provider.refresh().changed == [str(tmp_path / "b.json")]
+    assert provider["my:other#"]["id"] == "other"
+    with pytest.raises(NotFound):
+        provider["my:b#"]
+
+
+def test_refresh_invalidates(tmp_path):
+    write(tmp_path / "foo.json", {"type": "string"})
+    provider = FilesystemProvider(str(tmp_path), prefix="test:")
+    cache = ValidatorCache()
+    schema = {"$ref": "test:foo#"}
+    validator = load(schema, provider=provider, cache=cache)
+    assert validator.is_valid("bar")
+    assert load(schema, provider=provider, cache=cache) is validator
+
+    write(tmp_path / "foo.json", {"type": "integer"})
+    provider.refresh([cache])
+    validator = load(schema, provider=provider, cache=cache)
+    assert validator.is_valid(42)
+    assert not validator.is_valid("bar")
+
+
+def test_watch(tmp_path):
+    write(tmp_path / "foo.json", {"type": "string"})
+    provider = FilesystemProvider(str(tmp_path))
+    assert provider["foo"]
+
+    refreshed = Queue()
+    with provider.watch(0.01, refreshed.put, caches=[], poll=True):
+        write(tmp_path / "bar.json", {"type": "integer"})
+        changes = refreshed.get(timeout=5)
+    assert changes.added == [str(tmp_path / "bar.json")]
+    assert provider["bar"] == {"type": "integer"}
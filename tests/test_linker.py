@@ -0,0 +1,76 @@
+"""
+    tests.test_linker
+    ~~~~~~~~~~~~~~~~~
+
+"""
+
+import pytest
+
+from jsonspec.validators import CompilationError, ReferenceValidator, link, load
+from jsonspec.validators.bases import Validator
+
+
+def references(validator):
+    found = []
+    pending = [validator.attrs]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, ReferenceValidator):
+            found.append(value)
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, Validator):
+            pending.append(value.attrs)
+    return found
+
+
+def test_direct_links():
+    schema = {
+        "properties": {"foo": {"$ref": "#/definitions/foo"}},
+        "definitions": {"foo": {"type": "string"}},
+    }
+    validator = load(schema, cache=False, eager=True)
+    assert not references(validator)
+    assert isinstance(validator.attrs["properties"]["foo"], Validator)
+    assert validator.validate({"foo": "bar"})
+    assert not validator.is_valid({"foo": 42})
+
+
+def test_root_reference():
+    validator = load(
+        {"$ref": "#/definitions/foo", "definitions": {"foo": {"type": "integer"}}},
+        cache=False,
+        eager=True,
+    )
+    assert not isinstance(validator, ReferenceValidator)
+    assert validator.is_valid(42)
+
+
+def test_recursive():
+    validator = link(load({"items": {"$ref": "#"}, "maxItems": 1}, cache=False))
+    assert validator.attrs["items"] is validator
+    assert validator.is_valid([[[]]])
+    assert not validator.is_valid([[[], []]])
+
+
+def test_remote():
+    provider = {"http://example.com/tree": {"items": {"$ref": "#"}, "maxItems": 1}}
+    validator = load(
+        {"$ref": "http://example.com/tree#"},
+        provider=provider,
+        cache=False,
+        eager=True,
+    )
+    assert validator.attrs["items"] is validator
+    assert not validator.is_valid([[[], []]])
+
+
+def test_broken():
+    schema = {"properties": {"foo": {"$ref": "#/definitions/missing"}}}
+    validator = load(schema, cache=False)
+    with pytest.raises(CompilationError):
+        load(schema, cache=False, eager=True)
+    with pytest.raises(CompilationError):
+        validator.validate({"foo": 42})
@@ -0,0 +1,77 @@
+"""
+    tests.test_merge
+    ~~~~~~~~~~~~~~~~
+
+"""
+
+import pytest
+
+from jsonspec.operations import Error, merge, merge_diff
+
+# RFC 7386, appendix A
+rfc_scenarii = [
+    ({"a": "b"}, {"a": "c"}, {"a": "c"}),
+    ({"a": "b"}, {"b": "c"}, {"a": "b", "b": "c"}),
+    ({"a": "b"}, {"a": None}, {}),
+    ({"a": "b", "b": "c"}, {"a": None}, {"b": "c"}),
+    ({"a": ["b"]}, {"a": "c"}, {"a": "c"}),
+    ({"a": "c"}, {"a": ["b"]}, {"a": ["b"]}),
+    ({"a": {"b": "c"}}, {"a": {"b": "d", "c": None}}, {"a": {"b": "d"}}),
+    ({"a": [{"b": "c"}]}, {"a": [1]}, {"a": [1]}),
+    (["a", "b"], ["c", "d"], ["c", "d"]),
+    ({"a": "b"}, ["c"], ["c"]),
+    ({"a": "foo"}, None, None),
+    ({"a": "foo"}, "bar", "bar"),
+    ({"e": None}, {"a": 1}, {"e": None, "a": 1}),
+    ([1, 2], {"a": "b", "c": None}, {"a": "b"}),
+    ({}, {"a": {"bb": {"ccc": None}}}, {"a": {"bb": {}}}),
+]
+
+
+@pytest.mark.parametrize("doc, patch, expected", rfc_scenarii)
+def test_merge(doc, patch, expected):
+    for kwargs in [{}, {"share": True}, {"inplace": True}]:
+        assert merge(doc, patch, **kwargs) == expected
+
+
+def test_merge_copies():
+    doc = {"foo": {"bar": 1}, "baz": {"qux": [1]}}
+    patch = {"foo": {"bar": 2, "new": {"a": 1}}}
+
+    response = merge(doc, patch)
+    assert response == {"foo": {"bar": 2, "new": {"a": 1}}, "baz": {"qux": [1]}}
+    assert doc == {"foo": {"bar": 1}, "baz": {"qux": [1]}}
+    assert response["baz"] is not doc["baz"]
+    assert response["foo"]["new"] is not patch["foo"]["new"]
+
+    response = merge(doc, patch, share=True)
+    assert doc == {"foo": {"bar": 1}, "baz": {"qux": [1]}}
+    assert response["baz"] is doc["baz"]
+    assert response["foo"] is not doc["foo"]
+
+    response = merge(doc, patch, inplace=True)
+    assert response is doc
+    assert doc["foo"] == {"bar": 2, "new": {"a": 1}}
+
+
+@pytest.mark.parametrize("doc, patch, expected", rfc_scenarii)
+def test_merge_diff(doc, patch, expected):
+    if expected is not None and "e" in expected:
+        # null members cannot be set
+        return
+    assert merge(doc, merge_diff(doc, expected)) == expected
+
+
+def test_merge_diff_minimal():
+    old = {"foo": {"bar": 1, "baz": [1, 2]}, "qux": True}
+    new = {"foo": {"bar": 1, "baz": [1]}, "qux": 1}
+    assert merge_diff(old, new) == {"foo": {"baz": [1]}, "qux": 1}
+    assert merge_diff(old, old) == {}
+
+
+def test_merge_diff_nulls():
+    with pytest.raises(Error):
+        merge_diff({"foo": 1}, {"foo": None})
+    with pytest.raises(Error):
+        merge_diff({}, {"foo": {"bar": None}})
+    assert merge_diff({}, {"foo": [None]}) == {"foo": [None]}
@@ -12,12 +12,14 @@ from jsonspec.operations import (
     Error,
     NonexistentTarget,
     add,
+    apply_patch,
     check,
     copy,
     move,
     remove,
     replace,
 )
+from jsonspec.operations.bases import MutableTarget, SharedTarget
 
 from . import MyMappingType, MySequenceType
 
@@ -175,3 +177,214 @@ def test_adding_mapping_type_value():
     assert add(obj, "/foo/-", ["abc", "def"]) == MyMappingType(
         {"foo": ["bar", ["abc", "def"]]}
     )
+
+
+def test_apply_patch():
+    obj = {"foo": {"bar": "baz", "waldo": "fred"}, "qux": {"corge": "grault"}}
+    response = apply_patch(
+        obj,
+        [
+            {"op": "test", "path": "/foo/bar", "value": "baz"},
+            {"op": "move", "from": "/foo/waldo", "path": "/qux/thud"},
+            {"op": "add", "path": "/list", "value": ["a", "c"]},
+            {"op": "add", "path": "/list/1", "value": "b"},
+            {"op": "copy", "from": "/list", "path": "/copied"},
+            {"op": "remove", "path": "/list/0"},
+            {"op": "replace", "path": "/foo/bar", "value": 42},
+        ],
+    )
+    assert response == {
+        "foo": {"bar": 42},
+        "qux": {"corge": "grault", "thud": "fred"},
+        "list": ["b", "c"],
+        "copied": ["a", "b", "c"],
+    }
+    assert obj == {"foo": {"bar": "baz", "waldo": "fred"}, "qux": {"corge": "grault"}}
+
+
+def test_apply_patch_atomic():
+    obj = {"foo": ["bar"]}
+    for operations in [
+        [{"op": "add", "path": "/foo/-", "value": 1}, {"op": "remove", "path": "/baz"}],
+        [{"op": "move", "from": "/foo/0", "path": "/baz/quux"}],
+        [{"op": "test", "path": "/foo/0", "value": "baz"}],
+        [{"op": "test", "path": "/foo/1", "value": "baz"}],
+        [{"op": "replace", "path": "/foo/0"}],
+        [{"op": "copy", "path": "/foo/0"}],
+        [{"op": "unknown", "path": "/foo/0"}],
+        [{"path": "/foo/0"}],
+        ["foo"],
+    ]:
+        with pytest.raises(Error):
+            apply_patch(obj, operations)
+        assert obj == {"foo": ["bar"]}
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "add", "path": 5, "value": 1},
+        {"op": "remove", "path": None},
+        {"op": "replace", "path": ["foo"], "value": 1},
+        {"op": "move", "from": ["foo"], "path": "/bar"},
+        {"op": "copy", "from": 0, "path": "/bar"},
+    ],
+)
+def test_apply_patch_pointer_types(operation):
+    for kwargs in [{}, {"share": True}, {"inplace": True}]:
+        with pytest.raises(Error):
+            apply_patch({"foo": 1}, [operation], **kwargs)
+
+
+def test_apply_patch_copies_once(monkeypatch):
+    from jsonspec.operations import bases
+
+    copied = []
+    deepcopy = bases.deepcopy
+    monkeypatch.setattr(
+        bases, "deepcopy", lambda obj: copied.append(obj) or deepcopy(obj)
+    )
+    obj = {"foo": {"bar": "baz"}}
+    operations = [
+        {"op": "move", "from": "/foo", "path": "/bar"},
+        {"op": "move", "from": "/bar", "path": "/foo"},
+    ]
+    assert apply_patch(obj, operations * 50) == obj
+    assert copied == [obj]
+
+
+def test_share():
+    obj = {"foo": {"bar": {"baz": 1}, "qux": [1, 2]}, "other": {"large": [0] * 10}}
+    response = replace(obj, "/foo/bar/baz", 2, share=True)
+    assert response == {
+        "foo": {"bar": {"baz": 2}, "qux": [1, 2]},
+        "other": {"large": [0] * 10},
+    }
+    assert obj["foo"]["bar"] == {"baz": 1}
+    assert response["other"] is obj["other"]
+    assert response["foo"]["qux"] is obj["foo"]["qux"]
+    assert response["foo"] is not obj["foo"]
+
+    response = add(obj, "/foo/qux/1", 3, share=True)
+    assert response["foo"]["qux"] == [1, 3, 2]
+    assert obj["foo"]["qux"] == [1, 2]
+    assert response["foo"]["bar"] is obj["foo"]["bar"]
+
+    response = move(obj, "/foo/moved", "/other/large", share=True)
+    assert response["foo"]["moved"] is obj["other"]["large"]
+    assert response["other"] == {}
+    assert obj["other"] == {"large": [0] * 10}
+
+
+@pytest.mark.parametrize(
+    "operation, args",
+    [
+        (add, ("/foo/-", 1)),
+        (add, ("/baz", {"quux": 1})),
+        (add, ("/foo/bar/baz", 1)),
+        (add, ("/4/x", 1)),
+        (remove, ("/foo/0",)),
+        (remove, ("/bar",)),
+        (replace, ("/foo/0", 1)),
+        (replace, ("/foo/3", 1)),
+        (move, ("/bar", "/foo")),
+        (move, ("/foo/0", "/foo/1")),
+        (move, ("/baz/quux", "/foo")),
+        (copy, ("/bar", "/foo")),
+        (copy, ("/foo/-", "/foo/0")),
+    ],
+)
+def test_share_parity(operation, args):
+    obj = {"foo": ["bar", {"baz": 42}], 4: {}}
+    try:
+        expected = operation(obj, *args)
+    except Exception as error:
+        with pytest.raises(error.__class__):
+            operation(obj, *args, share=True)
+    else:
+        assert operation(obj, *args, share=True) == expected
+    assert obj == {"foo": ["bar", {"baz": 42}], 4: {}}
+
+
+def test_share_patch():
+    obj = {"foo": {"bar": [1, 2]}, "other": {}}
+    operations = [
+        {"op": "add", "path": "/foo/bar/-", "value": 3},
+        {"op": "remove", "path": "/foo/bar/0"},
+        {"op": "copy", "from": "/foo/bar", "path": "/foo/baz"},
+        {"op": "test", "path": "/foo/baz", "value": [2, 3]},
+    ]
+    response = apply_patch(obj, operations, share=True)
+    assert response == apply_patch(obj, operations)
+    assert response["other"] is obj["other"]
+    assert obj == {"foo": {"bar": [1, 2]}, "other": {}}
+
+    with pytest.raises(Error):
+        apply_patch(obj, operations + [{"op": "remove", "path": "/baz"}], share=True)
+    assert obj == {"foo": {"bar": [1, 2]}, "other": {}}
+    assert isinstance(SharedTarget(obj).patch(operations), SharedTarget)
+
+
+def test_inplace():
+    value = {"quux": 1}
+    obj = {"foo": ["bar"], "baz": {}}
+    assert add(obj, "/foo/-", value, inplace=True) is obj
+    assert obj["foo"][1] == value
+    assert obj["foo"][1] is not value
+    assert replace(obj, "/baz", 42, inplace=True) is obj
+    assert move(obj, "/moved", "/foo/1", inplace=True) is obj
+    assert copy(obj, "/copied", "/moved", inplace=True) is obj
+    assert obj["copied"] is not obj["moved"]
+    assert remove(obj, "/foo", inplace=True) is obj
+    assert obj == {"baz": 42, "moved": {"quux": 1}, "copied": {"quux": 1}}
+
+    with pytest.raises(ValueError):
+        add(obj, "/foo", 1, share=True, inplace=True)
+
+
+@pytest.mark.parametrize(
+    "operation, args",
+    [
+        (add, ("/baz/quux", 1)),
+        (remove, ("/bar",)),
+        (replace, ("/foo/3", 1)),
+        (move, ("/baz/quux", "/foo")),
+        (move, ("/foo/0", "/bar")),
+        (copy, ("/baz/quux", "/foo")),
+    ],
+)
+def test_inplace_errors(operation, args):
+    obj = {"foo": ["bar", {"baz": 42}]}
+    with pytest.raises(Exception) as expected:
+        operation(obj, *args)
+    with pytest.raises(expected.type):
+        operation(obj, *args, inplace=True)
+    assert obj == {"foo": ["bar", {"baz": 42}]}
+
+
+def test_inplace_patch():
+    obj = {"foo": ["bar"]}
+    operations = [
+        {"op": "add", "path": "/foo/-", "value": "baz"},
+        {"op": "move", "from": "/foo", "path": "/qux"},
+    ]
+    assert apply_patch(obj, operations, inplace=True) is obj
+    assert obj == {"qux": ["bar", "baz"]}
+
+    with pytest.raises(Error):
+        apply_patch(obj, operations + [{"op": "move", "path": "/foo"}], inplace=True)
+    assert obj == {"qux": ["bar", "baz"]}
+
+    with pytest.raises(Error):
+        MutableTarget(obj).patch([{"op": "remove", "path": "/qux/0"}, {"op": "test"}])
+    assert obj == {"qux": ["bar", "baz"]}
+
+
+def test_inplace_values():
+    operations = [
+        {"op": "add", "path": "/x", "value": []},
+        {"op": "add", "path": "/x/-", "value": 1},
+    ]
+    docs = [apply_patch({}, operations, inplace=True) for _ in range(3)]
+    assert docs == [{"x": [1]}] * 3
+    assert operations[0]["value"] == []
@@ -0,0 +1,66 @@
+"""
+    tests.tests_parallel
+    ~~~~~~~~~~~~~~~~~~~~
+
+"""
+
+import pickle
+
+import pytest
+
+from jsonspec.validators import Executor, Factory, ValidatorCache, load
+
+schema = {
+    "type": "object",
+    "properties": {"id": {"$ref": "#/definitions/id"}},
+    "definitions": {"id": {"type": "integer", "minimum": 0}},
+}
+
+
+def documents(count):
+    for i in range(count):
+        yield {"id": i if i % 3 else -i}
+
+
+@pytest.mark.parametrize("backend", [None, "codegen"])
+def test_order(backend):
+    with Executor(schema, backend=backend, processes=2, chunksize=7) as executor:
+        results = list(executor.validate_many(documents(100)))
+        assert executor.count == 100
+        assert executor.throughput > 0
+
+    expected = list(load(schema).validate_many(documents(100)))
+    assert results == expected
+    assert [r.valid for r in results[:4]] == [True, True, True, False]
+    assert results[3].errors == {"#/id": {"Too small"}}
+
+
+def test_compiled():
+    validator = load(schema, provider={}, cache=ValidatorCache())
+    with Executor(validator, processes=2) as executor:
+        results = list(executor.validate_many(documents(10)))
+    assert sum(r.valid for r in results) == 7
+
+
+def test_pickle():
+    validator = Factory(cache=ValidatorCache())(schema, "#")
+    validator.attrs["properties"]["id"].validator
+    clone = pickle.loads(pickle.dumps(validator))
+    assert clone.validate({"id": 1}) == {"id": 1}
+    assert not clone.is_valid({"id": -1})
+
+
+def test_backpressure():
+    produced = []
+
+    def counted():
+        for document in documents(10000):
+            produced.append(document)
+            yield document
+
+    with Executor(schema, processes=2, chunksize=10) as executor:
+        results = executor.validate_many(counted())
+        next(results)
+        # a window of 2 chunks per worker, and the chunk being read
+        assert len(produced) <= 50
+        assert len(list(results)) == 9999
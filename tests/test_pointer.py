@@ -6,7 +6,8 @@
 
 from jsonspec.pointer import DocumentPointer, Pointer, RefError
 from jsonspec.pointer import exceptions as events
-from jsonspec.pointer import extract, stage
+from jsonspec.pointer import Missing, PointerSet, extract, extract_many, stage
+from jsonspec.pointer.bases import ChildToken, compile_pointer
 
 from . import MyMappingType, MySequenceType, TestCase
 
@@ -58,6 +59,39 @@ class TestPointer(TestCase):
         assert dp.document == ""
         assert dp.pointer == "/foo"
 
+    def test_compiled(self):
+        pointer = Pointer("/foo/1/m~0n~1o")
+        assert pointer.path == (("foo", None), ("1", 1), ("m~n/o", None))
+        assert Pointer("0/foo").path is None
+        assert Pointer("").path == ()
+        assert Pointer(pointer).path is pointer.path
+        assert pointer.tokens[-1].last
+
+    def test_parse_cache(self):
+        compile_pointer.cache_clear()
+        first = Pointer("/foo/1")
+        second = Pointer("/foo/1")
+        assert compile_pointer.cache_info().hits == 1
+        assert first.tokens == second.tokens
+        assert first.tokens is not second.tokens
+
+    def test_lookup(self):
+        foo, bar = Pointer("/foo/3")
+        assert foo.lookup(self.document) == (self.document["foo"], None)
+        assert bar.lookup(self.document["foo"]) == (
+            self.document["foo"],
+            events.OutOfRange,
+        )
+        assert foo.lookup([]) == ([], events.WrongType)
+        assert bar.lookup({"$ref": "foo"}) == ({"$ref": "foo"}, RefError)
+
+    def test_miss_not_logged(self):
+        with self.assertLogs("jsonspec.pointer", "DEBUG") as logs:
+            with self.assertRaises(events.OutOfBounds):
+                extract(self.document, "/bar")
+        assert all(record.levelname == "DEBUG" for record in logs.records)
+        assert all(record.exc_info is None for record in logs.records)
+
 
 class TestSequence(TestCase):
     document = ["foo", "bar", {"$ref": "baz"}]
@@ -236,3 +270,69 @@ class TestRelative:
         assert extract(nested_relative, "0/objects").obj == True
         assert extract(nested_relative, "1/nested/objects").obj == True
         assert extract(nested_relative, "2/foo/0").obj == "bar"
+
+
+class TestMany(TestCase):
+    document = {
+        "payload": {
+            "items": [{"price": 12, "qty": 1}, {"price": 5, "qty": 3}],
+            "ref": {"$ref": "obj2#/sub"},
+        },
+        4: True,
+    }
+
+    def test_extract_many(self):
+        pointers = [
+            "/payload/items/1/price",
+            "/payload/items/1/qty",
+            "/payload/items/0/price",
+            "/payload/items/2/price",
+            "/payload/items/-",
+            "/payload/foo",
+            "/4",
+            "",
+        ]
+        values = extract_many(self.document, pointers)
+        assert list(values) == pointers
+        for pointer in pointers:
+            try:
+                expected = extract(self.document, pointer)
+            except events.ExtractError:
+                expected = Missing
+            assert values[pointer] == expected, pointer
+
+    def test_references(self):
+        pointers = PointerSet(["/payload/ref", "/payload/ref/$ref"])
+        assert pointers.extract(self.document) == {
+            "/payload/ref": Missing,
+            "/payload/ref/$ref": Missing,
+        }
+        assert pointers.extract(self.document, bypass_ref=True) == {
+            "/payload/ref": {"$ref": "obj2#/sub"},
+            "/payload/ref/$ref": "obj2#/sub",
+        }
+
+    def test_shared_prefix(self):
+        pointers = PointerSet(["/a/b/c", Pointer("/a/b/d"), "/a/b/c"])
+        assert len(pointers) == 3
+        assert list(pointers.root.children) == [(ChildToken, "a")]
+        assert pointers.extract({"a": {"b": {"c": 1}}}) == {
+            "/a/b/c": 1,
+            "/a/b/d": Missing,
+        }
+
+    def test_custom_types(self):
+        from . import MyMappingType, MySequenceType
+
+        document = MyMappingType({"foo": MySequenceType(["bar", "baz"])})
+        assert extract_many(document, ["/foo/1", "/foo/2"]) == {
+            "/foo/1": "baz",
+            "/foo/2": Missing,
+        }
+
+    def test_relative(self):
+        relative = extract(stage({"foo": ["bar", "baz"]}), "/foo/1")
+        values = extract_many(relative, ["0", "1/0", "0#"])
+        assert values["0"] == "baz"
+        assert values["1/0"] == "bar"
+        assert values["0#"] == 1
@@ -0,0 +1,122 @@
+"""
+    tests.test_program
+    ~~~~~~~~~~~~~~~~~~
+
+"""
+
+import pytest
+
+from jsonspec.operations import (
+    Error,
+    PatchProgram,
+    apply_patch,
+    apply_to_many,
+    compile_patch,
+)
+
+operations = [
+    {"op": "test", "path": "/version", "value": 1},
+    {"op": "replace", "path": "/version", "value": 2},
+    {"op": "move", "from": "/name", "path": "/title"},
+    {"op": "add", "path": "/meta/tags/-", "value": {"label": "migrated"}},
+    {"op": "test", "path": "/meta/tags/0", "value": "a"},
+    {"op": "remove", "path": "/legacy"},
+    {"op": "copy", "from": "/title", "path": "/meta/label"},
+    {"op": "test", "path": "/title", "value": "foo"},
+]
+
+
+def document():
+    return {"version": 1, "name": "foo", "legacy": [1], "meta": {"tags": ["a"]}}
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"share": True}, {"inplace": True}], ids=["copy", "share", "inplace"]
+)
+def test_compile_patch(kwargs):
+    program = compile_patch(operations, **kwargs)
+    assert isinstance(program, PatchProgram)
+    expected = apply_patch(document(), operations)
+    assert expected["meta"]["label"] == "foo"
+
+    for _ in range(2):
+        doc = document()
+        response = program(doc)
+        assert response == expected
+        assert (response is doc) == bool(kwargs.get("inplace"))
+        if not kwargs.get("inplace"):
+            assert doc == document()
+
+    # values are never shared between documents
+    first, second = program(document()), program(document())
+    assert first["meta"]["tags"][-1] is not second["meta"]["tags"][-1]
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"share": True}, {"inplace": True}], ids=["copy", "share", "inplace"]
+)
+def test_container_values(kwargs):
+    patch = [
+        {"op": "add", "path": "/x", "value": []},
+        {"op": "add", "path": "/x/-", "value": 1},
+    ]
+    outcomes = list(apply_to_many([{}, {}, {}], patch, **kwargs))
+    assert [outcome.document for outcome in outcomes] == [{"x": [1]}] * 3
+    assert patch[0]["value"] == []
+
+
+def test_independent_checks():
+    program = compile_patch(operations)
+    assert len(program.checks) == 1
+    assert len(program.steps) == len(operations) - 1
+
+    # the first test is checked before any copy
+    doc = document()
+    doc["version"] = 0
+    with pytest.raises(Error):
+        program(doc)
+
+    # the last one depends on the move
+    doc = document()
+    doc["name"] = "bar"
+    with pytest.raises(Error):
+        program(doc)
+
+    # as the index may shift
+    program = compile_patch(
+        [
+            {"op": "remove", "path": "/foo/0"},
+            {"op": "test", "path": "/foo/1", "value": 2},
+        ]
+    )
+    assert not program.checks
+    assert program({"foo": [0, 1, 2]}) == {"foo": [1, 2]}
+
+
+def test_compile_errors():
+    for patch in [
+        [{"op": "add", "path": "/foo"}],
+        [{"op": "unknown", "path": "/foo"}],
+        [{"op": "add", "path": "foo", "value": 1}],
+        [{"op": "add", "path": ["a"], "value": 1}],
+        [{"op": "remove", "path": None}],
+        [{"op": "move", "from": 5, "path": "/foo"}],
+        [{"op": "copy", "from": ["a"], "path": "/foo"}],
+    ]:
+        with pytest.raises(Error):
+            compile_patch(patch)
+    with pytest.raises(ValueError):
+        compile_patch([], share=True, inplace=True)
+
+
+def test_apply_to_many():
+    documents = (doc for doc in [document(), {"version": 1}, document()])
+    outcomes = list(apply_to_many(documents, operations))
+    assert [outcome.applied for outcome in outcomes] == [True, False, True]
+    assert outcomes[0].document == apply_patch(document(), operations)
+    assert outcomes[1].document == {"version": 1}
+    assert isinstance(outcomes[1].error, Error)
+
+    program = compile_patch(operations)
+    outcomes = apply_to_many([document()], program)
+    assert next(outcomes).document == apply_patch(document(), operations)
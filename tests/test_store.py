@@ -0,0 +1,124 @@
+"""
+    tests.test_store
+    ~~~~~~~~~~~~~~~~
+
+"""
+
+import json
+import os
+
+import pytest
+
+from jsonspec.reference.providers import FilesystemProvider
+from jsonspec.validators.store import SchemaStore
+
+
+def write(path, schema):
+    path.write_text(json.dumps(schema))
+    return path
+
+
+def test_store(tmp_path):
+    base = write(
+        tmp_path / "base.json", {"definitions": {"name": {"pattern": "^[a-z]+$"}}}
+    )
+    entry = write(
+        tmp_path / "entry.json",
+        {
+            "properties": {
+                "name": {"$ref": "test:base#/definitions/name"},
+                "children": {"items": {"$ref": "#"}},
+            }
+        },
+    )
+    provider = FilesystemProvider(str(tmp_path), prefix="test:", lazy=True)
+    store = SchemaStore(tmp_path / "cache")
+
+    validator = store.load(entry, provider=provider)
+    assert validator.is_valid({"name": "foo", "children": [{"name": "bar"}]})
+    assert not validator.is_valid({"children": [{"name": "Bar"}]})
+    assert (store.hits, store.misses) == (0, 1)
+
+    validator = store.load(entry, provider=provider)
+    assert not validator.is_valid({"children": [{"name": "Bar"}]})
+    assert (store.hits, store.misses) == (1, 1)
+    assert store.verify(provider)["fresh"] == [os.path.realpath(entry)]
+
+    # dependencies are checked too
+    write(base, {"definitions": {"name": {"type": "integer"}}})
+    provider = FilesystemProvider(str(tmp_path), prefix="test:", lazy=True)
+    assert store.verify(provider)["stale"] == [os.path.realpath(entry)]
+    validator = store.load(entry, provider=provider)
+    assert validator.is_valid({"name": 42})
+    assert (store.hits, store.misses) == (1, 2)
+
+
+def test_store_invalidation(tmp_path):
+    schema = write(tmp_path / "schema.json", {"type": "integer"})
+    store = SchemaStore(tmp_path / "cache")
+    assert store.load(schema).is_valid(42)
+
+    write(schema, {"type": "string", "minLength": 1})
+    assert store.load(schema).is_valid("foo")
+    assert store.misses == 2
+    assert len(store.entries()) == 1
+
+    store.entries()[0].write_bytes(b"garbage")
+    assert store.verify()["corrupted"]
+    assert store.load(schema).is_valid("foo")
+    assert store.misses == 3
+
+    os.unlink(schema)
+    assert store.verify(prune=True)["stale"] == [os.path.realpath(schema)]
+    assert not store.entries()
+
+
+def test_store_removed_dependency(tmp_path):
+    base = write(tmp_path / "base.json", {"type": "integer"})
+    entry = write(tmp_path / "entry.json", {"items": {"$ref": "test:base#"}})
+    provider = FilesystemProvider(str(tmp_path), prefix="test:", lazy=True)
+    store = SchemaStore(tmp_path / "cache")
+    store.load(entry, provider=provider)
+
+    os.unlink(base)
+    provider = FilesystemProvider(str(tmp_path), prefix="test:", lazy=True)
+    assert store.verify(provider)["stale"] == [os.path.realpath(entry)]
+    assert store.verify(provider, prune=True)["stale"]
+    assert not store.entries()
+
+
+def test_store_dependency_stats(tmp_path):
+    write(tmp_path / "base.json", {"type": "integer"})
+    entry = write(tmp_path / "entry.json", {"items": {"$ref": "test:base#"}})
+    provider = FilesystemProvider(str(tmp_path), prefix="test:", lazy=True)
+    store = SchemaStore(tmp_path / "cache")
+    store.load(entry, provider=provider)
+
+    # warm starts do not parse unchanged dependencies
+    provider = FilesystemProvider(str(tmp_path), prefix="test:", lazy=True)
+    parsed = []
+    parse = provider._parse
+    provider._parse = lambda filename: parsed.append(filename) or parse(filename)
+    assert store.load(entry, provider=provider).is_valid([1])
+    assert store.verify(provider)["fresh"] == [os.path.realpath(entry)]
+    assert (store.hits, parsed) == (1, [])
+
+    # touched files are fingerprinted
+    os.utime(tmp_path / "base.json", ns=(0, 0))
+    assert store.load(entry, provider=provider).is_valid([1])
+    assert store.hits == 2
+    assert len(parsed) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="posix permissions")
+def test_store_untrusted(tmp_path):
+    schema = write(tmp_path / "schema.json", {"type": "integer"})
+    store = SchemaStore(tmp_path / "cache")
+    assert store.load(schema).is_valid(42)
+    assert store.directory.stat().st_mode & 0o777 == 0o700
+
+    store.directory.chmod(0o777)
+    with pytest.raises(PermissionError):
+        store.load(schema)
+    with pytest.raises(PermissionError):
+        store.verify()
@@ -4,10 +4,16 @@
 
 """
 
+import re
+
 import pytest
 
 from jsonspec.validators.exceptions import ValidationError
 from jsonspec.validators.util import (
+    EnumIndex,
+    PatternDispatch,
+    canonical_key,
+    has_duplicates,
     rfc3339_to_datetime,
     uncamel,
     validate_css_color,
@@ -202,3 +208,54 @@ def test_css():
     validate_css_color("#f01200")
     with pytest.raises(ValidationError):
         validate_css_color("foo++bar")
+
+
+def test_pattern_dispatch():
+    dispatch = PatternDispatch(["^f", "o$", r"(a)\1", "(?i)X", "^$"])
+    names = ["foo", "bar", "aa", "xx", "", "fo\n"]
+    assert dispatch(names) == [
+        ["foo", "fo\n"],
+        ["foo", "fo\n"],
+        ["aa"],
+        ["xx"],
+        [""],
+    ]
+    assert PatternDispatch([])(names) == []
+
+    with pytest.raises(re.error):
+        PatternDispatch(["(foo"])
+
+
+def test_canonical_key():
+    assert canonical_key(1) == canonical_key(1.0)
+    assert canonical_key(True) != canonical_key(1)
+    assert canonical_key(False) != canonical_key(0)
+    assert canonical_key([1, "a"]) == canonical_key((1.0, "a"))
+    assert canonical_key({"a": [1]}) == canonical_key({"a": [1.0]})
+    assert canonical_key({"a": 1}) != canonical_key([["a", 1]])
+    assert canonical_key([True]) != canonical_key([1])
+
+    with pytest.raises(TypeError):
+        canonical_key({1, 2})
+
+
+def test_enum_index():
+    index = EnumIndex([1, "foo", None, [1, {"a": False}], {"b"}])
+    assert 1.0 in index
+    assert True not in index
+    assert None in index
+    assert [1.0, {"a": False}] in index
+    assert [1, {"a": 0}] not in index
+    assert {"b"} in index
+    assert {"c"} not in index
+
+
+def test_has_duplicates():
+    assert not has_duplicates([])
+    assert has_duplicates(["a", "b", "a"])
+    assert has_duplicates([1, 2, 1.0])
+    assert not has_duplicates([1, True, 0, False])
+    assert has_duplicates([{"a": 1, "b": 2}, {"b": 2, "a": 1.0}])
+    assert not has_duplicates([{"a": [1]}, {"a": [True]}])
+    assert has_duplicates([[1, {"c": None}], [1, {"c": None}]])
+    assert has_duplicates([{1}, {1}])
@@ -0,0 +1,67 @@
+"""
+    tests.tests_validate_many
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""
+
+import pytest
+
+from jsonspec.validators import load
+
+schema = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "kind": {"type": "string", "default": "event"},
+    },
+    "required": ["id"],
+}
+
+
+@pytest.mark.parametrize("backend", [None, "codegen"])
+def test_results(backend):
+    validator = load(schema, backend=backend)
+    documents = [{"id": 1, "kind": "click"}, {"tags": [1]}, {"id": 2}]
+    results = list(validator.validate_many(documents))
+
+    assert [result.valid for result in results] == [True, False, True]
+    assert results[0].document is documents[0]
+    assert results[1].document is documents[1]
+    assert results[1].errors == {
+        "#/id": {"Missing property"},
+        "#/tags/0": {"Wrong type"},
+    }
+    assert results[2].document == {"id": 2, "kind": "event"}
+    assert documents[2] == {"id": 2}
+
+
+def test_lazy():
+    consumed = []
+
+    def documents():
+        for i in range(3):
+            consumed.append(i)
+            yield {"id": i}
+
+    results = load(schema).validate_many(documents())
+    assert next(results).valid
+    assert consumed == [0]
+
+
+def test_reference():
+    validator = load(
+        {
+            "items": {"$ref": "#/definitions/foo"},
+            "definitions": {"foo": {"type": "integer"}},
+        }
+    )
+    validator = validator.attrs["items"]
+    assert [r.valid for r in validator.validate_many([1, "foo"])] == [True, False]
+
+
+def test_copy():
+    document = {"id": 1}
+    (result,) = load(schema).validate_many([document], copy=True)
+    assert result.document == {"id": 1, "kind": "event"}
+    assert result.document is not document